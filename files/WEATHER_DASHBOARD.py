@@ -13,18 +13,34 @@ Changes from original WEATHER.PY:
 """
 
 from __future__ import annotations
-import math
+import base64
 import json
 import os
 import re
-import requests
+import sys
+import time
+from dataclasses import dataclass, replace
 import numpy as np
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.colors import LinearSegmentedColormap
-from matplotlib.offsetbox import AnchoredText
 from datetime import datetime, timedelta, date
+from pipeline_cache import ResultCache, content_hash
+from weather_aggregate import (
+    align_to_days,
+    daily_reduce,
+    gap_fill_daily,
+    hourly_grid,
+    nanmean_rows,
+    stack_payloads,
+)
+# Risk scoring lives in weather_risk; names re-exported for existing callers
+from weather_risk import (
+    calc_risk_score,
+    compute_daily_risk,
+    hourly_risk_matrix,
+    is_shamal_day,
+    op_status_from_score,
+    parse_bool,
+    voyage_worst_case,
+)
 
 # -----------------------------
 # USER CONFIG
@@ -33,6 +49,17 @@ TZ = "Asia/Dubai"
 LAT = 24.12
 LON = 52.53
 
+# Local weather history (weather_store): archive days are fetched once, forecasts
+# recorded per model run; --no-store bypasses it
+USE_WEATHER_STORE = True
+
+# Multi-site mode (--sites): both voyage ends and the route between them
+SITES = {
+    "MZP": (24.52489, 54.37798),  # Mina Zayed Port
+    "ROUTE_MID": (24.683, 54.018),  # MZP-AGI leg midpoint
+    "AGI": (24.841096, 53.658619),  # AGI Jetty (Al Ghallan Island)
+}
+
 # Schedule 4-day mode (set TARGET_DATE for manual date; None = use today for date range)
 # Daily Operation Status 박스 날짜: 항상 "오늘" 기준 4일치 표시 (TARGET_DATE 또는 date.today())
 TARGET_DATE = None
@@ -40,9 +67,25 @@ SCHEDULE_4DAY_MODE = True
 # True: 날짜 범위·Daily Operation Status = 오늘(date.today()) 기준. False: files/weather/ 최신 폴더 기준
 USE_TODAY_AS_DATE_ANCHOR = True
 
-_WEATHER_BASE = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)), "weather"
+# Weather data source settings
+USE_MANUAL_JSON = True
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+_WEATHER_BASE = os.path.join(SCRIPT_DIR, "weather")
+DEFAULT_WEATHER_JSON_PATH = os.path.join(
+    os.path.dirname(SCRIPT_DIR), "weather_data_20260106.json"
 )
+WEATHER_REQUEST_PATH = os.path.join(SCRIPT_DIR, "weather_data_requests.txt")
+
+
+@dataclass
+class DashboardConfig:
+    """Date range and paths for one heatmap run (see resolve_config)"""
+
+    start_date: date
+    end_date: date
+    output_path: str
+    weather_json_path: str
+    use_store: bool = USE_WEATHER_STORE  # Read/write the local history store (weather_store)
 
 
 def _get_latest_weather_date() -> date | None:
@@ -65,78 +108,70 @@ def _get_latest_weather_date() -> date | None:
     return candidates[0][1]
 
 
-if SCHEDULE_4DAY_MODE:
-    if TARGET_DATE is not None:
-        _update = TARGET_DATE
+def _parsed_weather_json(root: str, d: date) -> str:
+    return os.path.join(
+        root, "out", "weather_parsed", d.strftime("%Y%m%d"), "weather_for_weather_py.json"
+    )
+
+
+def resolve_config(target_date: date | None = None) -> DashboardConfig:
+    """
+    Resolve the date range, output PNG and weather JSON for this run.
+
+    Called from main() rather than at import time, so importing this module
+    does not probe the filesystem or create out/.
+    """
+    if target_date is None:
+        target_date = TARGET_DATE
+    if not SCHEDULE_4DAY_MODE:
+        return DashboardConfig(
+            start_date=date(2026, 1, 15),
+            end_date=date(2026, 2, 15),
+            output_path="AGI_TR_Weather_Risk_Heatmap_v3.png",
+            weather_json_path=DEFAULT_WEATHER_JSON_PATH,
+        )
+
+    if target_date is not None:
+        update = target_date
     elif USE_TODAY_AS_DATE_ANCHOR:
         # Daily Operation Status 박스: 오늘 날짜 기준 4일치 (1/29 → 29 Jan, 30 Jan, 31 Jan, 01 Feb)
-        _update = date.today()
+        update = date.today()
     else:
-        _latest = _get_latest_weather_date()
-        _update = _latest if _latest is not None else date.today()
-    START_DATE = _update
-    END_DATE = _update + timedelta(days=3)
-    _script_dir = (
-        os.path.dirname(os.path.abspath(__file__))
-        if "__file__" in globals()
-        else os.getcwd()
-    )
-    _out_dir = os.path.join(_script_dir, "out")
-    os.makedirs(_out_dir, exist_ok=True)
-    OUTPUT_PATH = os.path.join(_out_dir, "weather_4day_heatmap.png")
-else:
-    START_DATE = date(2026, 1, 15)
-    END_DATE = date(2026, 2, 15)
-    OUTPUT_PATH = "AGI_TR_Weather_Risk_Heatmap_v3.png"
+        latest = _get_latest_weather_date()
+        update = latest if latest is not None else date.today()
 
-# Weather data source settings
-USE_MANUAL_JSON = True
-SCRIPT_DIR = (
-    os.path.dirname(os.path.abspath(__file__))
-    if "__file__" in globals()
-    else os.getcwd()
-)
-WEATHER_JSON_PATH = os.path.join(
-    os.path.dirname(SCRIPT_DIR), "weather_data_20260106.json"
-)
-WEATHER_REQUEST_PATH = os.path.join(SCRIPT_DIR, "weather_data_requests.txt")
+    out_dir = os.path.join(SCRIPT_DIR, "out")
+    os.makedirs(out_dir, exist_ok=True)
 
-if SCHEDULE_4DAY_MODE:
-    # JSON path: try _update (today or TARGET) first, then latest weather folder
-    _parsed_in_files = os.path.join(
-        SCRIPT_DIR,
-        "out",
-        "weather_parsed",
-        _update.strftime("%Y%m%d"),
-        "weather_for_weather_py.json",
+    # JSON path: try update (today or TARGET) first, then latest weather folder
+    weather_json_path = DEFAULT_WEATHER_JSON_PATH
+    parsed_in_files = _parsed_weather_json(SCRIPT_DIR, update)
+    parsed_candidate = _parsed_weather_json(
+        os.path.dirname(os.path.dirname(SCRIPT_DIR)), update
     )
-    _convert_root = os.path.dirname(os.path.dirname(SCRIPT_DIR))
-    _parsed_candidate = os.path.join(
-        _convert_root,
-        "out",
-        "weather_parsed",
-        _update.strftime("%Y%m%d"),
-        "weather_for_weather_py.json",
-    )
-    if os.path.exists(_parsed_in_files):
-        WEATHER_JSON_PATH = _parsed_in_files
-    elif os.path.exists(_parsed_candidate):
-        WEATHER_JSON_PATH = _parsed_candidate
+    if os.path.exists(parsed_in_files):
+        weather_json_path = parsed_in_files
+    elif os.path.exists(parsed_candidate):
+        weather_json_path = parsed_candidate
     else:
         # Fallback: latest weather folder (e.g. today=2025-01-29 but project uses 2026)
-        _latest = _get_latest_weather_date()
-        if _latest is not None:
-            _fallback = os.path.join(
-                SCRIPT_DIR,
-                "out",
-                "weather_parsed",
-                _latest.strftime("%Y%m%d"),
-                "weather_for_weather_py.json",
-            )
-            if os.path.exists(_fallback):
-                WEATHER_JSON_PATH = _fallback
+        latest = _get_latest_weather_date()
+        if latest is not None:
+            fallback = _parsed_weather_json(SCRIPT_DIR, latest)
+            if os.path.exists(fallback):
+                weather_json_path = fallback
+
+    return DashboardConfig(
+        start_date=update,
+        end_date=update + timedelta(days=3),
+        output_path=os.path.join(out_dir, "weather_4day_heatmap.png"),
+        weather_json_path=weather_json_path,
+    )
 
-# Voyage overlay (7 voyages; SSOT: agi tr final schedule.json parent "AGI TR Unit N" planned_start/finish)
+
+# Voyage overlay: derived from the SSOT trips/activities (ssot_voyage_index, cached);
+# this hardcoded list is the fallback when the SSOT cannot be read
+VOYAGES_FROM_SSOT = True
 VOYAGES = [
     {
         "name": "V1",
@@ -189,6 +224,20 @@ VOYAGES = [
     },
 ]
 
+
+def current_voyages() -> list[dict]:
+    """Voyage overlay entries: SSOT-derived, or VOYAGES when disabled/unavailable"""
+    if not VOYAGES_FROM_SSOT:
+        return VOYAGES
+    from ssot_voyage_index import voyages_from_ssot
+
+    try:
+        return voyages_from_ssot()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] SSOT voyage overlay unavailable ({e}); using built-in VOYAGES")
+        return VOYAGES
+
+
 MANUAL_SHAMAL_PERIODS = [
     (date(2026, 2, 5), date(2026, 2, 14)),
 ]
@@ -259,6 +308,9 @@ ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
 MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
 CLIMATE_URL = "https://climate-api.open-meteo.com/v1/climate"
 CLIMATE_MODELS = ["EC_Earth3P_HR", "MRI_AGCM3_2_S", "MPI_ESM1_2_XR"]
+OUTPUT_FORMATS = {"png", "json", "svg"}
+# Hourly fields kept for the intraday (days x 24) risk matrix
+HOURLY_VARS = ["visibility", "wind_speed_10m", "wind_gusts_10m"]
 
 
 # -----------------------------
@@ -352,41 +404,39 @@ def safe_get(dct, *keys, default=None):
 
 
 def request_json(url: str, params: dict, timeout=30) -> dict:
+    from weather_http import default_client
+
     try:
-        r = requests.get(url, params=params, timeout=timeout)
-        r.raise_for_status()
-        return r.json()
-    except:
+        return default_client().get_json(url, params, timeout=timeout)
+    except Exception:
         return {}
 
 
-def parse_bool(value) -> bool:
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, str):
-        return value.strip().lower() in ("true", "1", "yes", "y", "t")
-    return bool(value)
-
-
 # -----------------------------
 # FETCH FUNCTIONS (Same as original)
 # -----------------------------
-def fetch_weather_model(model_name: str, base_url: str, d0: date, d1: date) -> dict:
-    params = {
-        "latitude": LAT,
-        "longitude": LON,
-        "timezone": TZ,
-        "wind_speed_unit": "kn",
-        "start_date": d0.isoformat(),
-        "end_date": d1.isoformat(),
-        "daily": ",".join(
-            ["wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant"]
-        ),
-        "hourly": ",".join(["visibility"]),
-        "forecast_days": 16,
-    }
-    j = request_json(base_url, params)
+def request_sites_json(url: str, params: dict, sites: list[tuple[float, float]] | None) -> list:
+    """
+    One request for all sites (Open-Meteo multi-coordinate form).
+
+    Returns:
+        One response per site, in order ({} where the request failed)
+    """
+    if sites is None:
+        sites = [(LAT, LON)]
+    params = dict(
+        params,
+        latitude=",".join(str(lat) for lat, _ in sites),
+        longitude=",".join(str(lon) for _, lon in sites),
+    )
+    j = request_json(url, params)
+    # A single coordinate returns one object, several return a list
+    responses = j if isinstance(j, list) else [j]
+    return (responses + [{}] * len(sites))[: len(sites)]
+
 
+def parse_wind_payload(j: dict, model_name: str) -> dict:
+    """Daily wind/gust/direction + hourly wind/gust/visibility (forecast or archive response)"""
     daily_time = safe_get(j, "daily", "time", default=[])
     wind_max = np.array(
         safe_get(j, "daily", "wind_speed_10m_max", default=[]), dtype=float
@@ -402,18 +452,14 @@ def fetch_weather_model(model_name: str, base_url: str, d0: date, d1: date) -> d
     hourly_vis_m = np.array(
         safe_get(j, "hourly", "visibility", default=[]), dtype=float
     )
+    hourly_wind = np.array(
+        safe_get(j, "hourly", "wind_speed_10m", default=[]), dtype=float
+    )
+    hourly_gust = np.array(
+        safe_get(j, "hourly", "wind_gusts_10m", default=[]), dtype=float
+    )
 
-    vis_min_km = np.full(len(daily_time), np.nan, dtype=float)
-    if len(hourly_time) == len(hourly_vis_m) and len(daily_time) > 0:
-        day_to_vals = {t: [] for t in daily_time}
-        for ts, vm in zip(hourly_time, hourly_vis_m):
-            day = ts[:10]
-            if day in day_to_vals and not np.isnan(vm):
-                day_to_vals[day].append(vm / 1000.0)
-        for i, day in enumerate(daily_time):
-            vals = day_to_vals.get(day, [])
-            if vals:
-                vis_min_km[i] = float(np.nanmin(vals))
+    vis_min_km = daily_reduce(hourly_time, hourly_vis_m / 1000.0, daily_time, "min")
 
     return {
         "model": model_name,
@@ -422,13 +468,43 @@ def fetch_weather_model(model_name: str, base_url: str, d0: date, d1: date) -> d
         "gust_max_kn": gust_max,
         "wind_dir_deg": wind_dir,
         "vis_min_km": vis_min_km,
+        "hourly_time": hourly_time,
+        "hourly_wind_kn": hourly_wind,
+        "hourly_gust_kn": hourly_gust,
+        "hourly_vis_km": hourly_vis_m / 1000.0,
     }
 
 
-def fetch_archive(d0: date, d1: date) -> dict:
+def parse_marine_payload(j: dict) -> dict:
+    daily_time = safe_get(j, "daily", "time", default=[])
+    wave_max = np.array(
+        safe_get(j, "daily", "wave_height_max", default=[]), dtype=float
+    )
+    hourly_wave = np.array(
+        safe_get(j, "hourly", "wave_height", default=[]), dtype=float
+    )
+    return {
+        "dates": daily_time,
+        "wave_max_m": wave_max,
+        "hourly_time": safe_get(j, "hourly", "time", default=[]),
+        "hourly_wave_m": hourly_wave,
+    }
+
+
+def parse_climate_payload(j: dict) -> dict:
+    daily_time = safe_get(j, "daily", "time", default=[])
+    w = safe_get(j, "daily", "wind_speed_10m_max", default=None)
+    if w is None:
+        return {"dates": daily_time, "wind_max_kn": np.full(len(daily_time), np.nan)}
+    wind = np.array(w, dtype=float)
+    return {"dates": daily_time, "wind_max_kn": wind}
+
+
+# fetch_*: one payload for LAT/LON, or a list (one per site) when sites is given
+def fetch_weather_model(
+    model_name: str, base_url: str, d0: date, d1: date, sites=None
+) -> dict | list[dict]:
     params = {
-        "latitude": LAT,
-        "longitude": LON,
         "timezone": TZ,
         "wind_speed_unit": "kn",
         "start_date": d0.isoformat(),
@@ -436,123 +512,316 @@ def fetch_archive(d0: date, d1: date) -> dict:
         "daily": ",".join(
             ["wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant"]
         ),
-        "hourly": "visibility",
+        "hourly": ",".join(HOURLY_VARS),
+        "forecast_days": 16,
     }
-    j = request_json(ARCHIVE_URL, params)
-
-    daily_time = safe_get(j, "daily", "time", default=[])
-    wind_max = np.array(
-        safe_get(j, "daily", "wind_speed_10m_max", default=[]), dtype=float
-    )
-    gust_max = np.array(
-        safe_get(j, "daily", "wind_gusts_10m_max", default=[]), dtype=float
-    )
-    wind_dir = np.array(
-        safe_get(j, "daily", "wind_direction_10m_dominant", default=[]), dtype=float
-    )
-
-    hourly_time = safe_get(j, "hourly", "time", default=[])
-    hourly_vis_m = np.array(
-        safe_get(j, "hourly", "visibility", default=[]), dtype=float
-    )
+    payloads = [
+        parse_wind_payload(j, model_name)
+        for j in request_sites_json(base_url, params, sites)
+    ]
+    return payloads if sites is not None else payloads[0]
 
-    vis_min_km = np.full(len(daily_time), np.nan, dtype=float)
-    if len(hourly_time) == len(hourly_vis_m) and len(daily_time) > 0:
-        day_to_vals = {t: [] for t in daily_time}
-        for ts, vm in zip(hourly_time, hourly_vis_m):
-            day = ts[:10]
-            if day in day_to_vals and not np.isnan(vm):
-                day_to_vals[day].append(vm / 1000.0)
-        for i, day in enumerate(daily_time):
-            vals = day_to_vals.get(day, [])
-            if vals:
-                vis_min_km[i] = float(np.nanmin(vals))
 
-    return {
-        "model": "archive",
-        "dates": daily_time,
-        "wind_max_kn": wind_max,
-        "gust_max_kn": gust_max,
-        "wind_dir_deg": wind_dir,
-        "vis_min_km": vis_min_km,
+def fetch_archive(d0: date, d1: date, sites=None) -> dict | list[dict]:
+    params = {
+        "timezone": TZ,
+        "wind_speed_unit": "kn",
+        "start_date": d0.isoformat(),
+        "end_date": d1.isoformat(),
+        "daily": ",".join(
+            ["wind_speed_10m_max", "wind_gusts_10m_max", "wind_direction_10m_dominant"]
+        ),
+        "hourly": ",".join(HOURLY_VARS),
     }
+    payloads = [
+        parse_wind_payload(j, "archive")
+        for j in request_sites_json(ARCHIVE_URL, params, sites)
+    ]
+    return payloads if sites is not None else payloads[0]
 
 
-def fetch_marine_waves(d0: date, d1: date) -> dict:
+def fetch_marine_waves(d0: date, d1: date, sites=None) -> dict | list[dict]:
     params = {
-        "latitude": LAT,
-        "longitude": LON,
         "timezone": TZ,
         "start_date": d0.isoformat(),
         "end_date": d1.isoformat(),
         "daily": "wave_height_max",
+        "hourly": "wave_height",
         "cell_selection": "sea",
     }
-    j = request_json(MARINE_URL, params)
-    daily_time = safe_get(j, "daily", "time", default=[])
-    wave_max = np.array(
-        safe_get(j, "daily", "wave_height_max", default=[]), dtype=float
-    )
-    return {"dates": daily_time, "wave_max_m": wave_max}
+    payloads = [
+        parse_marine_payload(j) for j in request_sites_json(MARINE_URL, params, sites)
+    ]
+    return payloads if sites is not None else payloads[0]
 
 
-def fetch_climate_wind_max(d0: date, d1: date) -> dict:
+def fetch_climate_wind_max(d0: date, d1: date, sites=None) -> dict | list[dict]:
     params = {
-        "latitude": LAT,
-        "longitude": LON,
         "start_date": d0.isoformat(),
         "end_date": d1.isoformat(),
         "models": ",".join(CLIMATE_MODELS),
         "daily": "wind_speed_10m_max",
         "wind_speed_unit": "kn",
     }
-    j = request_json(CLIMATE_URL, params)
-    daily_time = safe_get(j, "daily", "time", default=[])
-    w = safe_get(j, "daily", "wind_speed_10m_max", default=None)
-    if w is None:
-        return {"dates": daily_time, "wind_max_kn": np.full(len(daily_time), np.nan)}
-    wind = np.array(w, dtype=float)
-    return {"dates": daily_time, "wind_max_kn": wind}
+    payloads = [
+        parse_climate_payload(j)
+        for j in request_sites_json(CLIMATE_URL, params, sites)
+    ]
+    return payloads if sites is not None else payloads[0]
 
 
-# -----------------------------
-# RISK MODEL
-# -----------------------------
-def calc_risk_score(wind_kn, gust_kn, wave_m, vis_km):
-    wind_risk = np.clip((wind_kn - 12.0) * 4.0, 0.0, 40.0)
-    gust_risk = np.clip((gust_kn - 18.0) * 2.5, 0.0, 30.0)
-    wave_risk = np.clip((wave_m - 0.80) * 35.0, 0.0, 25.0)
-    vis_risk = np.clip((6.0 - vis_km) * 6.0, 0.0, 25.0)
-    score = wind_risk + gust_risk + wave_risk + vis_risk
-    return np.clip(score, 0.0, 100.0)
+def fetch_stored(fetch, source: str, d0: date, d1: date, sites=None) -> dict | list[dict]:
+    """
+    Run fetch(d0, d1, sites) through the local history store (weather_store).
+
+    Only days not yet stored for every site are requested, one
+    multi-coordinate request per missing range; the result is read back
+    from the store.
+    """
+    from weather_store import default_store, missing_runs, site_key
+
+    store = default_store()
+    site_list = sites if sites is not None else [(LAT, LON)]
+    keys = [site_key(lat, lon) for lat, lon in site_list]
+    stored = set.intersection(*(set(store.stored_dates(key, source, d0, d1)) for key in keys))
+    for r0, r1 in missing_runs(sorted(stored), d0, d1):
+        for key, payload in zip(keys, fetch(r0, r1, site_list)):
+            store.put_payload(key, source, payload)
+    payloads = [store.load_payload(key, source, d0, d1) for key in keys]
+    return payloads if sites is not None else payloads[0]
+
 
+def fetch_archive_stored(d0: date, d1: date, sites=None) -> dict | list[dict]:
+    from weather_store import ARCHIVE_SOURCE
 
-def op_status_from_score(score):
-    if score < 30.0:
-        return "GO"
-    elif score < 60.0:
-        return "HOLD"
-    return "NO-GO"
+    return fetch_stored(fetch_archive, ARCHIVE_SOURCE, d0, d1, sites)
 
 
-def is_shamal_day(wind_dir_deg, wind_kn, gust_kn):
-    if np.isnan(wind_dir_deg) or np.isnan(wind_kn) or np.isnan(gust_kn):
-        return False
-    nw = 285.0 <= wind_dir_deg <= 345.0
-    strong = (wind_kn >= 18.0) or (gust_kn >= 22.0)
-    return bool(nw and strong)
+def fetch_marine_history(d0: date, d1: date, sites=None) -> dict | list[dict]:
+    """Past marine waves for climatology (stored like the archive)"""
+    from weather_climatology import MARINE_HISTORY_SOURCE
+
+    return fetch_stored(fetch_marine_waves, MARINE_HISTORY_SOURCE, d0, d1, sites)
+
+
+def local_climate_payloads(site_list, days: list[date]) -> list[dict] | None:
+    """Climate fill from local climatology tables, or None unless every site has one"""
+    from weather_climatology import climate_payload, site_climatology
+    from weather_store import site_key
+
+    tables = [site_climatology(site_key(lat, lon)) for lat, lon in site_list]
+    if any(t is None for t in tables):
+        return None
+    return [climate_payload(t, days) for t in tables]
+
+
+def record_forecasts(site_list: list[tuple[float, float]], results: dict) -> None:
+    """Keep fetched model and marine forecasts in the history store under their model run."""
+    from weather_store import default_store, model_run_key, site_key
+
+    store = default_store()
+    run = model_run_key(time.time())
+    for name, payloads in results.items():
+        if name in ("archive", "climate"):
+            continue
+        source = name.split(":", 1)[-1]  # "model:ecmwf" -> "ecmwf"
+        for (lat, lon), payload in zip(site_list, payloads):
+            store.put_payload(site_key(lat, lon), source, payload, model_run=run)
+
+
+def fetch_api_sources(
+    d0: date, d1: date, today: date, sites=None, use_store: bool = USE_WEATHER_STORE
+) -> dict | list[dict]:
+    """
+    Fetch archive, forecast models, marine and climate data concurrently.
+
+    With sites, every source is still a single request carrying all the
+    coordinates, so extra sites add neither requests nor wall time; a list
+    of per-site source dicts is returned. use_store routes the archive
+    through weather_store and records forecasts there.
+    """
+    from weather_http import run_concurrent
+
+    archive_end = min(d1, today - timedelta(days=2))
+    remaining_start = max(d0, today - timedelta(days=1))
+    site_list = sites if sites is not None else [(LAT, LON)]
+
+    archive = fetch_archive_stored if use_store else fetch_archive
+
+    jobs = {}
+    if archive_end >= d0:
+        jobs["archive"] = lambda: archive(d0, archive_end, site_list)
+    if remaining_start <= d1:
+        for name, url in MODEL_URLS.items():
+            jobs[f"model:{name}"] = lambda name=name, url=url: fetch_weather_model(
+                name, url, remaining_start, d1, site_list
+            )
+    jobs["marine"] = lambda: fetch_marine_waves(d0, d1, site_list)
+    # Climate fill is only used for days still missing: local climatology
+    # tables when built (weather_climatology), else the climate API, fetched
+    # up front to keep it off the critical path
+    local_climate = local_climate_payloads(site_list, daterange(d0, d1)) if use_store else None
+    if local_climate is None:
+        jobs["climate"] = lambda: fetch_climate_wind_max(d0, d1, site_list)
+
+    results, _ = run_concurrent(jobs)
+    if local_climate is not None:
+        results["climate"] = local_climate
+    if use_store:
+        record_forecasts(site_list, results)
+    per_site = [
+        {
+            "remaining_start": remaining_start,
+            "archive": results["archive"][i] if "archive" in results else None,
+            "models": [
+                results[f"model:{name}"][i]
+                for name in MODEL_URLS
+                if f"model:{name}" in results
+            ],
+            "marine": results["marine"][i] if "marine" in results else None,
+            "climate": results["climate"][i] if "climate" in results else None,
+        }
+        for i in range(len(site_list))
+    ]
+    return per_site if sites is not None else per_site[0]
+
+
+def argv_value(flag: str, argv: list[str] | None = None) -> str | None:
+    """Value of "--flag value" or "--flag=value" on the command line, else None"""
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+        if arg == flag and i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
+def output_formats(argv: list[str] | None = None) -> set[str]:
+    """Output formats from --format png,json,svg (default: png)"""
+    value = argv_value("--format", argv)
+    if value is None:
+        return {"png"}
+    formats = {f.strip().lower() for f in value.split(",") if f.strip()}
+    unknown = formats - OUTPUT_FORMATS
+    if unknown:
+        raise SystemExit(f"[ERROR] Unknown --format value(s): {', '.join(sorted(unknown))}")
+    return formats
+
+
+def store_enabled(argv: list[str] | None = None) -> bool:
+    """Local history store unless --no-store is given"""
+    argv = sys.argv[1:] if argv is None else argv
+    return USE_WEATHER_STORE and "--no-store" not in argv
+
+
+def http_options(argv: list[str] | None = None) -> dict:
+    """configure_http() keyword arguments from --no-cache / --replay"""
+    argv = sys.argv[1:] if argv is None else argv
+    return {"use_cache": "--no-cache" not in argv, "replay": "--replay" in argv}
+
+
+def build_hourly_grids(sources: dict, days: list[date], archive_days) -> dict:
+    """(days x 24) wind/gust/vis/wave grids: archive rows, ensemble mean elsewhere"""
+    empty = np.full((len(days), 24), np.nan)
+    grids = {}
+    for key in ("hourly_wind_kn", "hourly_gust_kn", "hourly_vis_km"):
+        stack = [hourly_grid(p["hourly_time"], p[key], days) for p in sources["models"]]
+        grid = nanmean_rows(np.array(stack)) if stack else empty
+        arc = sources["archive"]
+        if arc is not None:
+            arc_grid = hourly_grid(arc["hourly_time"], arc[key], days)
+            grid = np.where(np.asarray(archive_days)[:, None], arc_grid, grid)
+        grids[key] = grid
+    mw = sources["marine"]
+    grids["hourly_wave_m"] = (
+        hourly_grid(mw["hourly_time"], mw["hourly_wave_m"], days) if mw else empty
+    )
+    return grids
 
 
 # =====================================================
 # MAIN PIPELINE - DASHBOARD OPTIMIZED VISUALIZATION
 # =====================================================
-def main():
-    days = daterange(START_DATE, END_DATE)
+def merge_api_sources(
+    sources: dict, days: list[date], wind_kn, gust_kn, wdir_deg, vis_km, wave_m, coverage
+) -> dict:
+    """
+    Merge one site's API sources into the daily arrays (in place).
+
+    Archive days first, then the forecast ensemble mean from
+    remaining_start, marine waves, and climate wind for days still missing.
+
+    Returns:
+        (days x 24) hourly grids (see build_hourly_grids)
+    """
+    arc = sources["archive"]
+    if arc is not None:
+        present, (w, g, wd, v) = align_to_days(
+            arc["dates"],
+            days,
+            arc["wind_max_kn"],
+            arc["gust_max_kn"],
+            arc["wind_dir_deg"],
+            arc["vis_min_km"],
+        )
+        wind_kn[present], gust_kn[present] = w[present], g[present]
+        wdir_deg[present], vis_km[present] = wd[present], v[present]
+        coverage[present] = "ARCHIVE"
+
+    remaining_start = sources["remaining_start"]
+    if remaining_start <= days[-1] and sources["models"]:
+        fields = ["wind_max_kn", "gust_max_kn", "wind_dir_deg", "vis_min_km"]
+        model_present, mats = stack_payloads(sources["models"], days, fields)
+        fill = (
+            model_present.any(axis=0)
+            & (np.array(days) >= remaining_start)
+            & (coverage != "ARCHIVE")
+        )
+        wind_kn[fill] = nanmean_rows(mats["wind_max_kn"])[fill]
+        gust_kn[fill] = nanmean_rows(mats["gust_max_kn"])[fill]
+        wdir_deg[fill] = nanmean_rows(mats["wind_dir_deg"])[fill]
+        vis_km[fill] = nanmean_rows(mats["vis_min_km"])[fill]
+        coverage[fill] = "FORECAST_ENSEMBLE"
+
+    mw = sources["marine"]
+    if mw is not None:
+        present, (wv,) = align_to_days(mw["dates"], days, mw["wave_max_m"])
+        wave_m[present] = wv[present]
+
+    clim = sources["climate"]
+    if clim is not None:
+        present, (cw,) = align_to_days(clim["dates"], days, clim["wind_max_kn"])
+        fill = present & np.isnan(wind_kn) & ~np.isnan(cw)
+        wind_kn[fill] = cw[fill]
+        coverage[fill] = "CLIMATE_FILL"
+
+    return build_hourly_grids(sources, days, coverage == "ARCHIVE")
+
+
+def configure_http(use_cache: bool = True, replay: bool = False) -> None:
+    """HTTP response cache: use_cache=False always refetches, replay serves cached data only"""
+    from weather_http import configure_default_client
+
+    configure_default_client(use_cache=use_cache, replay=replay)
+
+
+def compute_window(cfg: DashboardConfig) -> dict:
+    """
+    Load, merge, gap-fill and score one date window.
+
+    Returns:
+        Heatmap fields keyed like render_heatmap's arguments (days, risk,
+        status, shamal, coverage, wind_kn, gust_kn, wave_m, vis_km,
+        wdir_deg, hourly_risk)
+    """
+    start_date, end_date = cfg.start_date, cfg.end_date
+    days = daterange(start_date, end_date)
     idx = to_idx_map(days)
     n = len(days)
     print(
-        f"[INFO] Date range: {START_DATE.isoformat()} ~ {END_DATE.isoformat()} "
-        f"(4 days) | Data: {WEATHER_JSON_PATH}"
+        f"[INFO] Date range: {start_date.isoformat()} ~ {end_date.isoformat()} "
+        f"(4 days) | Data: {cfg.weather_json_path}"
     )
 
     # Arrays
@@ -564,12 +833,13 @@ def main():
     risk_level_override = [None] * n
     shamal_override = [None] * n
     coverage = np.array([""] * n, dtype=object)
+    hourly = None  # (days x 24) grids, API mode only
 
     # Load weather data
     if USE_MANUAL_JSON:
-        ensure_weather_json(WEATHER_JSON_PATH)
+        ensure_weather_json(cfg.weather_json_path)
         weather_records = load_weather_data_from_json(
-            WEATHER_JSON_PATH, start_date=START_DATE, end_date=END_DATE
+            cfg.weather_json_path, start_date=start_date, end_date=end_date
         )
 
         if weather_records:
@@ -602,517 +872,289 @@ def main():
 
     # API mode (if USE_MANUAL_JSON = False)
     if not USE_MANUAL_JSON:
-        today = datetime.now().date()
-        archive_end = min(END_DATE, today - timedelta(days=2))
-        if archive_end >= START_DATE:
-            try:
-                arc = fetch_archive(START_DATE, archive_end)
-                for d_str, w, g, wd, v in zip(
-                    arc["dates"],
-                    arc["wind_max_kn"],
-                    arc["gust_max_kn"],
-                    arc["wind_dir_deg"],
-                    arc["vis_min_km"],
-                ):
-                    d = date.fromisoformat(d_str)
-                    if d in idx:
-                        i = idx[d]
-                        wind_kn[i], gust_kn[i], wdir_deg[i], vis_km[i] = w, g, wd, v
-                        coverage[i] = "ARCHIVE"
-            except Exception:
-                pass
-
-        remaining_start = max(START_DATE, today - timedelta(days=1))
-        if remaining_start <= END_DATE:
-            model_payloads = []
-            for name, url in MODEL_URLS.items():
-                try:
-                    model_payloads.append(
-                        fetch_weather_model(name, url, remaining_start, END_DATE)
-                    )
-                except Exception:
-                    pass
-
-            for d in days:
-                if d < remaining_start:
-                    continue
-                i = idx[d]
-                d_str = d.isoformat()
-
-                w_list, g_list, wd_list, v_list = [], [], [], []
-                for p in model_payloads:
-                    if d_str in p["dates"]:
-                        k = p["dates"].index(d_str)
-                        w_list.append(p["wind_max_kn"][k])
-                        g_list.append(p["gust_max_kn"][k])
-                        wd_list.append(p["wind_dir_deg"][k])
-                        v_list.append(p["vis_min_km"][k])
-
-                if coverage[i] != "ARCHIVE":
-                    if w_list:
-                        wind_kn[i] = float(np.nanmean(w_list))
-                        gust_kn[i] = float(np.nanmean(g_list)) if g_list else np.nan
-                        wdir_deg[i] = float(np.nanmean(wd_list)) if wd_list else np.nan
-                        vis_km[i] = float(np.nanmean(v_list)) if v_list else np.nan
-                        coverage[i] = "FORECAST_ENSEMBLE"
-
-        try:
-            mw = fetch_marine_waves(START_DATE, END_DATE)
-            for d_str, wv in zip(mw["dates"], mw["wave_max_m"]):
-                d = date.fromisoformat(d_str)
-                if d in idx:
-                    wave_m[idx[d]] = wv
-        except Exception:
-            pass
-
-        missing = np.isnan(wind_kn)
-        if missing.any():
-            try:
-                clim = fetch_climate_wind_max(START_DATE, END_DATE)
-                clim_map = {
-                    date.fromisoformat(t): v
-                    for t, v in zip(clim["dates"], clim["wind_max_kn"])
-                }
-                for d in days:
-                    i = idx[d]
-                    if np.isnan(wind_kn[i]) and d in clim_map:
-                        wind_kn[i] = float(clim_map[d])
-                        coverage[i] = "CLIMATE_FILL"
-            except Exception:
-                pass
+        sources = fetch_api_sources(
+            start_date, end_date, datetime.now().date(), use_store=cfg.use_store
+        )
+        hourly = merge_api_sources(
+            sources, days, wind_kn, gust_kn, wdir_deg, vis_km, wave_m, coverage
+        )
 
     # Gap fill
     print("\n[INFO] Checking data completeness...")
     missing_count = np.sum(np.isnan(wind_kn))
     if missing_count > 0:
         print(f"   [WARN] {missing_count} days of data are missing.")
-
-        for i in range(n):
-            if np.isnan(wind_kn[i]):
-                prev_val = (
-                    wind_kn[i - 1] if i > 0 and not np.isnan(wind_kn[i - 1]) else None
-                )
-                next_val = (
-                    wind_kn[i + 1]
-                    if i < n - 1 and not np.isnan(wind_kn[i + 1])
-                    else None
-                )
-
-                if prev_val is not None and next_val is not None:
-                    wind_kn[i] = (prev_val + next_val) / 2
-                    gust_kn[i] = (
-                        wind_kn[i] * 1.3 if np.isnan(gust_kn[i]) else gust_kn[i]
-                    )
-                    coverage[i] = "INTERPOLATED"
-                elif prev_val is not None:
-                    wind_kn[i] = prev_val
-                    gust_kn[i] = (
-                        wind_kn[i] * 1.3 if np.isnan(gust_kn[i]) else gust_kn[i]
-                    )
-                    coverage[i] = "INTERPOLATED"
-                elif next_val is not None:
-                    wind_kn[i] = next_val
-                    gust_kn[i] = (
-                        wind_kn[i] * 1.3 if np.isnan(gust_kn[i]) else gust_kn[i]
-                    )
-                    coverage[i] = "INTERPOLATED"
-                else:
-                    wind_kn[i] = 12.0
-                    gust_kn[i] = 15.0
-                    coverage[i] = "DEFAULT"
-
-            if np.isnan(wave_m[i]) and not np.isnan(wind_kn[i]):
-                wave_m[i] = float(np.clip(wind_kn[i] * 0.04, 0.30, 2.50))
-
-            if np.isnan(vis_km[i]):
-                vis_km[i] = 8.00
-
-            if np.isnan(gust_kn[i]) and not np.isnan(wind_kn[i]):
-                gust_kn[i] = wind_kn[i] * 1.30
-
-    # Calculate risk
-    risk = calc_risk_score(wind_kn, gust_kn, wave_m, vis_km)
-    status = [op_status_from_score(s) for s in risk]
-    shamal = np.array(
-        [is_shamal_day(wdir_deg[i], wind_kn[i], gust_kn[i]) for i in range(n)],
-        dtype=bool,
+    wind_kn, gust_kn, wave_m, vis_km, coverage = gap_fill_daily(
+        wind_kn, gust_kn, wave_m, vis_km, coverage
     )
 
-    risk_map = {"LOW": 20.0, "MEDIUM": 45.0, "HIGH": 75.0}
-    for i, level in enumerate(risk_level_override):
-        if level is None:
-            continue
-        level_key = str(level).strip().upper()
-        if level_key in risk_map:
-            risk[i] = risk_map[level_key]
-            status[i] = op_status_from_score(risk[i])
-
-    for i, val in enumerate(shamal_override):
-        if val is not None:
-            shamal[i] = parse_bool(val)
-
-    if MANUAL_SHAMAL_PERIODS:
-        for s, e in MANUAL_SHAMAL_PERIODS:
-            for d in days:
-                if s <= d <= e:
-                    shamal[idx[d]] = True
-
-    # =====================================================
-    # DASHBOARD-OPTIMIZED VISUALIZATION
-    # =====================================================
-    theme = DASHBOARD_THEME
-
-    # Set dark theme for matplotlib
-    mpl.rcParams.update(
-        {
-            "font.family": "sans-serif",
-            "font.sans-serif": ["Arial", "DejaVu Sans", "Helvetica"],
-            "axes.unicode_minus": False,
-            "figure.dpi": 150,
-            "axes.titlesize": 12,
-            "axes.labelsize": 10,
-            "xtick.labelsize": 9,
-            "ytick.labelsize": 9,
-            "axes.facecolor": theme["bg_secondary"],
-            "axes.edgecolor": theme["grid_color"],
-            "axes.labelcolor": theme["text_primary"],
-            "axes.titlecolor": theme["text_primary"],
-            "xtick.color": theme["text_secondary"],
-            "ytick.color": theme["text_secondary"],
-            "text.color": theme["text_primary"],
-            "figure.facecolor": theme["bg_primary"],
-            "axes.grid": True,
-            "grid.color": theme["grid_color"],
-            "grid.alpha": 0.3,
-            "grid.linewidth": 0.5,
-            "axes.spines.top": False,
-            "axes.spines.right": False,
-        }
+    # Calculate risk
+    risk, status, shamal = compute_daily_risk(
+        days,
+        wind_kn,
+        gust_kn,
+        wave_m,
+        vis_km,
+        wdir_deg,
+        risk_level_override,
+        shamal_override,
+        MANUAL_SHAMAL_PERIODS,
     )
+    hourly_risk = None
+    if hourly is not None:
+        hourly_risk = hourly_risk_matrix(
+            hourly["hourly_wind_kn"],
+            hourly["hourly_gust_kn"],
+            hourly["hourly_wave_m"],
+            hourly["hourly_vis_km"],
+            daily=(wind_kn, gust_kn, wave_m, vis_km),
+        )
 
-    # Heatmap parameters
-    params = [
-        "Risk (0-100)",
-        "Dir (deg)",
-        "Vis (km)",
-        "Wave (m)",
-        "Gust (kt)",
-        "Wind (kt)",
-    ]
-    data_matrix = np.vstack([risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn])
-
-    # Fixed ranges for normalization
-    ranges = [
-        (0.0, 100.0),  # risk
-        (0.0, 360.0),  # dir deg
-        (0.0, 10.0),  # vis km
-        (0.0, 2.5),  # wave m
-        (0.0, 30.0),  # gust kn
-        (0.0, 25.0),  # wind kn
-    ]
+    return {
+        "days": days,
+        "risk": risk,
+        "status": status,
+        "shamal": shamal,
+        "coverage": coverage,
+        "wind_kn": wind_kn,
+        "gust_kn": gust_kn,
+        "wave_m": wave_m,
+        "vis_km": vis_km,
+        "wdir_deg": wdir_deg,
+        "hourly_risk": hourly_risk,
+    }
 
-    data_norm = np.zeros_like(data_matrix, dtype=float)
-    for r, (mn, mx) in enumerate(ranges):
-        data_norm[r] = np.clip((data_matrix[r] - mn) / (mx - mn + 1e-9), 0.0, 1.0)
 
-    cmap = LinearSegmentedColormap.from_list("dashboard_risk", theme["cmap"], N=256)
+def main(config: DashboardConfig | None = None):
+    cfg = config or replace(resolve_config(), use_store=store_enabled())
+    options = http_options()
+    if not USE_MANUAL_JSON:
+        configure_http(**options)
+    w = compute_window(cfg)
+    days, risk, status, shamal = w["days"], w["risk"], w["status"], w["shamal"]
+    coverage, hourly_risk = w["coverage"], w["hourly_risk"]
+    wind_kn, gust_kn, wave_m = w["wind_kn"], w["gust_kn"], w["wave_m"]
+    vis_km, wdir_deg = w["vis_km"], w["wdir_deg"]
+    voyages = current_voyages()
+
+    # Data-only outputs (--format json,svg) next to the PNG path; skip matplotlib without png
+    formats = output_formats()
+    if formats & {"json", "svg"}:
+        from weather_heatmap_export import (
+            heatmap_payload,
+            write_heatmap_json,
+            write_heatmap_svg,
+        )
 
-    # Compact figure size for mobile/web; 50% transparency (alpha=0.5) for figure/axes
-    fig = plt.figure(figsize=(12, 8))
-    fig.patch.set_facecolor(theme["bg_primary"])
-    fig.patch.set_alpha(0.5)
+        payload = heatmap_payload(
+            days,
+            risk,
+            status,
+            shamal,
+            coverage,
+            wind_kn,
+            gust_kn,
+            wave_m,
+            vis_km,
+            wdir_deg,
+            voyages,
+            hourly_risk=hourly_risk,
+        )
+        out_base = os.path.splitext(cfg.output_path)[0]
+        if "json" in formats:
+            write_heatmap_json(out_base + ".json", payload)
+            print(f"\n[OK] Heatmap data JSON -> {out_base}.json")
+        if "svg" in formats:
+            write_heatmap_svg(out_base + ".svg", payload, DASHBOARD_THEME)
+            print(f"[OK] Heatmap SVG -> {out_base}.svg")
+    if "png" not in formats:
+        return
 
-    gs = fig.add_gridspec(
-        3,
-        2,
-        height_ratios=[2.0, 1.0, 0.6],
-        width_ratios=[1, 0.04],
-        hspace=0.25,
-        wspace=0.03,
+    # Render cache: identical inputs -> reuse the stored PNG (skip with --no-cache)
+    render_cache = ResultCache("heatmap", enabled=options["use_cache"])
+    render_key = content_hash(
+        np.array(days, dtype="datetime64[D]"),
+        np.vstack([risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn]),
+        status,
+        shamal,
+        coverage.astype(str),
+        voyages,
+        DASHBOARD_THEME,
+        hourly_risk if hourly_risk is not None else [],
     )
+    cached = render_cache.get(render_key)
+    if cached is not None:
+        with open(cfg.output_path, "wb") as f:
+            f.write(base64.b64decode(cached["png_b64"]))
+        print(f"\n[OK] Dashboard Heatmap unchanged (cache hit) -> {cfg.output_path}")
+        return
 
-    ax1 = fig.add_subplot(gs[0, 0])
-    ax2 = fig.add_subplot(gs[1, 0], sharex=ax1)
-    ax3 = fig.add_subplot(gs[2, 0], sharex=ax1)
-    ax_cbar = fig.add_subplot(gs[0, 1])
-
-    for ax in (ax1, ax2, ax3, ax_cbar):
-        ax.set_facecolor(theme["bg_secondary"])
-        ax.patch.set_alpha(0.5)
-
-    # Date labels: "DD Mon" format for consistency with Weather & Marine Risk block
-    date_labels = [d.strftime("%d %b") for d in days]
-    x_limits = (-0.5, n - 0.5)
-    tick_step = max(1, n // 8)
-    x_ticks = list(range(0, n, tick_step))
-    x_tick_labels = [date_labels[i] for i in x_ticks]
-    # Daily Operation Status: show ALL dates (one per bar) for date sync
-    ax3_ticks = list(range(n))
-    ax3_tick_labels = date_labels
-
-    # Heatmap
-    im = ax1.imshow(
-        data_norm,
-        aspect="auto",
-        cmap=cmap,
-        interpolation="nearest",
-        extent=[-0.5, n - 0.5, -0.5, len(params) - 0.5],
+    from weather_heatmap_render import render_heatmap
+
+    summary = render_heatmap(
+        cfg.output_path,
+        days,
+        risk,
+        status,
+        shamal,
+        coverage,
+        wind_kn,
+        gust_kn,
+        wave_m,
+        vis_km,
+        wdir_deg,
+        voyages,
+        DASHBOARD_THEME,
+        hourly_risk=hourly_risk,
     )
 
-    ax1.set_yticks(range(len(params)))
-    ax1.set_yticklabels(
-        params, fontsize=10, fontweight="bold", color=theme["text_primary"]
-    )
-    ax1.set_xlim(x_limits)
-    ax1.set_xticks(x_ticks)
-    ax1.tick_params(labelbottom=False)
-    ax1.grid(False)
-
-    # Annotate values
-    for r in range(len(params)):
-        for c in range(n):
-            val = data_matrix[r, c]
-            if np.isnan(val):
-                continue
-            if r in [0, 1, 4, 5]:
-                txt = f"{val:.0f}"
-            else:
-                txt = f"{val:.1f}"
-            # High contrast text
-            color_txt = (
-                theme["text_primary"] if data_norm[r, c] > 0.5 else theme["bg_primary"]
-            )
-            ax1.text(
-                c,
-                r,
-                txt,
-                ha="center",
-                va="center",
-                fontsize=9,
-                color=color_txt,
-                fontweight="bold",
-            )
+    with open(cfg.output_path, "rb") as f:
+        render_cache.put(
+            render_key, {"png_b64": base64.b64encode(f.read()).decode("ascii")}
+        )
 
-    # Colorbar
-    cbar = fig.colorbar(im, cax=ax_cbar, orientation="vertical", aspect=30)
-    cbar.set_label(
-        "Normalized (fixed ranges)", fontsize=9, color=theme["text_secondary"]
-    )
-    cbar.ax.yaxis.set_tick_params(color=theme["text_secondary"])
-    cbar.outline.set_edgecolor(theme["grid_color"])
-    plt.setp(plt.getp(cbar.ax.axes, "yticklabels"), color=theme["text_secondary"])
-
-    # Risk timeline
-    ax2.fill_between(range(n), risk, alpha=0.3, color=theme["accent_primary"])
-    ax2.plot(
-        range(n), risk, "o-", linewidth=2, markersize=5, color=theme["accent_primary"]
+    print(f"\n[OK] Dashboard Heatmap generated -> {cfg.output_path}")
+    print(
+        f"   GO/HOLD/NO-GO: {summary['go']}/{summary['hold']}/{summary['nogo']} (days)"
     )
+    print(f"   Detected Shamal days: {summary['shamal']}")
+    print(f"   Coverage: {summary['coverage']}")
 
-    # Risk bands
-    ax2.axhspan(0, 30, color=theme["risk_band"]["GO"], zorder=0)
-    ax2.axhspan(30, 60, color=theme["risk_band"]["HOLD"], zorder=0)
-    ax2.axhspan(60, 100, color=theme["risk_band"]["NO-GO"], zorder=0)
-
-    ax2.axhline(
-        y=30,
-        linestyle="--",
-        linewidth=1.5,
-        color=theme["status"]["GO"],
-        label="GO Threshold (30)",
-    )
-    ax2.axhline(
-        y=60,
-        linestyle="--",
-        linewidth=1.5,
-        color=theme["status"]["NO-GO"],
-        label="NO-GO Threshold (60)",
-    )
 
-    # Voyage overlays
-    voyage_colors = theme["voyage"]
-    for v in VOYAGES:
-        if v["end"] < START_DATE or v["start"] > END_DATE:
-            continue
-        s = max(v["start"], START_DATE)
-        e = min(v["end"], END_DATE)
-        xs = idx[s]
-        xe = idx[e]
-        color = voyage_colors.get(v["type"], voyage_colors["default"])
-        ax2.axvspan(xs, xe, alpha=0.15, color=color, zorder=0)
-        mid = (xs + xe) / 2
-        ax2.text(
-            mid,
-            85,
-            f'{v["name"]}\n{v["label"]}',
-            ha="center",
-            va="top",
-            fontsize=9,
-            fontweight="bold",
-            color=color,
-            bbox=dict(
-                boxstyle="round,pad=0.3",
-                facecolor=theme["bg_card"],
-                alpha=0.9,
-                edgecolor=color,
-                linewidth=1.5,
-            ),
-        )
+def main_batch(first: date, last: date, workers: int = 0) -> list[str]:
+    """
+    Render one 4-day heatmap per anchor date from first to last (inclusive).
 
-    ax2.set_xlim(x_limits)
-    ax2.set_ylim(0, 100)
-    ax2.set_xticks(x_ticks)
-    ax2.tick_params(labelbottom=False)
-    ax2.set_ylabel(
-        "Risk Score (0-100)",
-        fontsize=10,
-        fontweight="bold",
-        color=theme["text_primary"],
-    )
-    ax2.set_title(
-        "Composite Weather Risk Score (Ensemble + Marine + Archive/Climate)",
-        fontsize=11,
-        fontweight="bold",
-        color=theme["accent_secondary"],
-        pad=10,
-    )
-    ax2.legend(
-        loc="upper right",
-        fontsize=8,
-        framealpha=0.9,
-        facecolor=theme["bg_card"],
-        edgecolor=theme["grid_color"],
-        labelcolor=theme["text_secondary"],
-    )
+    Windows are scored first, then drawn by render_heatmap_batch, which
+    reuses one figure instead of rebuilding it for every snapshot.
 
-    # Status summary box
-    go_n = status.count("GO")
-    hold_n = status.count("HOLD")
-    nogo_n = status.count("NO-GO")
-    shamal_n = int(shamal.sum())
-
-    stats_text = (
-        f"Weather Analysis Summary\n"
-        f"{'─'*24}\n"
-        f"Period: {START_DATE.isoformat()} to {END_DATE.isoformat()} ({n} days)\n"
-        f"GO Days: {go_n} ({go_n/n*100:.2f}%)\n"
-        f"HOLD Days: {hold_n} ({hold_n/n*100:.2f}%)\n"
-        f"NO-GO Days: {nogo_n} ({nogo_n/n*100:.2f}%)\n"
-        f"Shamal Detected Days (NW+Strong): {shamal_n}\n"
-        f"Max Gust (kt): {np.nanmax(gust_kn):.2f}\n"
-        f"Max Wave (m): {np.nanmax(wave_m):.2f}\n"
-    )
-    stats_box = AnchoredText(
-        stats_text,
-        loc="lower left",
-        prop={
-            "size": 8,
-            "family": "monospace",
-            "weight": "bold",
-            "color": theme["text_primary"],
-        },
-        pad=0.8,
-        borderpad=0.8,
-        frameon=True,
-    )
-    stats_box.patch.set_facecolor(theme["bg_card"])
-    stats_box.patch.set_alpha(0.1)  # 90% transparency
-    stats_box.patch.set_edgecolor(theme["accent_primary"])
-    stats_box.patch.set_linewidth(1.5)
-    ax2.add_artist(stats_box)
-
-    # Data coverage box
-    cov_counts = {k: int(np.sum(coverage == k)) for k in np.unique(coverage) if k}
-    cov_lines = "\n".join([f"{k}: {v}" for k, v in cov_counts.items()])
-    cov_text = f"Data Coverage\n{'─'*14}\n{cov_lines}\n\nNote: CLIMATE FILL is modelled baseline, not actual measurement."
-    cov_box = AnchoredText(
-        cov_text,
-        loc="lower right",
-        prop={"size": 7, "family": "monospace", "color": theme["text_secondary"]},
-        pad=0.8,
-        borderpad=0.8,
-        frameon=True,
-    )
-    cov_box.patch.set_facecolor(theme["bg_card"])
-    cov_box.patch.set_alpha(0.1)  # 90% transparency
-    cov_box.patch.set_edgecolor(theme["accent_secondary"])
-    cov_box.patch.set_linewidth(1)
-    ax1.add_artist(cov_box)
-
-    # Operation status bar
-    status_colors = theme["status"]
-    bars = ax3.bar(
-        range(n),
-        [1] * n,
-        width=0.9,
-        color=[status_colors[s] for s in status],
-        edgecolor=theme["bg_primary"],
-        linewidth=1,
-    )
+    Returns:
+        Written PNG paths (out/heatmaps/weather_4day_heatmap_YYYYMMDD.png)
+    """
+    from weather_heatmap_render import render_heatmap_batch
 
-    ax3.set_xlim(x_limits)
-    ax3.set_ylim(0, 1.3)
-    # Daily Operation Status: all dates shown (one per bar) for date sync with heatmap
-    ax3.set_xticks(ax3_ticks)
-    ax3.set_xticklabels(
-        ax3_tick_labels,
-        rotation=0,
-        ha="center",
-        fontsize=10,
-        color=theme["text_primary"],
-        fontweight="bold",
-    )
-    ax3.tick_params(axis="x", pad=8)
-    ax3.set_yticks([])
-    ax3.set_title(
-        "Daily Operation Status (GO / HOLD / NO-GO)",
-        fontsize=11,
-        fontweight="bold",
-        color=theme["accent_gold"],
-        pad=10,
+    if not USE_MANUAL_JSON:
+        configure_http(**http_options())
+    use_store = store_enabled()
+    out_dir = os.path.join(SCRIPT_DIR, "out", "heatmaps")
+    os.makedirs(out_dir, exist_ok=True)
+    windows = []
+    for anchor in daterange(first, last):
+        cfg = resolve_config(anchor)
+        cfg.output_path = os.path.join(
+            out_dir, f"weather_4day_heatmap_{anchor.strftime('%Y%m%d')}.png"
+        )
+        cfg.use_store = use_store
+        windows.append(dict(compute_window(cfg), output_path=cfg.output_path))
+
+    summaries = render_heatmap_batch(windows, current_voyages(), DASHBOARD_THEME, workers=workers)
+    for w, summary in zip(windows, summaries):
+        print(
+            f"[OK] {w['output_path']} GO/HOLD/NO-GO: "
+            f"{summary['go']}/{summary['hold']}/{summary['nogo']}"
+        )
+    return [w["output_path"] for w in windows]
+
+
+def compute_sites(cfg: DashboardConfig, sites: dict[str, tuple[float, float]]) -> dict:
+    """
+    Fetch and score all sites for one window (API data, one request per source).
+
+    Returns:
+        (sites x days) arrays: risk, status (nested lists), shamal, coverage,
+        wind_kn, gust_kn, wave_m, vis_km, wdir_deg; plus days and the
+        per-voyage worst cases
+    """
+    days = daterange(cfg.start_date, cfg.end_date)
+    per_site = fetch_api_sources(
+        cfg.start_date,
+        cfg.end_date,
+        datetime.now().date(),
+        sites=list(sites.values()),
+        use_store=cfg.use_store,
     )
-    ax3.grid(False)
-
-    # Legend
-    go_patch = mpatches.Patch(color=status_colors["GO"], label="GO (Risk < 30)")
-    hold_patch = mpatches.Patch(color=status_colors["HOLD"], label="HOLD (30-60)")
-    nogo_patch = mpatches.Patch(color=status_colors["NO-GO"], label="NO-GO (>=60)")
-    ax3.legend(
-        handles=[go_patch, hold_patch, nogo_patch],
-        loc="upper left",
-        ncol=3,
-        fontsize=9,
-        framealpha=0.9,
-        facecolor=theme["bg_card"],
-        edgecolor=theme["grid_color"],
-        labelcolor=theme["text_primary"],
+    shape = (len(sites), len(days))
+    wind_kn, gust_kn, wdir_deg, vis_km, wave_m = (np.full(shape, np.nan) for _ in range(5))
+    coverage = np.full(shape, "", dtype=object)
+    for i, sources in enumerate(per_site):
+        merge_api_sources(
+            sources, days, wind_kn[i], gust_kn[i], wdir_deg[i], vis_km[i], wave_m[i], coverage[i]
+        )
+        wind_kn[i], gust_kn[i], wave_m[i], vis_km[i], coverage[i] = gap_fill_daily(
+            wind_kn[i], gust_kn[i], wave_m[i], vis_km[i], coverage[i]
+        )
+
+    # One vectorized pass over the (sites x days) stack
+    risk, status, shamal = compute_daily_risk(
+        days,
+        wind_kn,
+        gust_kn,
+        wave_m,
+        vis_km,
+        wdir_deg,
+        manual_shamal_periods=MANUAL_SHAMAL_PERIODS,
     )
+    return {
+        "days": days,
+        "risk": risk,
+        "status": status,
+        "shamal": shamal,
+        "coverage": coverage,
+        "wind_kn": wind_kn,
+        "gust_kn": gust_kn,
+        "wave_m": wave_m,
+        "vis_km": vis_km,
+        "wdir_deg": wdir_deg,
+        "voyages": voyage_worst_case(days, risk, shamal, current_voyages(), list(sites)),
+    }
 
-    # Shamal highlight
-    for i in range(n):
-        if shamal[i]:
-            for ax in (ax1, ax2, ax3):
-                ax.axvspan(
-                    i - 0.5, i + 0.5, alpha=0.15, color=theme["shamal"], zorder=0
-                )
-
-    plt.subplots_adjust(left=0.08, right=0.94, top=0.94, bottom=0.10)
-
-    # Save with 50% transparent background (alpha=0.5) for HTML overlay
-    plt.savefig(
-        OUTPUT_PATH,
-        dpi=150,
-        bbox_inches="tight",
-        facecolor="none",
-        edgecolor="none",
-        transparent=True,
+
+def main_sites(config: DashboardConfig | None = None, sites: dict | None = None) -> dict:
+    """Multi-site run (always API data): writes out/weather_sites.json and prints voyage worst cases"""
+    from weather_heatmap_export import sites_payload, write_heatmap_json
+
+    cfg = config or replace(resolve_config(), use_store=store_enabled())
+    sites = sites or SITES
+    configure_http(**http_options())
+    result = compute_sites(cfg, sites)
+    payload = sites_payload(
+        sites,
+        result["days"],
+        result["risk"],
+        result["status"],
+        result["shamal"],
+        result["coverage"],
+        result["voyages"],
     )
-    plt.close()
+    out_path = os.path.join(os.path.dirname(cfg.output_path) or ".", "weather_sites.json")
+    write_heatmap_json(out_path, payload)
 
-    print(f"\n[OK] Dashboard Heatmap generated -> {OUTPUT_PATH}")
-    print(f"   GO/HOLD/NO-GO: {go_n}/{hold_n}/{nogo_n} (days)")
-    print(f"   Detected Shamal days: {shamal_n}")
-    print(f"   Coverage: {cov_counts}")
+    print(
+        f"[INFO] Sites: {', '.join(sites)} | "
+        f"{cfg.start_date.isoformat()} ~ {cfg.end_date.isoformat()}"
+    )
+    for name, status in zip(sites, result["status"]):
+        print(f"   {name}: {' '.join(status)}")
+    for v in result["voyages"]:
+        print(
+            f"   {v['name']} ({v['label']}): worst {v['worst_risk']:.0f} {v['status']} "
+            f"at {v['site']} on {v['date'].isoformat()}"
+        )
+    print(f"[OK] Multi-site risk JSON -> {out_path}")
+    return result
 
 
 if __name__ == "__main__":
-    main()
+    # Batch snapshots: --batch YYYY-MM-DD:YYYY-MM-DD [--workers N]
+    batch = argv_value("--batch")
+    if batch:
+        first, _, last = batch.partition(":")
+        main_batch(
+            date.fromisoformat(first),
+            date.fromisoformat(last or first),
+            workers=int(argv_value("--workers") or 0),
+        )
+    elif "--sites" in sys.argv:
+        main_sites()
+    else:
+        main()
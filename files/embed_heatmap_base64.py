@@ -6,12 +6,22 @@ from pathlib import Path
 
 FILES_DIR = Path(__file__).resolve().parent
 
-# 1) files/out/weather_4day_heatmap.png
+# 1) files/out/weather_4day_heatmap.png (or the lighter .svg from --format svg, if newer)
 png_out = FILES_DIR / "out" / "weather_4day_heatmap.png"
-if png_out.is_file():
+svg_out = png_out.with_suffix(".svg")
+if svg_out.is_file() and (
+    not png_out.is_file() or svg_out.stat().st_mtime >= png_out.stat().st_mtime
+):
+    with open(svg_out, "rb") as f:
+        b64 = base64.standard_b64encode(f.read()).decode("ascii")
+    data_uri = "data:image/svg+xml;base64," + b64
+elif png_out.is_file():
     with open(png_out, "rb") as f:
         b64 = base64.standard_b64encode(f.read()).decode("ascii")
     data_uri = "data:image/png;base64," + b64
+else:
+    data_uri = None
+if data_uri:
     for path in sorted(FILES_DIR.glob("AGI TR SCHEDULE_*.html")):
         with open(path, "r", encoding="utf-8") as f:
             html = f.read()
@@ -23,7 +33,7 @@ if png_out.is_file():
                 f.write(html)
             print("Updated (out/heatmap)", path.name)
 else:
-    print("Skipped: files/out/weather_4day_heatmap.png not found")
+    print("Skipped: files/out/weather_4day_heatmap.png/.svg not found")
 
 # 2) files/weather_4day_heatmap_dashboard.png
 png_dash = FILES_DIR / "weather_4day_heatmap_dashboard.png"
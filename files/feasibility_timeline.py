@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""
+Joint tide + weather feasibility timeline per voyage.
+
+Tide (sub-hourly curve from tide_interp, MINA ZAYED local time) and weather
+(Gate-A/Gate-B masks from weather_go_nogo) are placed on one UTC grid at the
+tide step. Each activity rule (sea transit, load-out, load-in) turns them
+into a reason-code bitmask per grid point in a single [rules x grid] array
+operation; zero means feasible. Feasible runs are run-length encoded once
+for all rules, and every planned SSOT activity only binary-searches its
+plan window in them, so the dashboard gets one "when can we actually go"
+answer per voyage instead of separate tide and weather tables.
+
+CLI (from files/):
+    python feasibility_timeline.py [--weather weather_forecast_sample.json]
+                                   [--ssot PATH] [--step 10] [--output out/feasibility_timeline.json]
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_cache import FILES_DIR
+from ssot_voyage_index import (
+    DEFAULT_SSOT_PATH,
+    SEA_TRANSIT_PATTERN,
+    SEA_TRANSIT_TYPE,
+    planned_activities,
+)
+from tide_interp import DEFAULT_STEP_MIN, TIDE_CSV, tide_curve
+from tide_windows import DEFAULT_MIN_HOURS, DEFAULT_THRESHOLDS_M, DEFAULT_WORK_HOURS
+from weather_go_nogo import (
+    REASON_CODE_BITS,
+    GoNoGoLimits,
+    compute_gate_masks,
+    load_forecast_arrays,
+    to_datetime64,
+)
+
+DEFAULT_WEATHER_JSON = FILES_DIR / "weather_forecast_sample.json"
+DEFAULT_OUTPUT_JSON = FILES_DIR / "out" / "feasibility_timeline.json"
+# WATER TIDE.csv is in local time (Asia/Dubai, UTC+4, no DST)
+TIDE_UTC_OFFSET = np.timedelta64(4 * 60, "m")
+
+# Joint reason-code bits: weather bits from weather_go_nogo, then tide/calendar
+FEASIBILITY_BITS = {
+    **REASON_CODE_BITS,
+    "WX_NO_FORECAST": 1 << 8,
+    "TIDE_LOW": 1 << 9,
+    "TIDE_NO_DATA": 1 << 10,
+    "OUTSIDE_WORK_HOURS": 1 << 11,
+    # Not a grid bit: every plan sample is feasible but the run is under min_hours
+    "WINDOW_INSUFFICIENT": 1 << 12,
+}
+GATE_A_BITS = REASON_CODE_BITS["WX_WAVE"] | REASON_CODE_BITS["WX_WIND"]
+
+
+@dataclass(frozen=True)
+class ActivityRule:
+    """Which constraints an activity type needs"""
+    name: str
+    pattern: str  # Regex on the SSOT activity title
+    weather: str | None  # "go" (Gate-A + Gate-B), "gate_a" or None
+    tide_min_m: float | None  # Minimum tide height; None = tide independent
+    work_hours: tuple[int, int] | None  # Local hours, inclusive; None = any time
+    min_hours: float  # Shortest usable continuous window
+    type_id: str | None = None  # SSOT activity type_id; None = any type
+
+
+@dataclass
+class PlannedActivity:
+    """SSOT activity matched to a rule"""
+    voyage: str
+    activity_id: str
+    title: str
+    rule: str
+    start: np.datetime64  # UTC, inclusive
+    end: np.datetime64  # UTC, inclusive
+
+
+@dataclass
+class FeasibilityTimeline:
+    """Reason-code bitmasks per rule on the common UTC grid"""
+    grid: np.ndarray  # datetime64[m] UTC
+    step_min: int
+    rules: tuple[ActivityRule, ...]
+    codes: np.ndarray  # uint16 [rules x grid], 0 = feasible
+    run_start: list[np.ndarray]  # Per rule: grid index of each feasible run start
+    run_end: list[np.ndarray]  # Per rule: grid index one past each run end
+
+    @property
+    def feasible(self) -> np.ndarray:
+        return self.codes == 0
+
+    def rule_index(self, name: str) -> int:
+        return [r.name for r in self.rules].index(name)
+
+
+def default_rules(limits: GoNoGoLimits | None = None) -> tuple[ActivityRule, ...]:
+    """Sea transit on the weather gates; RoRo load-out/load-in on tide + Gate-A in working hours."""
+    limits = limits or GoNoGoLimits()
+    tide_min = DEFAULT_THRESHOLDS_M[0]
+    transit_hr = limits.SailingTime_hr + limits.Reserve_hr
+    roro = dict(
+        type_id="loading",
+        weather="gate_a",
+        tide_min_m=tide_min,
+        work_hours=DEFAULT_WORK_HOURS,
+        min_hours=DEFAULT_MIN_HOURS,
+    )
+    return (
+        ActivityRule(
+            "sea_transit",
+            SEA_TRANSIT_PATTERN.pattern,
+            "go",
+            None,
+            None,
+            transit_hr,
+            type_id=SEA_TRANSIT_TYPE,
+        ),
+        ActivityRule("load_out", r"\bload-out\b", **roro),
+        ActivityRule("load_in", r"\bload-in\b", **roro),
+    )
+
+
+def load_planned_activities(
+    rules: tuple[ActivityRule, ...], ssot_path: str = DEFAULT_SSOT_PATH
+) -> list[PlannedActivity]:
+    """
+    SSOT activities whose type and title match a rule (first match wins), by
+    trip and start. Uses the same walker as the step-4 sea-transit legs.
+    """
+    patterns = [(rule, re.compile(rule.pattern, re.I)) for rule in rules]
+    planned = []
+    for trip_id, activity_id, activity, start_ts, end_ts in planned_activities(ssot_path):
+        title = activity.get("title", "")
+        rule = next(
+            (
+                r.name
+                for r, p in patterns
+                if (r.type_id is None or activity.get("type_id") == r.type_id) and p.search(title)
+            ),
+            None,
+        )
+        if rule is None:
+            continue
+        start, end = to_datetime64([start_ts, end_ts])
+        planned.append(PlannedActivity(trip_id, activity_id, title, rule, start, end))
+    planned.sort(key=lambda a: (a.voyage, a.start))
+    return planned
+
+
+def weather_on_grid(
+    grid: np.ndarray, timestamps, wave_ft, wind_kt, limits: GoNoGoLimits
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gate-A and Gate-B reason bits of the forecast entry holding each grid point.
+
+    Each entry holds until the next timestamp (the last one for the previous
+    spacing), as in Gate-C.
+
+    Returns:
+        (gate_a_bits, gate_b_bits, covered) per grid point
+    """
+    ts = to_datetime64(timestamps).astype("datetime64[m]")
+    masks = compute_gate_masks(wave_ft, wind_kt, limits, use_gate_b=True)
+    if ts.size == 0:
+        zeros = np.zeros(grid.shape, dtype=np.uint16)
+        return zeros, zeros, np.zeros(grid.shape, dtype=bool)
+    step = ts[-1] - ts[-2] if ts.size > 1 else np.timedelta64(60, "m")
+    bucket_end = np.append(ts[1:], ts[-1] + step)
+    idx = np.searchsorted(ts, grid, side="right") - 1
+    safe = np.maximum(idx, 0)
+    covered = (idx >= 0) & (grid < bucket_end[safe])
+    gate_a = np.where(covered, masks.gate_a_codes[safe], 0).astype(np.uint16)
+    gate_b = np.where(covered, masks.gate_b_codes[safe], 0).astype(np.uint16)
+    return gate_a, gate_b, covered
+
+
+def _feasible_runs(feasible: np.ndarray, linked: np.ndarray) -> tuple[list, list]:
+    """Run starts/ends (exclusive) per row of a [rules x grid] mask; linked[k]: k continues into k+1."""
+    n_rules = feasible.shape[0]
+    cont = np.zeros(feasible.shape, dtype=bool)
+    cont[:, :-1] = feasible[:, :-1] & feasible[:, 1:] & linked[None, :]
+    prev = np.zeros(feasible.shape, dtype=bool)
+    prev[:, 1:] = cont[:, :-1]
+    rows_s, starts = np.nonzero(feasible & ~prev)
+    rows_e, ends = np.nonzero(feasible & ~cont)
+    split_s = np.searchsorted(rows_s, np.arange(1, n_rules))
+    split_e = np.searchsorted(rows_e, np.arange(1, n_rules))
+    return np.split(starts, split_s), [e + 1 for e in np.split(ends, split_e)]
+
+
+def build_timeline(
+    rules: tuple[ActivityRule, ...],
+    limits: GoNoGoLimits | None = None,
+    forecast: tuple | None = None,
+    step_min: int = DEFAULT_STEP_MIN,
+    tide_path: Path | str = TIDE_CSV,
+) -> FeasibilityTimeline:
+    """
+    Reason-code bitmasks and feasible runs for every rule on the tide grid.
+
+    Args:
+        forecast: (timestamps, wave_ft, wind_kt) as from load_forecast_arrays;
+            None leaves weather-dependent rules without forecast
+    """
+    limits = limits or GoNoGoLimits()
+    curve = tide_curve(tide_path, step_min)
+    grid = curve["time"] - TIDE_UTC_OFFSET
+    height = curve["height"]
+    if forecast is None:
+        forecast = (np.zeros(0, dtype="datetime64[s]"), np.zeros(0), np.zeros(0))
+    gate_a, gate_b, covered = weather_on_grid(grid, *forecast, limits)
+
+    local = grid + TIDE_UTC_OFFSET
+    minute_of_day = (local - local.astype("datetime64[D]")).astype(int)
+
+    # Rule parameters as columns, so all rules are evaluated in one broadcast
+    use_go = np.array([r.weather == "go" for r in rules])[:, None]
+    use_a = np.array([r.weather == "gate_a" for r in rules])[:, None]
+    # float32 like the tide heights, so a sample at exactly the threshold passes (as in tide_windows)
+    tide_min = np.array(
+        [np.nan if r.tide_min_m is None else r.tide_min_m for r in rules], dtype=np.float32
+    )[:, None]
+    first_min = np.array([r.work_hours[0] * 60 if r.work_hours else 0 for r in rules])[:, None]
+    last_min = np.array([(r.work_hours[1] + 1) * 60 if r.work_hours else 24 * 60 for r in rules])[:, None]
+
+    bits = FEASIBILITY_BITS
+    codes = np.zeros((len(rules), grid.size), dtype=np.uint16)
+    codes |= np.where(use_go, gate_a | gate_b, 0).astype(np.uint16)
+    codes |= np.where(use_a, gate_a & GATE_A_BITS, 0).astype(np.uint16)
+    codes |= np.where((use_go | use_a) & ~covered, bits["WX_NO_FORECAST"], 0).astype(np.uint16)
+    needs_tide = ~np.isnan(tide_min)
+    codes |= np.where(needs_tide & ~np.isfinite(height), bits["TIDE_NO_DATA"], 0).astype(np.uint16)
+    with np.errstate(invalid="ignore"):
+        codes |= np.where(needs_tide & (height < tide_min), bits["TIDE_LOW"], 0).astype(np.uint16)
+    in_hours = (minute_of_day >= first_min) & (minute_of_day < last_min)
+    codes |= np.where(~in_hours, bits["OUTSIDE_WORK_HOURS"], 0).astype(np.uint16)
+
+    # Runs break across gaps in the tide grid
+    linked = np.diff(grid) == np.timedelta64(step_min, "m")
+    run_start, run_end = _feasible_runs(codes == 0, linked)
+    return FeasibilityTimeline(grid, step_min, tuple(rules), codes, run_start, run_end)
+
+
+def _fmt(t: np.datetime64) -> str:
+    return f"{t.astype('datetime64[m]')}Z"
+
+
+def _least_blocked(codes: np.ndarray) -> int:
+    """
+    Codes of the blocked sample with the fewest reasons (earliest on ties),
+    i.e. what would have to clear for the plan to become feasible. Samples
+    within work hours are preferred when the plan has any.
+    """
+    blocked = codes[codes != 0]
+    if not blocked.size:
+        return 0
+    in_hours = blocked[(blocked & FEASIBILITY_BITS["OUTSIDE_WORK_HOURS"]) == 0]
+    if in_hours.size:
+        blocked = in_hours
+    n_bits = sum((blocked >> b) & 1 for b in range(blocked.dtype.itemsize * 8))
+    return int(blocked[np.argmin(n_bits)])
+
+
+def activity_windows(timeline: FeasibilityTimeline, activity: PlannedActivity) -> dict:
+    """
+    Feasible windows of one activity inside its plan window, plus the first
+    usable window from its planned start onward (possibly after the plan).
+    """
+    r = timeline.rule_index(activity.rule)
+    rule = timeline.rules[r]
+    grid, step = timeline.grid, np.timedelta64(timeline.step_min, "m")
+    starts, ends = timeline.run_start[r], timeline.run_end[r]
+    run_t0 = grid[starts] if starts.size else grid[:0]
+    run_t1 = grid[ends - 1] + step if ends.size else grid[:0]
+    plan_start = activity.start.astype("datetime64[m]")
+    plan_end = activity.end.astype("datetime64[m]")
+    need = np.timedelta64(int(round(rule.min_hours * 60)), "m")
+
+    # A window may begin no earlier than the planned start
+    eff_start = np.maximum(run_t0, plan_start)
+    usable = run_t1 - eff_start >= need
+    after = run_t1 > plan_start
+    in_plan = usable & after & (eff_start <= plan_end)
+    nxt = np.flatnonzero(usable & after)
+
+    lo = np.searchsorted(grid, plan_start, side="left")
+    hi = np.searchsorted(grid, plan_end, side="right")
+    if hi > lo:
+        blocking = _least_blocked(timeline.codes[r, lo:hi])
+        if not blocking:  # Feasible throughout, but the surrounding run is too short
+            blocking = FEASIBILITY_BITS["WINDOW_INSUFFICIENT"]
+    else:
+        blocking = FEASIBILITY_BITS["TIDE_NO_DATA"]  # Plan window outside the tide grid
+    windows = [
+        {"start": _fmt(s), "end": _fmt(e), "hours": round(float((e - s) / np.timedelta64(60, "m")), 2)}
+        for s, e in zip(eff_start[in_plan], run_t1[in_plan])
+    ]
+    return {
+        "activityId": activity.activity_id,
+        "title": activity.title,
+        "rule": rule.name,
+        "planStart": _fmt(plan_start),
+        "planEnd": _fmt(plan_end),
+        "feasible": bool(windows),
+        "windows": windows,
+        "nextWindow": (
+            {"start": _fmt(eff_start[nxt[0]]), "end": _fmt(run_t1[nxt[0]])} if nxt.size else None
+        ),
+        "reasonCodes": [] if windows else bits_to_codes(blocking),
+    }
+
+
+def bits_to_codes(bits: int) -> list[str]:
+    """Expand a joint reason bitmask into its code names"""
+    return [code for code, bit in FEASIBILITY_BITS.items() if bits & bit]
+
+
+def voyage_feasibility(
+    timeline: FeasibilityTimeline, activities: list[PlannedActivity]
+) -> list[dict]:
+    """Per-voyage activities with windows; earliestGo is the first sea-transit window start."""
+    voyages: dict[str, dict] = {}
+    for activity in activities:
+        entry = voyages.setdefault(
+            activity.voyage, {"voyage": activity.voyage, "earliestGo": None, "activities": []}
+        )
+        result = activity_windows(timeline, activity)
+        entry["activities"].append(result)
+        if activity.rule == "sea_transit" and entry["earliestGo"] is None and result["nextWindow"]:
+            entry["earliestGo"] = result["nextWindow"]["start"]
+    return list(voyages.values())
+
+
+def feasibility_payload(timeline: FeasibilityTimeline, activities: list[PlannedActivity]) -> dict:
+    grid = timeline.grid
+    return {
+        "grid": {
+            "start": _fmt(grid[0]) if grid.size else None,
+            "end": _fmt(grid[-1]) if grid.size else None,
+            "stepMin": timeline.step_min,
+        },
+        "rules": [
+            {
+                "name": r.name,
+                "weather": r.weather,
+                "tideMinM": r.tide_min_m,
+                "workHours": list(r.work_hours) if r.work_hours else None,
+                "minHours": r.min_hours,
+            }
+            for r in timeline.rules
+        ],
+        "voyages": voyage_feasibility(timeline, activities),
+    }
+
+
+def _arg(flag: str) -> str | None:
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def main() -> None:
+    weather = Path(_arg("--weather") or DEFAULT_WEATHER_JSON)
+    ssot = _arg("--ssot") or DEFAULT_SSOT_PATH
+    for required in (TIDE_CSV, Path(ssot)):
+        if not required.is_file():
+            print(f"SKIP: {required.name} not found")
+            return
+    step_min = int(_arg("--step") or DEFAULT_STEP_MIN)
+    output = Path(_arg("--output") or DEFAULT_OUTPUT_JSON)
+
+    limits = GoNoGoLimits()
+    rules = default_rules(limits)
+    forecast = load_forecast_arrays(str(weather)) if weather.is_file() else None
+    if forecast is None:
+        print(f"[WARN] {weather.name} not found; weather-gated rules have no forecast")
+    timeline = build_timeline(rules, limits, forecast, step_min)
+    payload = feasibility_payload(timeline, load_planned_activities(rules, ssot))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    for voyage in payload["voyages"]:
+        n_ok = sum(a["feasible"] for a in voyage["activities"])
+        print(
+            f"{voyage['voyage']}: {n_ok}/{len(voyage['activities'])} activities feasible in plan, "
+            f"earliest go {voyage['earliestGo'] or '-'}"
+        )
+    print(f"Wrote JSON: {output}")
+
+
+if __name__ == "__main__":
+    main()
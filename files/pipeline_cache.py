@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Content-hash result cache for pipeline steps (files/out/cache/).
+
+Entries are JSON payloads stored under the SHA-256 of their normalized inputs.
+Reads bump the entry's mtime and writes evict the least recently used entries
+beyond max_entries, so hourly cron runs with unchanged inputs return at once.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+FILES_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = FILES_DIR / "out" / "cache"
+DEFAULT_MAX_ENTRIES = 32
+CACHE_VERSION = "1"
+
+
+def content_hash(*parts) -> str:
+    """SHA-256 over arrays (dtype + shape + bytes) and JSON-serializable values."""
+    h = hashlib.sha256(CACHE_VERSION.encode("ascii"))
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            arr = np.ascontiguousarray(part)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode("ascii"))
+            h.update(arr.tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def file_sha256(path: Path | str) -> str:
+    """SHA-256 of a file's bytes, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Small on-disk LRU cache of JSON payloads, one file per key."""
+
+    def __init__(
+        self,
+        namespace: str,
+        cache_dir: Path | str = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        enabled: bool = True,
+    ):
+        self.dir = Path(cache_dir) / namespace
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, payload: dict) -> None:
+        if not self.enabled:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        # Entries may be replaced or evicted concurrently (threads, process pools)
+        entries = []
+        for path in self.dir.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
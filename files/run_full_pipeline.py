@@ -157,6 +157,8 @@ class PipelineRunner:
                 step4_args.extend(['--reserve', str(weather_args['reserve'])])
             if weather_args.get('no_gate_b', False):
                 step4_args.append('--no-gate-b')
+            if weather_args.get('no_cache', False):
+                step4_args.append('--no-cache')
             
             if not self.run_step('weather_gonogo', 'run_pipeline_step4.py', step4_args):
                 print("\nWARNING: Step 4 failed")
@@ -260,6 +262,11 @@ Examples:
         action='store_true',
         help='Disable Gate-B squall buffer'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-run weather Go/No-Go even if forecast and limits are unchanged'
+    )
     
     # General arguments
     parser.add_argument(
@@ -294,6 +301,8 @@ Examples:
             weather_args['reserve'] = args.reserve
         if args.no_gate_b:
             weather_args['no_gate_b'] = True
+        if args.no_cache:
+            weather_args['no_cache'] = True
     
     # Run pipeline
     runner = PipelineRunner(files_dir=args.files_dir)
@@ -8,20 +8,32 @@ Part of the full pipeline: shift(1) → daily-update(2) → pipeline-check(3) 
 
 import os
 import sys
+import json
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 import re
 
+import numpy as np
+
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from weather_go_nogo import (
-    run_gonogo_from_json,
-    run_gonogo_manual,
+    evaluate_go_nogo_arrays,
     format_html_output,
+    go_nogo_result_from_dict,
+    load_forecast_arrays,
+    evaluate_sea_transit_windows,
+    summarize_voyages,
+    to_datetime64,
     GoNoGoLimits,
-    GoNoGoResult
+    GoNoGoResult,
+    SeaTransitWindow
 )
+from pipeline_cache import ResultCache, content_hash
+# SSOT schedule (trips + activities) used for per-voyage evaluation
+from ssot_voyage_index import DEFAULT_SSOT_PATH, planned_activities, is_sea_transit
 
 
 def find_latest_schedule_html(files_dir: str = ".") -> str:
@@ -84,11 +96,77 @@ def insert_gonogo_into_html(
     return output_path
 
 
+def load_sea_transit_windows(ssot_path: str = DEFAULT_SSOT_PATH) -> list[SeaTransitWindow]:
+    """Sea-transit activities of every trip in option_c_v0.8.0.json, ordered by trip and start"""
+    windows = []
+    for trip_id, activity_id, activity, start_ts, end_ts in planned_activities(ssot_path):
+        if not is_sea_transit(activity):
+            continue
+        start, end = to_datetime64([start_ts, end_ts])
+        windows.append(SeaTransitWindow(
+            voyage=trip_id,
+            activity_id=activity_id,
+            title=activity.get('title', ''),
+            start=start,
+            end=end
+        ))
+    windows.sort(key=lambda w: (w.voyage, w.start))
+    return windows
+
+
+def run_pipeline_step4_voyages(
+    weather_source: str = "sample",
+    ssot_path: str = DEFAULT_SSOT_PATH,
+    limits: GoNoGoLimits = None,
+    use_gate_b: bool = True,
+    output_dir: str = ".",
+    output_json: str = None
+) -> list[dict]:
+    """
+    Batch Go/No-Go for all voyages against one forecast
+    
+    Loads the forecast once, evaluates every trip's sea-transit activities
+    on their slice of the shared gate masks, and rolls them up per voyage.
+    
+    Returns:
+        List of per-voyage dicts (see weather_go_nogo.summarize_voyages)
+    """
+    print("="*60)
+    print("AGI SCHEDULE PIPELINE STEP 4: Weather Go/No-Go (all voyages)")
+    print("="*60)
+    
+    if limits is None:
+        limits = GoNoGoLimits()
+    
+    if weather_source == "sample":
+        weather_source = os.path.join(output_dir, "weather_forecast_sample.json")
+    timestamps, wave_ft, wind_kt = load_forecast_arrays(weather_source)
+    windows = load_sea_transit_windows(ssot_path)
+    print(f"\n   Forecast: {len(timestamps)} entries | Sea-transit legs: {len(windows)}")
+    
+    voyages = summarize_voyages(
+        evaluate_sea_transit_windows(timestamps, wave_ft, wind_kt, windows, limits, use_gate_b)
+    )
+    for voyage in voyages:
+        status = voyage['decision'] or ('PARTIAL FORECAST' if voyage['legs_evaluated'] else 'NO FORECAST')
+        print(f"   {voyage['voyage']}: {status} ({voyage['legs_evaluated']}/{len(voyage['legs'])} legs)")
+        for leg in voyage['legs']:
+            print(f"      {leg['activity_id']} [{leg['start'][:10]}] {leg['decision'] or '-'}: {leg['rationale']}")
+    
+    if output_json:
+        with open(output_json, 'w', encoding='utf-8') as f:
+            json.dump({"voyages": voyages}, f, indent=2, ensure_ascii=False)
+        print(f"\n   Saved voyage decisions to: {output_json}")
+    
+    return voyages
+
+
 def run_pipeline_step4(
     weather_source: str = "sample",
     limits: GoNoGoLimits = None,
     use_gate_b: bool = True,
-    output_dir: str = "."
+    output_dir: str = ".",
+    use_cache: bool = True
 ) -> tuple[GoNoGoResult, str]:
     """
     Execute pipeline step 4: Weather Go/No-Go evaluation and HTML integration
@@ -98,6 +176,7 @@ def run_pipeline_step4(
         limits: Operational limits (uses defaults if None)
         use_gate_b: Whether to apply Gate-B squall buffer
         output_dir: Output directory for updated HTML
+        use_cache: Reuse the stored result when forecast and limits are unchanged
     
     Returns:
         Tuple of (GoNoGoResult, output_html_path)
@@ -120,22 +199,37 @@ def run_pipeline_step4(
             Hmax_allow_m=5.5
         )
     
+    timestamps = None
     if weather_source == "sample":
         weather_json = os.path.join(output_dir, "weather_forecast_sample.json")
         if not os.path.exists(weather_json):
             print(f"Warning: Sample file not found at {weather_json}")
             print("Creating sample data...")
             # Use manual data as fallback
-            result = run_gonogo_manual(
-                wave_ft_series=[6.5, 7.0, 7.2, 6.8, 6.5, 6.2, 6.0, 5.8, 5.5, 5.2, 5.0, 4.8],
-                wind_kt_series=[18, 20, 22, 21, 19, 18, 17, 16, 15, 14, 13, 12],
-                limits=limits,
-                use_gate_b=use_gate_b
-            )
+            wave_ft = [6.5, 7.0, 7.2, 6.8, 6.5, 6.2, 6.0, 5.8, 5.5, 5.2, 5.0, 4.8]
+            wind_kt = [18, 20, 22, 21, 19, 18, 17, 16, 15, 14, 13, 12]
         else:
-            result = run_gonogo_from_json(weather_json, limits, use_gate_b)
+            timestamps, wave_ft, wind_kt = load_forecast_arrays(weather_json)
+    else:
+        timestamps, wave_ft, wind_kt = load_forecast_arrays(weather_source)
+    
+    # Content-hash cache: identical forecast + limits -> stored result (the HTML
+    # is re-rendered every run so its "Last Evaluated" time stays current)
+    cache = ResultCache("gonogo", enabled=use_cache)
+    cache_key = content_hash(
+        timestamps,
+        np.asarray(wave_ft, dtype=float),
+        np.asarray(wind_kt, dtype=float),
+        asdict(limits),
+        use_gate_b
+    )
+    cached = cache.get(cache_key)
+    
+    if cached is not None:
+        result = go_nogo_result_from_dict(cached['result'])
+        print(f"   Cache hit ({cache_key[:12]}): inputs unchanged")
     else:
-        result = run_gonogo_from_json(weather_source, limits, use_gate_b)
+        result = evaluate_go_nogo_arrays(wave_ft, wind_kt, limits, use_gate_b, timestamps=timestamps)
     
     print(f"   Decision: {result.decision}")
     print(f"   Rationale: {result.rationale}")
@@ -143,6 +237,8 @@ def run_pipeline_step4(
     # Step 2: Generate HTML block
     print("\n[2/3] Generating HTML block...")
     gonogo_html = format_html_output(result, limits)
+    if cached is None:
+        cache.put(cache_key, {"result": asdict(result)})
     print(f"   Generated {len(gonogo_html)} characters of HTML")
     
     # Step 3: Insert into latest AGI TR SCHEDULE
@@ -219,6 +315,21 @@ def main():
         default='.',
         help='Output directory (default: current directory)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore the result cache and re-evaluate'
+    )
+    parser.add_argument(
+        '--voyages',
+        nargs='?',
+        const=DEFAULT_SSOT_PATH,
+        help='Evaluate every voyage\'s sea-transit activities from the SSOT (default: option_c_v0.8.0.json)'
+    )
+    parser.add_argument(
+        '--voyages-json',
+        help='Output JSON path for per-voyage decisions (with --voyages)'
+    )
     
     args = parser.parse_args()
     
@@ -229,11 +340,23 @@ def main():
         Reserve_hr=args.reserve
     )
     
+    if args.voyages:
+        run_pipeline_step4_voyages(
+            weather_source=args.weather,
+            ssot_path=args.voyages,
+            limits=limits,
+            use_gate_b=not args.no_gate_b,
+            output_dir=args.output_dir,
+            output_json=args.voyages_json
+        )
+        return
+    
     result, output_path = run_pipeline_step4(
         weather_source=args.weather,
         limits=limits,
         use_gate_b=not args.no_gate_b,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        use_cache=not args.no_cache
     )
     
     print("\nSummary:")
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Voyage overlay index derived from the SSOT schedule (option_c_v0.8.0.json).
+
+Each trip's span is the earliest planned start to the latest planned end of
+its activities (activities are the source of truth, so the overlay follows
+schedule_shift/reflow edits). The index trip_id -> (start, end, type) is
+cached on disk under the SSOT path and validated by mtime/size first, then
+by content hash, so repeated renders do not re-parse the schedule.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from pipeline_cache import FILES_DIR, ResultCache, content_hash, file_sha256
+
+DEFAULT_SSOT_PATH = os.path.join(
+    os.path.dirname(FILES_DIR), "data", "schedule", "option_c_v0.8.0.json"
+)
+SSOT_TZ = timezone(timedelta(hours=4))  # Asia/Dubai (no DST)
+# Overlay colors alternate per trip, as in the original hardcoded VOYAGES
+TRIP_TYPES = ("transport", "jackdown")
+# Sea-transit activities: "Sail-away - Marine Transportation", "LCT Sails back to MZP"
+SEA_TRANSIT_PATTERN = re.compile(r"\bsail", re.I)
+SEA_TRANSIT_TYPE = "transport"
+
+_memo: dict[str, tuple[tuple[int, int], dict]] = {}
+
+
+def _local_date(ts: str) -> date:
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(SSOT_TZ)
+    return dt.date()
+
+
+def build_voyage_index(data: dict) -> dict[str, tuple[date, date, str]]:
+    """trip_id -> (first activity start, last activity end, overlay type), by trip number."""
+    entities = data.get("entities", {})
+    activities = entities.get("activities", {})
+    trips = sorted(
+        entities.get("trips", {}).values(),
+        key=lambda t: (t.get("trip_number") or 0, t.get("trip_id", "")),
+    )
+    index = {}
+    for trip in trips:
+        starts, ends = [], []
+        for activity_id in trip.get("activities", []):
+            plan = (activities.get(activity_id) or {}).get("plan") or {}
+            if plan.get("start_ts"):
+                starts.append(_local_date(plan["start_ts"]))
+            if plan.get("end_ts"):
+                ends.append(_local_date(plan["end_ts"]))
+        # Fall back to the trip's own planned window when no activity is dated
+        if not starts and trip.get("planned_start"):
+            starts.append(_local_date(trip["planned_start"]))
+        if not ends and trip.get("planned_finish"):
+            ends.append(_local_date(trip["planned_finish"]))
+        if not starts or not ends:
+            continue
+        number = trip.get("trip_number") or len(index) + 1
+        index[trip["trip_id"]] = (min(starts), max(ends), TRIP_TYPES[(number - 1) % 2])
+    return index
+
+
+def _encode(index: dict) -> dict:
+    return {k: [s.isoformat(), e.isoformat(), t] for k, (s, e, t) in index.items()}
+
+
+def _decode(trips: dict) -> dict:
+    return {
+        k: (date.fromisoformat(s), date.fromisoformat(e), t) for k, (s, e, t) in trips.items()
+    }
+
+
+def load_voyage_index(
+    path: str = DEFAULT_SSOT_PATH, use_cache: bool = True
+) -> dict[str, tuple[date, date, str]]:
+    """
+    Cached voyage index for an SSOT file.
+
+    Unchanged mtime/size reuse the index without reading the file; a
+    touched but identical file (same SHA-256) reuses it without parsing.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if use_cache and path in _memo and _memo[path][0] == stamp:
+        return _memo[path][1]
+
+    cache = ResultCache("voyage_index", enabled=use_cache)
+    key = content_hash("voyage_index", path)
+    entry = cache.get(key)
+    if entry is not None and (entry["mtime_ns"], entry["size"]) == stamp:
+        index = _decode(entry["trips"])
+    else:
+        sha = file_sha256(path)
+        if entry is not None and entry["sha256"] == sha:
+            index = _decode(entry["trips"])
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                index = build_voyage_index(json.load(f))
+        cache.put(
+            key,
+            {"mtime_ns": stamp[0], "size": stamp[1], "sha256": sha, "trips": _encode(index)},
+        )
+    _memo[path] = (stamp, index)
+    return index
+
+
+def voyages_from_ssot(path: str = DEFAULT_SSOT_PATH, use_cache: bool = True) -> list[dict]:
+    """Heatmap overlay entries (name V<n>, label TR<n>, start, end, type) in trip order."""
+    voyages = []
+    for n, (trip_id, (start, end, kind)) in enumerate(
+        load_voyage_index(path, use_cache).items(), start=1
+    ):
+        number = int(trip_id.rsplit("_", 1)[-1]) if trip_id.rsplit("_", 1)[-1].isdigit() else n
+        voyages.append(
+            {
+                "name": f"V{number}",
+                "start": start,
+                "end": end,
+                "label": f"TR{number}",
+                "type": kind,
+                "trip_id": trip_id,
+            }
+        )
+    return voyages
+
+
+def planned_activities(path: str = DEFAULT_SSOT_PATH):
+    """
+    Every trip activity with a planned start and end, in trip id order.
+
+    Yields:
+        (trip_id, activity_id, activity dict, plan start_ts, plan end_ts)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entities = data.get("entities", {})
+    activities = entities.get("activities", {})
+    for trip_id, trip in sorted(entities.get("trips", {}).items()):
+        for activity_id in trip.get("activities", []):
+            activity = activities.get(activity_id)
+            plan = (activity or {}).get("plan") or {}
+            if plan.get("start_ts") and plan.get("end_ts"):
+                yield trip_id, activity_id, activity, plan["start_ts"], plan["end_ts"]
+
+
+def is_sea_transit(activity: dict) -> bool:
+    """Transport activity whose title names a sailing leg."""
+    return activity.get("type_id") == SEA_TRANSIT_TYPE and bool(
+        SEA_TRANSIT_PATTERN.search(activity.get("title", ""))
+    )
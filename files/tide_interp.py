@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Sub-hourly tide curve and high/low-water extraction from WATER TIDE.csv.
+
+The hourly series (tide matrix flattened, split at gaps in the day index) is
+fitted once with a natural cubic spline per contiguous run and resampled to a
+fixed step (default 10 min). High and low waters are the exact turning points
+of the spline: the real roots of each piece's quadratic derivative, so times
+are not limited to the resampling step. Results are cached as .npz under
+out/cache/tide_interp, keyed by the CSV's SHA-256 and the step, so tide
+steps load the curve instead of re-interpolating.
+
+CLI (from files/):
+    python tide_interp.py [--step 10] [--output out/tide_high_low.json]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_cache import DEFAULT_CACHE_DIR, content_hash, file_sha256
+from tide_matrix import HOURS, TideTable, load_tide_table
+
+FILES_DIR = Path(__file__).resolve().parent
+TIDE_CSV = FILES_DIR / "WATER TIDE.csv"
+DEFAULT_OUTPUT_JSON = FILES_DIR / "out" / "tide_high_low.json"
+CACHE_DIR = DEFAULT_CACHE_DIR / "tide_interp"
+INTERP_VERSION = 1
+
+DEFAULT_STEP_MIN = 10
+CURVE_KEYS = ("time", "height", "extreme_time", "extreme_height", "extreme_high")
+
+
+def hourly_series(tide: TideTable) -> tuple[np.ndarray, np.ndarray]:
+    """Flattened (datetime64[h] times, float64 heights) of the tide matrix."""
+    times = (tide.days.astype("datetime64[h]")[:, None] + np.arange(HOURS)).ravel()
+    return times, tide.heights.ravel().astype(np.float64)
+
+
+def contiguous_runs(times: np.ndarray) -> list[slice]:
+    """Slices of consecutive hourly samples (a gap in the days starts a new run)."""
+    breaks = np.flatnonzero(np.diff(times) != np.timedelta64(1, "h")) + 1
+    bounds = np.concatenate(([0], breaks, [times.size]))
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def spline_coefficients(y: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Natural cubic spline through unit-spaced samples y.
+
+    Returns:
+        (b, c, d) per interval i, with S_i(u) = y[i] + b u + c u^2 + d u^3, u in [0, 1]
+    """
+    n = y.size
+    m = np.zeros(n)  # Second derivatives; natural ends stay 0
+    if n > 2:
+        # Tridiagonal system M[i-1] + 4 M[i] + M[i+1] = 6 (y[i+1] - 2 y[i] + y[i-1]),
+        # solved with the Thomas algorithm (coefficients are constant)
+        rhs = 6.0 * (y[2:] - 2.0 * y[1:-1] + y[:-2])
+        k = rhs.size
+        cp = np.empty(k)
+        dp = np.empty(k)
+        cp[0], dp[0] = 0.25, rhs[0] / 4.0
+        for i in range(1, k):
+            denom = 4.0 - cp[i - 1]
+            cp[i] = 1.0 / denom
+            dp[i] = (rhs[i] - dp[i - 1]) / denom
+        inner = np.empty(k)
+        inner[-1] = dp[-1]
+        for i in range(k - 2, -1, -1):
+            inner[i] = dp[i] - cp[i] * inner[i + 1]
+        m[1:-1] = inner
+    b = (y[1:] - y[:-1]) - (2.0 * m[:-1] + m[1:]) / 6.0
+    c = m[:-1] / 2.0
+    d = (m[1:] - m[:-1]) / 6.0
+    return b, c, d
+
+
+def _resample_run(y: np.ndarray, coef, step_h: float) -> tuple[np.ndarray, np.ndarray]:
+    """Offsets (hours from run start) and spline heights on the step grid."""
+    t = np.arange(0.0, y.size - 1 + 1e-9, step_h)
+    if y.size < 2:
+        return t, y[: t.size].copy()
+    b, c, d = coef
+    i = np.minimum(np.floor(t).astype(np.intp), y.size - 2)
+    u = t - i
+    return t, y[i] + u * (b[i] + u * (c[i] + u * d[i]))
+
+
+def _turning_points(y: np.ndarray, coef) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(offset hours, height, is_high) of the spline's interior extrema, in time order."""
+    if y.size < 3:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+    b, c, d = coef
+    # S'(u) = 3d u^2 + 2c u + b: both quadratic roots, or the linear root when d ~ 0
+    qa, qb, qc = 3.0 * d, 2.0 * c, b
+    disc = qb * qb - 4.0 * qa * qc
+    sq = np.sqrt(np.maximum(disc, 0.0))
+    quad = np.abs(qa) > 1e-12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r1 = np.where(quad, (-qb - sq) / (2.0 * qa), -qc / qb)
+        r2 = np.where(quad, (-qb + sq) / (2.0 * qa), np.nan)
+    r1 = np.where(quad & (disc < 0), np.nan, r1)
+    r2 = np.where(disc <= 0, np.nan, r2)
+
+    piece = np.concatenate((np.arange(b.size), np.arange(b.size)))
+    u = np.concatenate((r1, r2))
+    ok = np.isfinite(u) & (u >= 0.0) & (u < 1.0)
+    piece, u = piece[ok], u[ok]
+    curvature = 2.0 * c[piece] + 6.0 * d[piece] * u
+    sharp = np.abs(curvature) > 1e-9  # Drop inflection (double) roots
+    piece, u, curvature = piece[sharp], u[sharp], curvature[sharp]
+    t = piece + u
+    # Interior only: the run's first knot is an endpoint, not a turning point
+    inner = t > 1e-9
+    t, piece, u, curvature = t[inner], piece[inner], u[inner], curvature[inner]
+    order = np.argsort(t, kind="stable")
+    t, piece, u, curvature = t[order], piece[order], u[order], curvature[order]
+    height = y[piece] + u * (b[piece] + u * (c[piece] + u * d[piece]))
+    high = curvature < 0
+    # A root on a knot can be found by both neighbouring pieces
+    dup = np.concatenate(([False], (np.diff(t) < 1e-6) & (high[1:] == high[:-1])))
+    return t[~dup], height[~dup], high[~dup]
+
+
+def _seconds(hours: np.ndarray) -> np.ndarray:
+    return np.round(hours * 3600).astype("timedelta64[s]")
+
+
+def interpolate(tide: TideTable, step_min: int = DEFAULT_STEP_MIN) -> dict[str, np.ndarray]:
+    """
+    Resampled curve and high/low waters for the whole table.
+
+    Returns:
+        {"time": datetime64[m], "height": float32,
+         "extreme_time": datetime64[s], "extreme_height": float32, "extreme_high": bool}
+    """
+    if step_min <= 0:
+        raise ValueError(f"step_min must be positive, got {step_min}")
+    times, y = hourly_series(tide)
+    step_h = step_min / 60.0
+    out = {k: [] for k in CURVE_KEYS}
+    for run in contiguous_runs(times):
+        start = times[run.start].astype("datetime64[s]")
+        ys = y[run]
+        coef = spline_coefficients(ys) if ys.size >= 2 else None
+        t, h = _resample_run(ys, coef, step_h)
+        out["time"].append((start + _seconds(t)).astype("datetime64[m]"))
+        out["height"].append(h)
+        te, he, hi = _turning_points(ys, coef)
+        out["extreme_time"].append(start + _seconds(te))
+        out["extreme_height"].append(he)
+        out["extreme_high"].append(hi)
+    return {
+        "time": np.concatenate(out["time"] or [np.zeros(0, "datetime64[m]")]),
+        "height": np.concatenate(out["height"] or [np.zeros(0)]).astype(np.float32),
+        "extreme_time": np.concatenate(out["extreme_time"] or [np.zeros(0, "datetime64[s]")]),
+        "extreme_height": np.concatenate(out["extreme_height"] or [np.zeros(0)]).astype(np.float32),
+        "extreme_high": np.concatenate(out["extreme_high"] or [np.zeros(0, bool)]),
+    }
+
+
+def _save(path: Path, curve: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp.npz")
+    os.close(fd)
+    # datetime64 is stored as int64 so the archive loads without pickle
+    np.savez(
+        tmp,
+        **{k: v.astype(np.int64) if v.dtype.kind == "M" else v for k, v in curve.items()},
+    )
+    os.replace(tmp, path)
+
+
+def _load(path: Path) -> dict | None:
+    try:
+        with np.load(path) as z:
+            curve = {k: z[k] for k in CURVE_KEYS}
+    except (OSError, KeyError, ValueError):
+        return None
+    curve["time"] = curve["time"].astype("datetime64[m]")
+    curve["extreme_time"] = curve["extreme_time"].astype("datetime64[s]")
+    return curve
+
+
+def tide_curve(
+    path: Path | str = TIDE_CSV, step_min: int = DEFAULT_STEP_MIN, use_cache: bool = True
+) -> dict[str, np.ndarray]:
+    """interpolate() for a tide CSV, cached by the file's SHA-256 and step."""
+    key = content_hash("tide_interp", INTERP_VERSION, file_sha256(path), int(step_min))
+    cache_path = CACHE_DIR / f"{key}.npz"
+    if use_cache:
+        curve = _load(cache_path)
+        if curve is not None:
+            return curve
+    curve = interpolate(load_tide_table(path), step_min)
+    if use_cache:
+        _save(cache_path, curve)
+    return curve
+
+
+def high_low_payload(curve: dict, step_min: int = DEFAULT_STEP_MIN) -> dict:
+    """High/low waters as JSON ("HW"/"LW", times to the nearest minute, heights to 0.01 m)."""
+    return {
+        "stepMin": step_min,
+        "extrema": [
+            {
+                "time": str((t + np.timedelta64(30, "s")).astype("datetime64[m]")),
+                "height": round(float(h), 2),
+                "type": "HW" if hi else "LW",
+            }
+            for t, h, hi in zip(
+                curve["extreme_time"], curve["extreme_height"], curve["extreme_high"]
+            )
+        ],
+    }
+
+
+def write_high_low_json(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _arg(flag: str) -> str | None:
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def main() -> None:
+    if not TIDE_CSV.is_file():
+        print(f"SKIP: {TIDE_CSV.name} not found")
+        return
+    step_min = int(_arg("--step") or DEFAULT_STEP_MIN)
+    output = Path(_arg("--output") or DEFAULT_OUTPUT_JSON)
+    curve = tide_curve(TIDE_CSV, step_min, use_cache="--no-cache" not in sys.argv)
+    payload = high_low_payload(curve, step_min)
+    write_high_low_json(output, payload)
+    print(f"{curve['time'].size} samples @ {step_min} min, {len(payload['extrema'])} HW/LW -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+WATER TIDE.csv as a (days x 24) float32 matrix with range-max queries.
+
+The CSV (날짜, 0:00 .. 23:00) is parsed once into a datetime64[D] day index
+and an hourly height matrix. A sparse table of per-hour maxima over
+power-of-two day spans answers "max height per hour between two dates" with
+two binary searches and two row lookups, so per-voyage tide summaries stay
+constant time for multi-year tables and many schedule files.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from weather_aggregate import to_days
+
+HOURS = 24
+HOUR_LABELS = [f"{h}:00" for h in range(HOURS)]
+
+_memo: dict[str, tuple[tuple[int, int], "TideTable"]] = {}
+
+
+def _height(val: str | None) -> float:
+    """CSV cell -> height (m); blank or malformed cells count as 0.0."""
+    val = (val or "").strip().replace(" ", "")
+    try:
+        return float(val) if val else 0.0
+    except ValueError:
+        return 0.0
+
+
+def parse_tide_matrix(path: Path | str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse WATER TIDE.csv.
+
+    Returns:
+        (datetime64[D] days sorted ascending, float32 heights [days x 24])
+    """
+    dates: list[np.datetime64] = []
+    rows: list[list[float]] = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        # Hour columns by header name, so column order in the file does not matter
+        cols = [header.index(h) if h in header else -1 for h in HOUR_LABELS]
+        for row in reader:
+            date_str = (row[0] if row else "").strip()
+            if not date_str or not date_str[0].isdigit():
+                continue
+            try:
+                day = datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                continue  # Not YYYY-MM-DD (e.g. 2026/01/02): skip the row, not the file
+            dates.append(np.datetime64(day, "D"))
+            rows.append([_height(row[c]) if 0 <= c < len(row) else 0.0 for c in cols])
+    days = to_days(dates)
+    heights = np.array(rows, dtype=np.float32).reshape(-1, HOURS)
+    order = np.argsort(days, kind="stable")
+    return days[order], heights[order]
+
+
+class SparseMax:
+    """Sparse table of column-wise maxima over row spans of length 2**k."""
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        self.levels = [values]
+        span = 1
+        while 2 * span <= values.shape[0]:
+            prev = self.levels[-1]
+            self.levels.append(np.maximum(prev[:-span], prev[span:]))
+            span *= 2
+
+    def query(self, lo: int, hi: int) -> np.ndarray:
+        """Column-wise max of rows lo..hi-1 (hi > lo)."""
+        k = (hi - lo).bit_length() - 1
+        level = self.levels[k]
+        return np.maximum(level[lo], level[hi - (1 << k)])
+
+
+class TideTable:
+    """Hourly tide heights by day with O(1) per-hour range maxima."""
+
+    def __init__(self, days: np.ndarray, heights: np.ndarray):
+        self.days = days
+        self.heights = heights
+        self._sparse = SparseMax(heights) if len(days) else None
+
+    def day_range(self, start, end) -> tuple[int, int]:
+        """Row bounds [lo, hi) of the days within start..end (inclusive)."""
+        start, end = to_days([start, end])
+        lo = int(np.searchsorted(self.days, start, side="left"))
+        hi = int(np.searchsorted(self.days, end, side="right"))
+        return lo, max(lo, hi)
+
+    def hour_max(self, start, end) -> np.ndarray:
+        """Max height per hour (24,) over start..end; 0.0 when no day is covered."""
+        lo, hi = self.day_range(start, end)
+        if hi <= lo:
+            return np.zeros(HOURS, dtype=np.float32)
+        return np.maximum(self._sparse.query(lo, hi), 0.0)
+
+    def top_hours(
+        self, start, end, hours=range(HOURS), n: int = 3
+    ) -> list[tuple[str, float]]:
+        """
+        n highest hours of the per-hour range maxima, restricted to hours.
+
+        Returns:
+            [(hour label "H:00", height rounded to 0.01 m)], highest first;
+            ties keep hour order
+        """
+        hours = np.asarray(list(hours), dtype=np.intp)
+        peak = self.hour_max(start, end)[hours]
+        order = np.argsort(-peak, kind="stable")[:n]
+        return [(HOUR_LABELS[hours[i]], round(float(peak[i]), 2)) for i in order]
+
+
+def load_tide_table(path: Path | str) -> TideTable:
+    """Parsed table for a tide CSV, reused in-process while mtime/size are unchanged."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if path in _memo and _memo[path][0] == stamp:
+        return _memo[path][1]
+    table = TideTable(*parse_tide_matrix(path))
+    _memo[path] = (stamp, table)
+    return table
@@ -2,88 +2,152 @@
 """
 WATER TIDE.csv 기반: 주간(6:00~17:00) 최고 물때 상위 3시간대를 Voyage Overview tide-table에 연동.
 files/ 전용. 실행: files/ 폴더에서 python tide_to_voyage_overview.py [--dry-run] [--output-json PATH]
+    [--workers N] [--no-cache]
+스케줄 HTML은 파일당 한 번 읽고 한 번 스캔해 조각을 이어 붙여 원자적으로 저장하며,
+물때 입력과 내용 해시가 지난 실행과 같으면 건너뜀 (out/cache/tide_html).
+--output-json 사용 시 같은 폴더에 tide_windows.json(임계 수위 이상 연속 구간)과
+tide_high_low.json(만조/간조 시각·수위)도 출력.
 """
 from __future__ import annotations
 
-import csv
+import hashlib
 import json
+import os
 import re
+import stat
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from pipeline_cache import ResultCache, content_hash, file_sha256
+from tide_interp import high_low_payload, tide_curve, write_high_low_json
+from tide_matrix import TideTable, load_tide_table
+from tide_windows import windows_payload, write_windows_json
+
 FILES_DIR = Path(__file__).resolve().parent
 TIDE_CSV = FILES_DIR / "WATER TIDE.csv"
 SCHEDULE_GLOB = "AGI TR SCHEDULE_*.html"
 DEFAULT_OUTPUT_JSON = FILES_DIR / "out" / "tide_voyage.json"
+WINDOWS_JSON_NAME = "tide_windows.json"
+HIGH_LOW_JSON_NAME = "tide_high_low.json"
+
+# <div class="voyage-card" data-voyage="1" data-start="2026-01-31" data-end="2026-02-09">
+CARD_PATTERN = re.compile(
+    r'<div\s+class="voyage-card"[^>]*\s+data-voyage="(\d+)"[^>]*\s+data-start="([^"]+)"[^>]*\s+data-end="([^"]+)"',
+    re.I,
+)
+TIDE_TABLE_CLASS = 'class="tide-table"'
+TBODY_OPEN, TBODY_CLOSE = "<tbody>", "</tbody>"
+TIDE_HTML_VERSION = 1  # tbody 형식이 바뀌면 올려서 변경 감지 캐시 무효화
 
 # 6:00 ~ 17:00 컬럼명 (CSV 헤더와 일치)
-HOUR_COLS = [f"{h}:00" for h in range(6, 18)]
-
-
-def parse_tide_csv(path: Path) -> list[tuple[str, dict[str, float]]]:
-    """Parse WATER TIDE.csv -> [(date_str, {hour: height_m}), ...]."""
-    rows: list[tuple[str, dict[str, float]]] = []
-    with open(path, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        header = [h.strip() for h in (reader.fieldnames or [])]
-        # first column is date (날짜 or BOM+날짜)
-        date_key = header[0] if header else "날짜"
-        for row in reader:
-            date_str = (row.get(date_key) or row.get("날짜") or "").strip()
-            if not date_str or not date_str[0].isdigit():
-                continue
-            heights: dict[str, float] = {}
-            for col in HOUR_COLS:
-                val = (row.get(col) or "").strip().replace(" ", "")
-                try:
-                    heights[col] = float(val) if val else 0.0
-                except ValueError:
-                    heights[col] = 0.0
-            rows.append((date_str, heights))
-    return rows
+DAYTIME_HOURS = range(6, 18)
+HOUR_COLS = [f"{h}:00" for h in DAYTIME_HOURS]
+
+
+def voyage_cards_in_text(text: str) -> list[tuple[int, str, str, int]]:
+    """(voyage_num, data-start, data-end, card offset) for each voyage-card div, in document order."""
+    return [
+        (int(m.group(1)), m.group(2), m.group(3), m.start())
+        for m in CARD_PATTERN.finditer(text)
+    ]
 
 
 def voyage_cards_from_html(html_path: Path) -> list[tuple[int, str, str]]:
     """Extract (voyage_num, data-start, data-end) from voyage-card divs."""
     text = html_path.read_text(encoding="utf-8")
-    cards: list[tuple[int, str, str]] = []
-    # <div class="voyage-card" data-voyage="1" data-start="2026-01-31" data-end="2026-02-09">
-    pattern = re.compile(
-        r'<div\s+class="voyage-card"[^>]*\s+data-voyage="(\d+)"[^>]*\s+data-start="([^"]+)"[^>]*\s+data-end="([^"]+)"',
-        re.I,
-    )
-    for m in pattern.finditer(text):
-        cards.append((int(m.group(1)), m.group(2), m.group(3)))
-    return cards
+    return [(num, start, end) for num, start, end, _ in voyage_cards_in_text(text)]
 
 
-def top3_tide_for_range(
-    tide_rows: list[tuple[str, dict[str, float]]], start: str, end: str
-) -> list[tuple[str, float]]:
+def top3_tide_for_range(tide: TideTable, start: str, end: str) -> list[tuple[str, float]]:
     """For dates in [start, end], compute max height per hour (6~17), return top 3 (time, height)."""
     try:
-        d_start = datetime.strptime(start, "%Y-%m-%d")
-        d_end = datetime.strptime(end, "%Y-%m-%d")
+        datetime.strptime(start, "%Y-%m-%d")
+        datetime.strptime(end, "%Y-%m-%d")
     except ValueError:
         return []
+    return tide.top_hours(start, end, hours=DAYTIME_HOURS, n=3)
+
 
-    hour_max: dict[str, float] = {h: 0.0 for h in HOUR_COLS}
-    for date_str, heights in tide_rows:
-        try:
-            d = datetime.strptime(date_str.strip(), "%Y-%m-%d")
-        except ValueError:
+def render_tide_tbody(rows: list[tuple[str, float]]) -> str:
+    body = "".join(
+        f"                                <tr>\n                                    <td>{time_str}</td>\n                                    <td>{height}m</td>\n                                </tr>\n"
+        for time_str, height in rows
+    )
+    return f"<tbody>\n{body}                            </tbody>"
+
+
+def tide_table_slots(
+    html: str, cards: list[tuple[int, str, str, int]]
+) -> dict[int, tuple[int, int]]:
+    """
+    voyage_num -> (start, end) offsets of the card's tide-table tbody.
+
+    One forward scan: each card is searched only up to the next card for its
+    tide-table and the first tbody after it, so a card without a tide table
+    never picks up its neighbour's.
+    """
+    slots: dict[int, tuple[int, int]] = {}
+    for i, (voyage_num, _, _, pos) in enumerate(cards):
+        if voyage_num in slots:  # 같은 번호는 첫 카드만
+            continue
+        limit = cards[i + 1][3] if i + 1 < len(cards) else len(html)
+        table = html.find(TIDE_TABLE_CLASS, pos, limit)
+        if table == -1:
+            continue
+        tbody_start = html.find(TBODY_OPEN, table, limit)
+        if tbody_start == -1:
+            continue
+        tbody_end = html.find(TBODY_CLOSE, tbody_start, limit)
+        if tbody_end == -1:
             continue
-        if d_start <= d <= d_end:
-            for h in HOUR_COLS:
-                hour_max[h] = max(hour_max.get(h, 0), heights.get(h, 0))
+        slots[voyage_num] = (tbody_start, tbody_end + len(TBODY_CLOSE))
+    return slots
 
-    sorted_hours = sorted(
-        [(t, hour_max[t]) for t in HOUR_COLS],
-        key=lambda x: -x[1],
+
+def apply_tide_tables(
+    html: str,
+    slots: dict[int, tuple[int, int]],
+    voyage_top3: list[tuple[int, list[tuple[str, float]]]],
+) -> tuple[str, bool]:
+    """Rebuild the document from slices around the changed tbodies (a single copy)."""
+    rows_by_voyage: dict[int, list[tuple[str, float]]] = {}
+    for voyage_num, rows in voyage_top3:
+        rows_by_voyage.setdefault(voyage_num, rows)
+    edits = sorted(
+        (*slots[num], render_tide_tbody(rows))
+        for num, rows in rows_by_voyage.items()
+        if num in slots
     )
-    top3 = sorted_hours[:3]
-    return [(t, round(h, 2)) for t, h in top3]
+    pieces: list[str] = []
+    cursor = 0
+    for start, end, new_tbody in edits:
+        if end - start == len(new_tbody) and html.startswith(new_tbody, start):
+            continue
+        pieces.append(html[cursor:start])
+        pieces.append(new_tbody)
+        cursor = end
+    if not pieces:
+        return html, False
+    pieces.append(html[cursor:])
+    return "".join(pieces), True
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write via a temp file in the same folder + os.replace, keeping the file mode."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
 
 
 def replace_tide_table_in_html(
@@ -91,36 +155,93 @@ def replace_tide_table_in_html(
     voyage_top3: list[tuple[int, list[tuple[str, float]]]],
     dry_run: bool,
 ) -> bool:
-    """Replace each voyage-card's table.tide-table tbody with 3 rows from voyage_top3.
-    Process from last voyage to first so string indices stay valid."""
+    """Replace each voyage-card's table.tide-table tbody with 3 rows from voyage_top3."""
     html = html_path.read_text(encoding="utf-8")
-    changed = False
-    for voyage_num, rows in reversed(voyage_top3):
-        # Match voyage-card (has data-start), not voyage-chip button
-        card_start = f'data-voyage="{voyage_num}" data-start'
-        idx = html.find(card_start)
-        if idx == -1:
-            continue
-        tbody_start = html.find("<tbody>", idx)
-        tbody_end = html.find("</tbody>", tbody_start)
-        if tbody_start == -1 or tbody_end == -1 or tbody_end < tbody_start:
-            continue
-        block = html[max(0, tbody_start - 200) : tbody_start]
-        if "tide-table" not in block:
-            continue
-        new_tbody = "<tbody>\n"
-        for time_str, height in rows:
-            new_tbody += f"                                <tr>\n                                    <td>{time_str}</td>\n                                    <td>{height}m</td>\n                                </tr>\n"
-        new_tbody += "                            </tbody>"
-        old_tbody = html[tbody_start : tbody_end + len("</tbody>")]
-        if old_tbody != new_tbody:
-            html = html[:tbody_start] + new_tbody + html[tbody_end + len("</tbody>") :]
-            changed = True
+    new_html, changed = apply_tide_tables(
+        html, tide_table_slots(html, voyage_cards_in_text(html)), voyage_top3
+    )
     if changed and not dry_run:
-        html_path.write_text(html, encoding="utf-8")
+        write_text_atomic(html_path, new_html)
     return changed
 
 
+def tide_inputs_key() -> str:
+    """Hash of everything the tide tables depend on besides the HTML itself."""
+    return content_hash("tide_html", TIDE_HTML_VERSION, file_sha256(TIDE_CSV), HOUR_COLS)
+
+
+def process_schedule(path: str, inputs_key: str, dry_run: bool, use_cache: bool) -> dict:
+    """
+    Update one schedule file in a single read/scan/write.
+
+    Files whose mtime/size (or, failing that, content hash) and tide inputs
+    match the last run are skipped without rescanning.
+
+    Returns:
+        {"status": "unchanged" | "updated" | "current", "voyages": [(num, start, end, top3)]}
+    """
+    html_path = Path(path)
+    cache = ResultCache("tide_html", enabled=use_cache and not dry_run)
+    key = content_hash("tide_html", str(html_path.resolve()))
+    entry = cache.get(key)
+    st = html_path.stat()
+    stamp = [st.st_mtime_ns, st.st_size]
+    fresh = entry is not None and entry["inputs"] == inputs_key
+    if fresh and entry["stamp"] == stamp:
+        return {"status": "unchanged", "voyages": _voyages(entry["voyages"])}
+
+    html = html_path.read_text(encoding="utf-8")
+    sha = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    if fresh and entry["sha256"] == sha:
+        cache.put(key, dict(entry, stamp=stamp))
+        return {"status": "unchanged", "voyages": _voyages(entry["voyages"])}
+
+    tide = load_tide_table(TIDE_CSV)
+    cards = voyage_cards_in_text(html)
+    voyages = []
+    for v_num, start, end, _ in cards:
+        top3 = top3_tide_for_range(tide, start, end)
+        if not top3:
+            top3 = [(HOUR_COLS[i], 0.0) for i in range(3)]
+        voyages.append((v_num, start, end, top3))
+    new_html, changed = apply_tide_tables(
+        html, tide_table_slots(html, cards), [(v, rows) for v, _, _, rows in voyages]
+    )
+    if changed and not dry_run:
+        write_text_atomic(html_path, new_html)
+        st = html_path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        sha = hashlib.sha256(new_html.encode("utf-8")).hexdigest()
+    cache.put(key, {"inputs": inputs_key, "stamp": stamp, "sha256": sha, "voyages": voyages})
+    return {"status": "updated" if changed else "current", "voyages": voyages}
+
+
+def _voyages(cached: list) -> list[tuple[int, str, str, list[tuple[str, float]]]]:
+    return [(v, s, e, [tuple(r) for r in rows]) for v, s, e, rows in cached]
+
+
+def process_schedules(
+    paths: list[Path], dry_run: bool, use_cache: bool = True, workers: int = 0
+) -> list[dict]:
+    """process_schedule() for each path, across a process pool when workers > 1."""
+    inputs_key = tide_inputs_key()
+    n = len(paths)
+    args = ([str(p) for p in paths], [inputs_key] * n, [dry_run] * n, [use_cache] * n)
+    if workers <= 1 or len(paths) < 2:
+        return list(map(process_schedule, *args))
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return list(pool.map(process_schedule, *args))
+
+
+def _arg(flag: str) -> str | None:
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
 def _parse_output_json_arg() -> Path | None:
     for i, arg in enumerate(sys.argv):
         if arg == "--output-json":
@@ -140,35 +261,33 @@ def main() -> None:
         print(f"SKIP: {TIDE_CSV.name} not found")
         return
 
-    tide_rows = parse_tide_csv(TIDE_CSV)
-    if not tide_rows:
+    tide = load_tide_table(TIDE_CSV)
+    if not len(tide.days):
         print("SKIP: no tide rows parsed")
         return
 
     last_voyage_top3: list[tuple[int, str, str, list[tuple[str, float]]]] | None = None
 
-    for html_path in sorted(FILES_DIR.glob(SCHEDULE_GLOB)):
-        cards = voyage_cards_from_html(html_path)
-        if not cards:
-            continue
-        print(f"Processing {html_path.name} ({len(cards)} voyages)")
-        voyage_top3: list[tuple[int, list[tuple[str, float]]]] = []
-        voyage_top3_with_dates: list[tuple[int, str, str, list[tuple[str, float]]]] = []
-        for v_num, start, end in cards:
-            top3 = top3_tide_for_range(tide_rows, start, end)
-            if not top3:
-                top3 = [(HOUR_COLS[i], 0.0) for i in range(3)]
-            voyage_top3.append((v_num, top3))
-            voyage_top3_with_dates.append((v_num, start, end, top3))
-            if dry_run:
-                print(f"Voyage {v_num} [{start} ~ {end}]: {top3}")
+    paths = sorted(FILES_DIR.glob(SCHEDULE_GLOB))
+    workers = int(_arg("--workers") or min(len(paths), os.cpu_count() or 1))
+    use_cache = "--no-cache" not in sys.argv
+    results = process_schedules(paths, dry_run, use_cache, workers)
 
+    for html_path, result in zip(paths, results):
+        voyage_top3_with_dates = result["voyages"]
+        if not voyage_top3_with_dates:
+            continue
         last_voyage_top3 = voyage_top3_with_dates
-
+        if result["status"] == "unchanged":
+            print(f"Unchanged (skipped): {html_path.name}")
+            continue
+        print(f"Processing {html_path.name} ({len(voyage_top3_with_dates)} voyages)")
         if dry_run:
+            for v_num, start, end, top3 in voyage_top3_with_dates:
+                print(f"Voyage {v_num} [{start} ~ {end}]: {top3}")
             print(f"[dry-run] Would update {html_path.name}")
             continue
-        if replace_tide_table_in_html(html_path, voyage_top3, dry_run=False):
+        if result["status"] == "updated":
             print(f"Updated tide tables: {html_path.name}")
 
     if output_json_path is not None and last_voyage_top3 is not None:
@@ -189,6 +308,17 @@ def main() -> None:
         )
         print(f"Wrote JSON: {output_json_path}")
 
+        # 물때 윈도우(임계 수위 이상 연속 구간)도 같은 폴더에 출력
+        windows_path = output_json_path.with_name(WINDOWS_JSON_NAME)
+        cards = [(v_num, start, end) for v_num, start, end, _ in last_voyage_top3]
+        write_windows_json(windows_path, windows_payload(tide, voyages=cards))
+        print(f"Wrote JSON: {windows_path}")
+
+        # 분 단위 만조/간조 시각·수위 (CSV 해시 기준 캐시)
+        high_low_path = output_json_path.with_name(HIGH_LOW_JSON_NAME)
+        write_high_low_json(high_low_path, high_low_payload(tide_curve(TIDE_CSV)))
+        print(f"Wrote JSON: {high_low_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Contiguous high-water windows from the tide matrix.
+
+Every run of hourly samples at or above a height threshold (linkspan/draft
+limit), optionally restricted to working hours, is found in one pass by
+run-length encoding the boolean (days x 24) mask flattened to a single
+hourly series. Runs continue across midnight when consecutive days are
+present and every hour is allowed. Defaults follow the dashboard's tide rule
+(lib/services/tideService.ts): >= 1.8 m, 06:00-17:00, at least 2 hours.
+
+CLI (from files/):
+    python tide_windows.py [--threshold 1.8[,2.0]] [--work-hours 6-17 | --all-hours]
+                           [--min-hours 2] [--output out/tide_windows.json]
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from tide_matrix import HOURS, TideTable, load_tide_table
+
+FILES_DIR = Path(__file__).resolve().parent
+TIDE_CSV = FILES_DIR / "WATER TIDE.csv"
+DEFAULT_OUTPUT_JSON = FILES_DIR / "out" / "tide_windows.json"
+
+DEFAULT_THRESHOLDS_M = (1.8,)
+DEFAULT_WORK_HOURS = (6, 17)  # Inclusive, as workStartHour/workEndHour
+DEFAULT_MIN_HOURS = 2
+
+
+def hour_mask(work_hours: tuple[int, int] | None = DEFAULT_WORK_HOURS) -> np.ndarray:
+    """(24,) bool mask of allowed hours; None allows every hour."""
+    hours = np.arange(HOURS)
+    if work_hours is None:
+        return np.ones(HOURS, dtype=bool)
+    first, last = work_hours
+    return (hours >= first) & (hours <= last)
+
+
+def find_windows(
+    tide: TideTable,
+    threshold: float,
+    hours: np.ndarray | None = None,
+    min_hours: int = 1,
+) -> dict[str, np.ndarray]:
+    """
+    Runs of consecutive hourly samples with height >= threshold.
+
+    Args:
+        hours: (24,) bool mask of allowed hours (see hour_mask); None allows all
+
+    Returns:
+        {"start"/"end": datetime64[h] (end exclusive), "hours": int, "peak": float32}
+        one entry per run of at least min_hours samples, in time order
+    """
+    times = (tide.days.astype("datetime64[h]")[:, None] + np.arange(HOURS)).ravel()
+    heights = tide.heights.ravel()
+    mask = tide.heights >= threshold
+    if hours is not None:
+        mask &= np.asarray(hours, dtype=bool)[None, :]
+    mask = mask.ravel()
+    if not mask.any():
+        none = np.zeros(0, dtype=np.intp)
+        return {"start": times[none], "end": times[none], "hours": none, "peak": heights[none]}
+
+    # A run continues only between adjacent samples exactly one hour apart
+    linked = mask[:-1] & mask[1:] & (np.diff(times) == np.timedelta64(1, "h"))
+    starts = np.flatnonzero(mask & ~np.concatenate(([False], linked)))
+    ends = np.flatnonzero(mask & ~np.concatenate((linked, [False])))
+    counts = ends - starts + 1
+    keep = counts >= max(1, min_hours)
+    starts, ends, counts = starts[keep], ends[keep], counts[keep]
+
+    # Peak per run: reduceat over [start, end] pairs (odd segments are the gaps)
+    padded = np.append(heights, heights.dtype.type(0))
+    bounds = np.column_stack((starts, ends + 1)).ravel()
+    peak = np.maximum.reduceat(padded, bounds)[::2] if bounds.size else padded[:0]
+    return {
+        "start": times[starts],
+        "end": times[ends] + np.timedelta64(1, "h"),
+        "hours": counts,
+        "peak": peak,
+    }
+
+
+def _fmt(t: np.datetime64) -> str:
+    return str(t.astype("datetime64[m]"))
+
+
+def window_records(windows: dict[str, np.ndarray], threshold: float) -> list[dict]:
+    return [
+        {
+            "thresholdM": threshold,
+            "start": _fmt(s),
+            "end": _fmt(e),
+            "hours": int(n),
+            "peakM": round(float(p), 2),
+        }
+        for s, e, n, p in zip(windows["start"], windows["end"], windows["hours"], windows["peak"])
+    ]
+
+
+def windows_payload(
+    tide: TideTable,
+    thresholds=DEFAULT_THRESHOLDS_M,
+    work_hours: tuple[int, int] | None = DEFAULT_WORK_HOURS,
+    min_hours: int = DEFAULT_MIN_HOURS,
+    voyages: list[tuple[int, str, str]] | None = None,
+) -> dict:
+    """
+    Dashboard JSON: rule, all windows per threshold and, with voyages
+    [(voyage_num, data-start, data-end)], the windows overlapping each voyage.
+    """
+    mask = hour_mask(work_hours)
+    per_threshold = [
+        (float(th), find_windows(tide, th, mask, min_hours)) for th in thresholds
+    ]
+    payload = {
+        "rule": {
+            "thresholdsM": [th for th, _ in per_threshold],
+            "workStartHour": work_hours[0] if work_hours else 0,
+            "workEndHour": work_hours[1] if work_hours else HOURS - 1,
+            "minConsecutiveHours": min_hours,
+        },
+        "range": {
+            "start": str(tide.days.min()) if len(tide.days) else None,
+            "end": str(tide.days.max()) if len(tide.days) else None,
+        },
+        "windows": [rec for th, w in per_threshold for rec in window_records(w, th)],
+    }
+    if voyages is not None:
+        payload["voyages"] = []
+        for v_num, start, end in voyages:
+            records = []
+            try:
+                lo = np.datetime64(start, "D").astype("datetime64[h]")
+                hi = (np.datetime64(end, "D") + 1).astype("datetime64[h]")
+            except ValueError:
+                # Card dates that are not ISO get no windows, as in top3_tide_for_range
+                per_voyage = []
+            else:
+                per_voyage = per_threshold
+            for th, w in per_voyage:
+                # Windows are sorted by start; overlap means start < hi and end > lo
+                i0 = np.searchsorted(w["end"], lo, side="right")
+                i1 = np.searchsorted(w["start"], hi, side="left")
+                sub = {k: v[i0:i1] for k, v in w.items()}
+                records.extend(window_records(sub, th))
+            payload["voyages"].append(
+                {"voyage": v_num, "dataStart": start, "dataEnd": end, "windows": records}
+            )
+    return payload
+
+
+def write_windows_json(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _arg(flag: str) -> str | None:
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def main() -> None:
+    if not TIDE_CSV.is_file():
+        print(f"SKIP: {TIDE_CSV.name} not found")
+        return
+    tide = load_tide_table(TIDE_CSV)
+
+    thresholds = tuple(float(t) for t in (_arg("--threshold") or "").split(",") if t)
+    work_hours = DEFAULT_WORK_HOURS
+    if "--all-hours" in sys.argv:
+        work_hours = None
+    elif _arg("--work-hours"):
+        first, _, last = _arg("--work-hours").partition("-")
+        work_hours = (int(first), int(last))
+    min_hours = int(_arg("--min-hours") or DEFAULT_MIN_HOURS)
+    output = Path(_arg("--output") or DEFAULT_OUTPUT_JSON)
+
+    payload = windows_payload(tide, thresholds or DEFAULT_THRESHOLDS_M, work_hours, min_hours)
+    write_windows_json(output, payload)
+    print(f"{len(payload['windows'])} windows {payload['rule']} -> {output}")
+
+
+if __name__ == "__main__":
+    main()
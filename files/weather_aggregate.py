@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized hourly -> daily aggregation and date alignment for weather payloads.
+
+Open-Meteo payloads carry ISO date/datetime strings next to value lists.
+These helpers map them onto day indices once (datetime64[D] + searchsorted)
+and reduce or align whole arrays, so multi-model, month-long ranges scale
+linearly instead of looping over days x models in Python. gap_fill_daily()
+completes the daily heatmap series with the same array operations.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+# Gap-fill rules for daily heatmap series
+DEFAULT_WIND_KN = 12.0
+DEFAULT_GUST_KN = 15.0
+GUST_FACTOR = 1.30
+WAVE_PER_WIND_KN = 0.04
+WAVE_RANGE_M = (0.30, 2.50)
+DEFAULT_VIS_KM = 8.00
+
+REDUCERS = {
+    "min": (np.minimum, np.inf),
+    "max": (np.maximum, -np.inf),
+}
+
+
+def to_days(dates) -> np.ndarray:
+    """ISO date/datetime strings, date objects or datetime64 -> datetime64[D]."""
+    arr = np.asarray(dates)
+    if arr.size == 0:
+        return np.zeros(0, dtype="datetime64[D]")
+    if arr.dtype.kind in "US":
+        arr = arr.astype("U10")
+    return arr.astype("datetime64[D]")
+
+
+def index_of(dates, days) -> np.ndarray:
+    """
+    Position of each entry of dates within days, -1 where absent.
+
+    days need not be sorted; with duplicates the first occurrence wins.
+    """
+    dates = to_days(dates)
+    days = to_days(days)
+    if days.size == 0:
+        return np.full(dates.shape, -1, dtype=np.intp)
+    order = np.argsort(days, kind="stable")
+    sorted_days = days[order]
+    pos = np.minimum(np.searchsorted(sorted_days, dates), days.size - 1)
+    return np.where(sorted_days[pos] == dates, order[pos], -1)
+
+
+def daily_reduce(hourly_time, values, daily_time, how: str = "min") -> np.ndarray:
+    """
+    Reduce hourly values to one value per entry of daily_time.
+
+    NaN hours are ignored; days without valid hours stay NaN. Mismatched
+    hourly time/value lengths yield an all-NaN result.
+
+    Args:
+        hourly_time: ISO datetime strings ("2026-02-05T13:00")
+        values: Hourly values
+        daily_time: ISO dates to reduce onto
+        how: "min", "max" or "mean"
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(daily_time), np.nan, dtype=float)
+    if len(hourly_time) != len(values) or len(daily_time) == 0:
+        return out
+
+    slot = index_of(hourly_time, daily_time)
+    ok = (slot >= 0) & ~np.isnan(values)
+    if how == "mean":
+        sums = np.bincount(slot[ok], weights=values[ok], minlength=out.size)
+        counts = np.bincount(slot[ok], minlength=out.size)
+        np.divide(sums, counts, out=out, where=counts > 0)
+        return out
+
+    ufunc, identity = REDUCERS[how]
+    acc = np.full(out.size, identity)
+    ufunc.at(acc, slot[ok], values[ok])
+    return np.where(np.isfinite(acc), acc, out)
+
+
+def hourly_grid(hourly_time, values, days, hours: int = 24) -> np.ndarray:
+    """
+    Place hourly values onto a (days x hours) grid, NaN where absent.
+
+    Args:
+        hourly_time: ISO datetime strings ("2026-02-05T13:00"), local time
+        values: Hourly values
+        days: Dates forming the grid rows
+    """
+    values = np.asarray(values, dtype=float)
+    grid = np.full((len(days), hours), np.nan, dtype=float)
+    if len(hourly_time) != len(values) or len(hourly_time) == 0 or len(days) == 0:
+        return grid
+    stamps = np.asarray(hourly_time).astype("U16").astype("datetime64[h]")
+    row = index_of(stamps.astype("datetime64[D]"), days)
+    hour = (stamps - stamps.astype("datetime64[D]")).astype(int)
+    ok = (row >= 0) & (hour < hours)
+    grid[row[ok], hour[ok]] = values[ok]
+    return grid
+
+
+def align_to_days(dates, days, *columns) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Align payload columns onto a date index.
+
+    Returns:
+        (present mask over days, columns re-indexed onto days with NaN gaps)
+    """
+    # Like zip(): ignore trailing dates that have no values
+    n = min([len(dates)] + [len(col) for col in columns])
+    src = index_of(days, np.asarray(dates)[:n])
+    present = src >= 0
+    aligned = []
+    for col in columns:
+        col = np.asarray(col, dtype=float)
+        out = np.full(present.shape, np.nan, dtype=float)
+        out[present] = col[src[present]]
+        aligned.append(out)
+    return present, aligned
+
+
+def stack_payloads(payloads: list[dict], days, fields: list[str]) -> tuple[np.ndarray, dict]:
+    """
+    Align several model payloads ({"dates", <field>: array}) onto one index.
+
+    Returns:
+        (present mask [models x days], {field: [models x days] matrix})
+    """
+    n_days = len(days)
+    present = np.zeros((len(payloads), n_days), dtype=bool)
+    matrices = {f: np.full((len(payloads), n_days), np.nan) for f in fields}
+    for m, p in enumerate(payloads):
+        present[m], cols = align_to_days(p["dates"], days, *(p[f] for f in fields))
+        for f, col in zip(fields, cols):
+            matrices[f][m] = col
+    return present, matrices
+
+
+def nanmean_rows(matrix: np.ndarray) -> np.ndarray:
+    """Column-wise mean over the rows of matrix, ignoring NaN (all-NaN -> NaN)."""
+    matrix = np.asarray(matrix, dtype=float)
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=0)
+    sums = np.where(valid, matrix, 0.0).sum(axis=0)
+    out = np.full(matrix.shape[1:], np.nan, dtype=float)
+    np.divide(sums, counts, out=out, where=counts > 0)
+    return out
+
+
+def interpolate_gaps(values) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fill NaN runs by linear interpolation, holding the edge values outward.
+
+    Returns:
+        (filled values, mask of entries that were filled); an all-NaN
+        input is returned unchanged with an all-False mask.
+    """
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    if not missing.any() or missing.all():
+        return values.copy(), np.zeros(values.shape, dtype=bool)
+    x = np.arange(values.size)
+    filled = values.copy()
+    # np.interp clamps to the first/last known value -> back/forward fill at edges
+    filled[missing] = np.interp(x[missing], x[~missing], values[~missing])
+    return filled, missing
+
+
+def gap_fill_daily(wind_kn, gust_kn, wave_m, vis_km, coverage):
+    """
+    Complete daily wind/gust/wave/visibility series and their coverage labels.
+
+    Missing wind is interpolated across gaps of any length (edges held) and
+    labelled INTERPOLATED; with no wind data at all the defaults apply and
+    are labelled DEFAULT. Remaining gaps are derived from wind: gust = wind x
+    GUST_FACTOR, wave = clip(wind x WAVE_PER_WIND_KN), visibility default.
+
+    Returns:
+        (wind_kn, gust_kn, wave_m, vis_km, coverage) as new arrays
+    """
+    wind, filled = interpolate_gaps(wind_kn)
+    gust = np.array(gust_kn, dtype=float)
+    wave = np.array(wave_m, dtype=float)
+    vis = np.array(vis_km, dtype=float)
+    coverage = np.array(coverage, dtype=object)
+
+    coverage[filled] = "INTERPOLATED"
+    default = np.isnan(wind)
+    wind[default] = DEFAULT_WIND_KN
+    gust[default & np.isnan(gust)] = DEFAULT_GUST_KN
+    coverage[default] = "DEFAULT"
+
+    gust = np.where(np.isnan(gust), wind * GUST_FACTOR, gust)
+    wave = np.where(np.isnan(wave), np.clip(wind * WAVE_PER_WIND_KN, *WAVE_RANGE_M), wave)
+    vis = np.where(np.isnan(vis), DEFAULT_VIS_KM, vis)
+    return wind, gust, wave, vis, coverage
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Day-of-year climatology and Shamal statistics from local weather history.
+
+Multi-year daily history (archive wind/gust/direction + marine waves,
+backfilled once into weather_store) is reduced to a compact lookup table:
+wind, gust and wave percentiles and the Shamal probability for each of 365
+calendar days, pooled over a +/- window of neighbouring days. Tables are
+saved as .npz next to the store and rebuilt only when the history grows, so
+gap-filling and planning read them instantly instead of calling the remote
+climate API each run.
+
+CLI:
+    python weather_store.py --backfill 2021-01-01:2025-12-31 [--sites]
+    python weather_climatology.py [--sites]     # build tables + monthly summary
+"""
+from __future__ import annotations
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from weather_aggregate import index_of
+from weather_risk import shamal_mask
+
+CLIMATOLOGY_VERSION = 2
+PERCENTILES = (50.0, 75.0, 90.0)
+WINDOW_DAYS = 7  # Pool +/- 7 calendar days around each day of year
+N_DOY = 365
+MARINE_HISTORY_SOURCE = "marine_archive"
+FIELDS = ("wind_kn", "gust_kn", "wave_m")
+
+
+def day_of_year(dates) -> np.ndarray:
+    """0..364 calendar-day index; Feb 29 shares Feb 28's slot."""
+    d = np.asarray(dates, dtype="datetime64[D]")
+    years = d.astype("datetime64[Y]")
+    doy = (d - years).astype(int)
+    y = years.astype(int) + 1970
+    leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+    return np.where(leap & (doy >= 59), doy - 1, doy)
+
+
+def _window_mask(doy: np.ndarray, window: int) -> np.ndarray:
+    """[365 x n] mask: sample j falls within +/- window days of calendar day i."""
+    dist = np.abs(np.arange(N_DOY)[:, None] - doy[None, :])
+    return np.minimum(dist, N_DOY - dist) <= window
+
+
+def build_climatology(
+    dates,
+    wind_kn,
+    gust_kn,
+    wave_m,
+    wdir_deg,
+    percentiles=PERCENTILES,
+    window: int = WINDOW_DAYS,
+) -> dict:
+    """
+    Climatology lookup table from daily history.
+
+    Returns:
+        {"percentiles": [q], "wind_kn"/"gust_kn"/"wave_m": [365 x q],
+        "shamal_prob": [365], "n_days": [365], "n_history": int,
+        "first"/"last": ISO dates}
+        NaN where a calendar day has no samples.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    doy = day_of_year(dates)
+    mask = _window_mask(doy, window)
+    table = {"percentiles": np.asarray(percentiles, dtype=float)}
+    for name, values in zip(FIELDS, (wind_kn, gust_kn, wave_m)):
+        values = np.asarray(values, dtype=float)
+        pooled = np.where(mask, values[None, :], np.nan)
+        has = (mask & ~np.isnan(values)[None, :]).any(axis=1)
+        out = np.full((N_DOY, len(percentiles)), np.nan)
+        if has.any():
+            out[has] = np.nanpercentile(pooled[has], percentiles, axis=1).T
+        table[name] = out
+
+    wdir = np.asarray(wdir_deg, dtype=float)
+    valid = ~(np.isnan(wdir) | np.isnan(np.asarray(wind_kn, dtype=float)))
+    shamal = shamal_mask(wdir, wind_kn, gust_kn)
+    n_valid = (mask & valid).sum(axis=1)
+    table["shamal_prob"] = np.divide(
+        (mask & shamal).sum(axis=1),
+        n_valid,
+        out=np.full(N_DOY, np.nan),
+        where=n_valid > 0,
+    )
+    table["n_days"] = n_valid
+    table["n_history"] = dates.size
+    table["first"] = str(dates.min()) if dates.size else ""
+    table["last"] = str(dates.max()) if dates.size else ""
+    return table
+
+
+def lookup(table: dict, days, field: str, q: float = 50.0) -> np.ndarray:
+    """Percentile q of field (or "shamal_prob") for each date."""
+    doy = day_of_year(days)
+    if field == "shamal_prob":
+        return table["shamal_prob"][doy]
+    col = int(np.flatnonzero(table["percentiles"] == q)[0])
+    return table[field][doy, col]
+
+
+def climate_payload(table: dict, days: list[date]) -> dict:
+    """Median wind in the fetch_climate_wind_max payload shape (local climate fill)."""
+    return {
+        "dates": [d.isoformat() for d in days],
+        "wind_max_kn": lookup(table, days, "wind_kn", 50.0),
+    }
+
+
+def save_climatology(path: Path | str, table: dict) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp, version=CLIMATOLOGY_VERSION, **table)
+    tmp.replace(path)
+
+
+def load_climatology(path: Path | str) -> dict | None:
+    """Saved table, or None when absent or from another version."""
+    try:
+        with np.load(path) as z:
+            if int(z["version"]) != CLIMATOLOGY_VERSION:
+                return None
+            table = {k: z[k] for k in z.files if k != "version"}
+    except (OSError, KeyError, ValueError):
+        return None
+    for k in ("first", "last", "history_key"):
+        if k in table:
+            table[k] = str(table[k])
+    return table
+
+
+def table_path(site: str) -> Path:
+    from weather_store import DEFAULT_STORE_PATH
+
+    return DEFAULT_STORE_PATH.parent / f"climatology_{site.replace(',', '_')}.npz"
+
+
+def site_history(store, site: str) -> tuple[np.ndarray, dict]:
+    """Archive wind/gust/direction joined with marine wave history on the archive dates."""
+    from weather_store import ARCHIVE_SOURCE
+
+    dates, cols = store.history(site, ARCHIVE_SOURCE)
+    wave_dates, wave_cols = store.history(site, MARINE_HISTORY_SOURCE)
+    if wave_dates.size:
+        src = index_of(dates, wave_dates)
+        wave = np.where(src >= 0, wave_cols["wave_max_m"][np.maximum(src, 0)], np.nan)
+    else:
+        # Archive-only backfill (or a failed marine one): no waves yet
+        wave = np.full(dates.size, np.nan)
+    return dates, {
+        "wind_kn": cols["wind_max_kn"],
+        "gust_kn": cols["gust_max_kn"],
+        "wave_m": wave,
+        "wdir_deg": cols["wind_dir_deg"],
+        "wave_dates": wave_dates,
+    }
+
+
+def history_key(dates: np.ndarray, wave_dates: np.ndarray) -> str:
+    """Span and size of the archive and marine histories a table was built from."""
+    return "|".join(
+        f"{d.size}:{d.min()}:{d.max()}" if d.size else "0"
+        for d in (np.asarray(dates), np.asarray(wave_dates))
+    )
+
+
+def site_climatology(site: str, store=None, min_days: int = 365) -> dict | None:
+    """
+    Saved table for a store site, rebuilt when the stored archive or marine
+    history changed.
+
+    Returns None with less than min_days of archive history.
+    """
+    from weather_store import default_store
+
+    store = store or default_store()
+    dates, h = site_history(store, site)
+    if dates.size < min_days:
+        return None
+    path = table_path(site)
+    table = load_climatology(path)
+    key = history_key(dates, h["wave_dates"])
+    if table is not None and table.get("history_key") == key:
+        return table
+    table = build_climatology(dates, h["wind_kn"], h["gust_kn"], h["wave_m"], h["wdir_deg"])
+    table["history_key"] = key
+    save_climatology(path, table)
+    return table
+
+
+def monthly_summary(table: dict) -> list[tuple[int, float, float, float]]:
+    """(month, median wind P50, P90 gust, Shamal probability) averaged per month."""
+    month_start = np.arange("2025-01", "2026-01", dtype="datetime64[M]").astype("datetime64[D]")
+    doy = day_of_year(month_start)
+    bounds = np.append(doy, N_DOY)
+    rows = []
+    for m in range(12):
+        sl = slice(bounds[m], bounds[m + 1])
+        rows.append(
+            (
+                m + 1,
+                float(np.nanmean(table["wind_kn"][sl, 0])),
+                float(np.nanmean(table["gust_kn"][sl, -1])),
+                float(np.nanmean(table["shamal_prob"][sl])),
+            )
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    import WEATHER_DASHBOARD as wd
+    from weather_store import site_key
+
+    argv = sys.argv[1:] if argv is None else argv
+    sites = wd.SITES if "--sites" in argv else {"DASHBOARD": (wd.LAT, wd.LON)}
+    for name, (lat, lon) in sites.items():
+        table = site_climatology(site_key(lat, lon))
+        if table is None:
+            print(f"[WARN] {name}: under a year of archive history; run weather_store.py --backfill")
+            continue
+        print(f"[OK] {name}: {table['first']} ~ {table['last']} -> {table_path(site_key(lat, lon))}")
+        print("   Month  Wind P50  Gust P90  Shamal%")
+        for month, wind, gust, prob in monthly_summary(table):
+            print(f"   {month:>5}  {wind:8.1f}  {gust:8.1f}  {prob * 100:6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Columnar forecast loaders for Weather Go/No-Go (Step 4)
+
+Reads marine forecasts straight into (timestamps, wave_ft, wind_kt) arrays:
+- JSON  {"forecast": [{"timestamp", "wave_ft", "wind_kt"}, ...]}
+- JSON  {"series": [{"ts", "hs_m", "wind_kt"}, ...]}  (data/schedule/weather_forecast.json)
+- NDJSON / JSONL, one record per line (streamed)
+- CSV with a header row
+- NPZ columnar cache (timestamps, wave_ft, wind_kt)
+
+Timestamps are parsed in bulk to UTC datetime64[s]; no per-hour Python
+objects are kept.
+
+Usage:
+    python weather_forecast_io.py weather_forecast.json --npz out/weather_forecast.npz
+"""
+
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+import argparse
+import array
+import csv
+import json
+import os
+
+import numpy as np
+
+M_TO_FT = 1 / 0.3048
+
+TIMESTAMP_KEYS = ('timestamp', 'ts', 'time', 'datetime')
+WAVE_FT_KEYS = ('wave_ft',)
+WAVE_M_KEYS = ('hs_m', 'wave_m', 'wave_height')
+WIND_KT_KEYS = ('wind_kt',)
+
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+
+
+def parse_timestamps(timestamps: Sequence) -> np.ndarray:
+    """
+    Parse timestamps in bulk to a UTC datetime64[s] array
+
+    Accepts datetime64 arrays, datetime objects (naive = UTC) or ISO 8601
+    strings with "Z", "+HH:MM"/"-HH:MM" or no offset (taken as UTC), e.g.
+    "2026-02-09T06:00:00Z", "2026-02-09T10:00:00+04:00", "2026-02-09T06:00".
+    """
+    arr = np.asarray(timestamps)
+    if arr.dtype.kind == 'M':
+        return arr.astype('datetime64[s]')
+    if arr.size == 0:
+        return np.zeros(arr.shape, dtype='datetime64[s]')
+    if arr.dtype.kind not in 'US':
+        return _parse_objects(arr)
+
+    flat = arr.ravel().astype(str)
+    date, _, clock = np.char.partition(flat, 'T').T
+    clock = np.char.rstrip(clock, 'Z')
+    # Offsets follow the clock; the clock part itself has no '+' or '-'
+    clock, plus, offset_plus = np.char.partition(clock, '+').T
+    clock, minus, offset_minus = np.char.partition(clock, '-').T
+    local = np.where(clock == '', date, np.char.add(np.char.add(date, 'T'), clock))
+    utc = local.astype('datetime64[s]')
+
+    offset = np.where(plus == '+', offset_plus, offset_minus)
+    if (offset != '').any():
+        # Forecasts carry one or two distinct offsets; parse each once
+        uniq, inverse = np.unique(offset, return_inverse=True)
+        minutes = np.array([_offset_minutes(o) for o in uniq], dtype=np.int64)[inverse]
+        sign = np.where(minus == '-', -1, 1)
+        utc = utc - (sign * minutes * 60).astype('timedelta64[s]')
+    return utc.reshape(arr.shape)
+
+
+def _offset_minutes(offset: str) -> int:
+    if not offset:
+        return 0
+    hours, _, minutes = offset.partition(':')
+    if not minutes and len(hours) == 4:
+        hours, minutes = hours[:2], hours[2:]
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _parse_objects(arr: np.ndarray) -> np.ndarray:
+    """Fallback for object arrays (datetime instances or mixed values)"""
+    values = []
+    for ts in arr.ravel():
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        values.append(ts)
+    return np.array(values, dtype='datetime64[s]').reshape(arr.shape)
+
+
+def _pick_key(keys, candidates: Sequence[str]) -> Optional[str]:
+    for key in candidates:
+        if key in keys:
+            return key
+    return None
+
+
+def _resolve_columns(keys) -> Tuple[str, str, float, str]:
+    """
+    Map record keys to (timestamp, wave, wave-to-feet factor, wind)
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    ts_key = _pick_key(keys, TIMESTAMP_KEYS)
+    wave_key, factor = _pick_key(keys, WAVE_FT_KEYS), 1.0
+    if wave_key is None:
+        wave_key, factor = _pick_key(keys, WAVE_M_KEYS), M_TO_FT
+    wind_key = _pick_key(keys, WIND_KT_KEYS)
+    if ts_key is None or wave_key is None or wind_key is None:
+        raise ValueError(
+            f"Forecast needs timestamp, wave (wave_ft or hs_m) and wind_kt columns; got {sorted(keys)}"
+        )
+    return ts_key, wave_key, factor, wind_key
+
+
+def _columns_from_records(records: Sequence[dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if not records:
+        return np.zeros(0, dtype='datetime64[s]'), np.zeros(0), np.zeros(0)
+    ts_key, wave_key, factor, wind_key = _resolve_columns(records[0].keys())
+    n = len(records)
+    timestamps = parse_timestamps(np.array([r[ts_key] for r in records], dtype=str))
+    wave_ft = np.fromiter((r[wave_key] for r in records), dtype=float, count=n) * factor
+    wind_kt = np.fromiter((r[wind_key] for r in records), dtype=float, count=n)
+    return timestamps, wave_ft, wind_kt
+
+
+def load_forecast_json(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load {"forecast": [...]} or {"series": [...]} JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        records = data
+    else:
+        records = data.get('forecast')
+        if records is None:
+            records = data.get('series', [])
+    return _columns_from_records(records)
+
+
+def load_forecast_ndjson(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stream an NDJSON forecast line by line into typed buffers"""
+    ts_values = []
+    wave = array.array('d')
+    wind = array.array('d')
+    columns = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if columns is None:
+                columns = _resolve_columns(record.keys())
+            ts_key, wave_key, factor, wind_key = columns
+            ts_values.append(record[ts_key])
+            wave.append(record[wave_key])
+            wind.append(record[wind_key])
+
+    factor = columns[2] if columns else 1.0
+    timestamps = parse_timestamps(np.array(ts_values, dtype=str))
+    return timestamps, np.frombuffer(wave, dtype=float) * factor, np.frombuffer(wind, dtype=float).copy()
+
+
+def load_forecast_csv(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load a CSV forecast with a header row (e.g. timestamp,wave_ft,wind_kt)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        header = next(csv.reader(f), [])
+        header = [h.strip() for h in header]
+        ts_key, wave_key, factor, wind_key = _resolve_columns(header)
+        cols = [header.index(ts_key), header.index(wave_key), header.index(wind_key)]
+        table = np.loadtxt(f, delimiter=',', dtype=str, usecols=cols, ndmin=2)
+
+    timestamps = parse_timestamps(np.char.strip(table[:, 0]))
+    wave_ft = table[:, 1].astype(float) * factor
+    wind_kt = table[:, 2].astype(float)
+    return timestamps, wave_ft, wind_kt
+
+
+def load_forecast_npz(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load a columnar .npz cache written by save_forecast_npz()"""
+    with np.load(path) as data:
+        timestamps = data['timestamps'].astype('datetime64[s]')
+        wave_ft = data['wave_ft'].astype(float)
+        wind_kt = data['wind_kt'].astype(float)
+    return timestamps, wave_ft, wind_kt
+
+
+def save_forecast_npz(
+    path: str,
+    timestamps: np.ndarray,
+    wave_ft: np.ndarray,
+    wind_kt: np.ndarray
+) -> None:
+    """Write forecast columns as an .npz cache"""
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    np.savez(
+        path,
+        timestamps=parse_timestamps(timestamps),
+        wave_ft=np.asarray(wave_ft, dtype=float),
+        wind_kt=np.asarray(wind_kt, dtype=float),
+    )
+
+
+def load_forecast(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load a forecast file as columnar arrays, dispatching on the extension
+
+    Returns:
+        (timestamps as datetime64[s] UTC, wave_ft, wind_kt)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npz':
+        return load_forecast_npz(path)
+    if ext == '.csv':
+        return load_forecast_csv(path)
+    if ext in NDJSON_EXTENSIONS:
+        return load_forecast_ndjson(path)
+    return load_forecast_json(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert a marine forecast to columnar arrays'
+    )
+    parser.add_argument(
+        'path',
+        help='Forecast file (.json, .ndjson/.jsonl, .csv or .npz)'
+    )
+    parser.add_argument(
+        '--npz',
+        help='Write the columns to this .npz cache'
+    )
+    args = parser.parse_args()
+
+    timestamps, wave_ft, wind_kt = load_forecast(args.path)
+    print(f"Loaded {timestamps.size} entries from {args.path}")
+    if timestamps.size:
+        print(f"  {timestamps[0]}Z .. {timestamps[-1]}Z")
+        print(f"  wave_ft {wave_ft.min():.1f}-{wave_ft.max():.1f}, wind_kt {wind_kt.min():.1f}-{wind_kt.max():.1f}")
+    if args.npz:
+        save_forecast_npz(args.npz, timestamps, wave_ft, wind_kt)
+        print(f"Columnar cache saved: {args.npz}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,12 +10,18 @@ Evaluates marine weather conditions using 3-Gate logic:
 Part of integrated pipeline: shift(1) → daily-update(2) → pipeline-check(3) → weather-go-nogo(4)
 """
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
-from datetime import datetime, timedelta
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+import csv
+import itertools
+from datetime import datetime
 import json
 import os
 
+import numpy as np
+
+from weather_forecast_io import load_forecast, parse_timestamps
+
 
 @dataclass
 class WeatherInput:
@@ -58,6 +64,85 @@ class GoNoGoResult:
     recommendations: List[str]
 
 
+# Reason-code bits used by the columnar gate engine (one bit per code)
+REASON_CODE_BITS = {
+    "WX_WAVE": 1 << 0,
+    "WX_WIND": 1 << 1,
+    "WX_WAVE_SQUALL": 1 << 2,
+    "WX_WIND_GUST": 1 << 3,
+    "WX_HMAX": 1 << 4,
+}
+
+
+@dataclass
+class GateMasks:
+    """Per-hour Gate-A/Gate-B evaluation as columnar arrays"""
+    hs_m: np.ndarray  # Significant wave height (meters)
+    wind_kt: np.ndarray  # Wind speed (knots)
+    gate_a_codes: np.ndarray  # uint8 bitmask of Gate-A reason codes per hour
+    gate_b_codes: Optional[np.ndarray]  # uint8 bitmask of Gate-B reason codes (None if not used)
+
+    @property
+    def gate_a_passed(self) -> np.ndarray:
+        return self.gate_a_codes == 0
+
+    @property
+    def gate_b_passed(self) -> Optional[np.ndarray]:
+        if self.gate_b_codes is None:
+            return None
+        return self.gate_b_codes == 0
+
+    @property
+    def go(self) -> np.ndarray:
+        """Hours passing Gate-A (and Gate-B if used)"""
+        if self.gate_b_codes is None:
+            return self.gate_a_passed
+        return (self.gate_a_codes | self.gate_b_codes) == 0
+
+    def window(self, lo: int, hi: int) -> "GateMasks":
+        """Masks for forecast entries [lo, hi) (views, no copy)"""
+        return GateMasks(
+            hs_m=self.hs_m[lo:hi],
+            wind_kt=self.wind_kt[lo:hi],
+            gate_a_codes=self.gate_a_codes[lo:hi],
+            gate_b_codes=None if self.gate_b_codes is None else self.gate_b_codes[lo:hi]
+        )
+
+
+@dataclass
+class DepartureIndex:
+    """Every feasible departure start for the SailingTime+Reserve window"""
+    start_ts: np.ndarray  # datetime64[s] (UTC) departure start times
+    window_end_ts: np.ndarray  # datetime64[s] (UTC) end of the continuous GO run
+    slack_hr: np.ndarray  # Hours of continuous GO beyond the required window
+    required_window_hr: float
+
+    def to_records(self) -> List[dict]:
+        """JSON-ready list of departure windows"""
+        return [
+            {
+                "start": f"{start}Z",
+                "window_end": f"{end}Z",
+                "slack_hr": round(float(slack), 2)
+            }
+            for start, end, slack in zip(self.start_ts, self.window_end_ts, self.slack_hr)
+        ]
+
+
+@dataclass
+class SeaTransitWindow:
+    """Planned sea-transit activity of one voyage"""
+    voyage: str  # Trip/voyage id, e.g. "TRIP_01"
+    activity_id: str
+    title: str
+    start: np.datetime64  # UTC, inclusive
+    end: np.datetime64  # UTC, inclusive
+
+
+# Decision severity for voyage roll-ups (worst leg wins)
+DECISION_SEVERITY = {"GO": 0, "CONDITIONAL": 1, "NO-GO": 2}
+
+
 def ft_to_m(feet: float) -> float:
     """Convert feet to meters"""
     return feet * 0.3048
@@ -194,44 +279,265 @@ def evaluate_gate_c(
     )
 
 
-def evaluate_go_nogo(
-    weather_series: List[WeatherInput],
+def go_nogo_result_from_dict(data: dict) -> GoNoGoResult:
+    """Rebuild a GoNoGoResult from dataclasses.asdict() output (e.g. cached JSON)"""
+    return GoNoGoResult(
+        decision=data['decision'],
+        reason_codes=list(data['reason_codes']),
+        gate_a=GateResult(**data['gate_a']),
+        gate_b=GateResult(**data['gate_b']) if data.get('gate_b') else None,
+        gate_c=GateResult(**data['gate_c']),
+        rationale=data['rationale'],
+        recommendations=list(data['recommendations'])
+    )
+
+
+def reason_codes_from_bits(bits: int) -> List[str]:
+    """Expand a reason-code bitmask into its code names"""
+    return [code for code, bit in REASON_CODE_BITS.items() if bits & bit]
+
+
+def compute_gate_masks(
+    wave_ft: Sequence[float],
+    wind_kt: Sequence[float],
     limits: GoNoGoLimits,
     use_gate_b: bool = True
-) -> GoNoGoResult:
+) -> GateMasks:
     """
-    Complete 3-Gate Go/No-Go evaluation
-    
-    Args:
-        weather_series: Time series of weather data (hourly)
-        limits: Operational limits
-        use_gate_b: Whether to apply Gate-B squall buffer logic
-    
-    Returns:
-        GoNoGoResult with final decision
+    Columnar Gate-A/Gate-B evaluation
+
+    Same thresholds as evaluate_gate_a/evaluate_gate_b, applied to whole
+    arrays at once. Failures are recorded as REASON_CODE_BITS bitmasks.
     """
-    # Evaluate Gate-A for all time points
-    gate_a_results = [evaluate_gate_a(w, limits) for w in weather_series]
-    
-    # Evaluate Gate-B if requested
-    gate_b_results = None
+    wave_ft = np.asarray(wave_ft, dtype=float)
+    wind = np.asarray(wind_kt, dtype=float)
+    if wave_ft.shape != wind.shape:
+        raise ValueError("wave_ft and wind_kt must have same shape")
+
+    hs_m = ft_to_m(wave_ft)
+    bits = REASON_CODE_BITS
+
+    gate_a_codes = np.zeros(hs_m.shape, dtype=np.uint8)
+    gate_a_codes[~(hs_m <= limits.Hs_limit_m)] |= bits["WX_WAVE"]
+    gate_a_codes[~(wind <= limits.Wind_limit_kt)] |= bits["WX_WIND"]
+
+    gate_b_codes = None
     if use_gate_b:
-        gate_b_results = [evaluate_gate_b(w, limits) for w in weather_series]
-    
-    # Evaluate Gate-C (continuous window)
-    gate_c_result = evaluate_gate_c(
-        weather_series, limits, gate_a_results, gate_b_results
+        hs_eff = hs_m + limits.ΔHs_squall_m
+        wind_eff = wind + limits.ΔGust_kt
+        hmax_est = 1.86 * hs_eff
+        gate_b_codes = np.zeros(hs_m.shape, dtype=np.uint8)
+        gate_b_codes[~(hs_eff <= limits.Hs_limit_m)] |= bits["WX_WAVE_SQUALL"]
+        gate_b_codes[~(wind_eff <= limits.Wind_limit_kt)] |= bits["WX_WIND_GUST"]
+        gate_b_codes[~(hmax_est <= limits.Hmax_allow_m)] |= bits["WX_HMAX"]
+
+    return GateMasks(
+        hs_m=hs_m,
+        wind_kt=wind,
+        gate_a_codes=gate_a_codes,
+        gate_b_codes=gate_b_codes
     )
-    
+
+
+def to_datetime64(timestamps: Sequence) -> np.ndarray:
+    """
+    Convert timestamps to a UTC datetime64[s] array
+
+    Accepts datetime64 arrays, datetime objects (naive = UTC) or ISO 8601
+    strings such as "2026-02-09T06:00:00Z"; strings are parsed in bulk.
+    """
+    return parse_timestamps(timestamps)
+
+
+def _time_buckets(
+    n: int,
+    timestamps: Optional[Sequence] = None,
+    max_gap_hr: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hour offsets and bucket ends for each forecast entry
+
+    Each entry holds until the next timestamp; the last entry holds for the
+    previous spacing. Without timestamps every entry is one hour. With
+    max_gap_hr, longer gaps truncate the bucket and break continuity.
+
+    Returns:
+        (ts_utc, start_hr, end_hr)
+    """
+    if timestamps is None:
+        start_hr = np.arange(n, dtype=float)
+        ts_utc = np.datetime64(0, 's') + (start_hr * 3600).astype('timedelta64[s]')
+    else:
+        ts_utc = to_datetime64(timestamps)
+        if ts_utc.shape != (n,):
+            raise ValueError("timestamps must have same length as the forecast series")
+        start_hr = (ts_utc - ts_utc[0]).astype(float) / 3600.0 if n else np.zeros(0)
+        if np.any(np.diff(start_hr) <= 0):
+            raise ValueError("timestamps must be strictly increasing")
+
+    steps = np.diff(start_hr)
+    last_step = steps[-1] if steps.size else 1.0
+    end_hr = np.append(start_hr[1:], start_hr[-1] + last_step) if n else np.zeros(0)
+    if max_gap_hr is not None:
+        end_hr = np.minimum(end_hr, start_hr + max_gap_hr)
+    return ts_utc, start_hr, end_hr
+
+
+def _go_runs(
+    go: np.ndarray,
+    start_hr: np.ndarray,
+    end_hr: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last entry index of each contiguous GO run"""
+    contiguous = np.zeros(go.shape, dtype=bool)  # entry i continues into i+1
+    contiguous[:-1] = go[:-1] & go[1:] & (end_hr[:-1] >= start_hr[1:])
+    prev_contiguous = np.concatenate(([False], contiguous[:-1]))
+    first = np.flatnonzero(go & ~prev_contiguous)
+    last = np.flatnonzero(go & ~contiguous)
+    return first, last
+
+
+def build_departure_index(
+    masks: GateMasks,
+    limits: GoNoGoLimits,
+    timestamps: Optional[Sequence] = None,
+    max_gap_hr: Optional[float] = None
+) -> DepartureIndex:
+    """
+    Index every feasible departure in one linear pass
+
+    A departure at entry i is feasible when the continuous GO run holding i
+    extends at least SailingTime_hr + Reserve_hr past its timestamp.
+    """
+    required_window_hr = limits.SailingTime_hr + limits.Reserve_hr
+    go = masks.go
+    ts_utc, start_hr, end_hr = _time_buckets(go.size, timestamps, max_gap_hr)
+    first, last = _go_runs(go, start_hr, end_hr)
+
+    # Broadcast each run's end time onto its member entries
+    is_first = np.zeros(go.shape, dtype=bool)
+    is_first[first] = True
+    run_id = np.cumsum(is_first) - 1
+    idx = np.flatnonzero(go)
+    run_end_idx = last[run_id[idx]]
+    slack = end_hr[run_end_idx] - start_hr[idx] - required_window_hr
+
+    feasible = slack >= 0
+    idx = idx[feasible]
+    run_end_idx = run_end_idx[feasible]
+    window_end = ts_utc[0] + (end_hr[run_end_idx] * 3600).astype('timedelta64[s]') if idx.size else ts_utc[:0]
+
+    return DepartureIndex(
+        start_ts=ts_utc[idx],
+        window_end_ts=window_end,
+        slack_hr=slack[feasible],
+        required_window_hr=required_window_hr
+    )
+
+
+def evaluate_gate_c_masks(
+    masks: GateMasks,
+    limits: GoNoGoLimits,
+    timestamps: Optional[Sequence] = None,
+    max_gap_hr: Optional[float] = None
+) -> GateResult:
+    """
+    Gate-C on precomputed masks
+
+    With timestamps the continuous window is measured in real hours (3-hourly
+    or irregular spacing); without them each entry counts as one hour.
+    """
+    go = masks.go
+    _, start_hr, end_hr = _time_buckets(go.size, timestamps, max_gap_hr)
+    first, last = _go_runs(go, start_hr, end_hr)
+    max_continuous = float((end_hr[last] - start_hr[first]).max()) if first.size else 0.0
+
+    failing_bits = None
+    if masks.gate_b_codes is not None:
+        failing_bits = int(np.bitwise_or.reduce(masks.gate_b_codes[~go]))
+    return gate_c_from_window(max_continuous, limits, failing_bits)
+
+
+def gate_c_from_window(
+    max_continuous: float,
+    limits: GoNoGoLimits,
+    failing_bits: Optional[int] = None
+) -> GateResult:
+    """
+    Gate-C result from the longest continuous GO window (hours)
+
+    failing_bits: OR of Gate-B reason bits over non-GO entries (None if Gate-B unused)
+    """
+    required_window_hr = limits.SailingTime_hr + limits.Reserve_hr
+    reason_codes = reason_codes_from_bits(failing_bits) if failing_bits else []
+
+    passed = max_continuous >= required_window_hr
+
+    if passed:
+        details = f"Continuous window of {max_continuous:.1f}hr ≥ required {required_window_hr:.1f}hr"
+    else:
+        details = f"Max continuous window {max_continuous:.1f}hr < required {required_window_hr:.1f}hr"
+        reason_codes.append("WX_WINDOW_INSUFFICIENT")
+
+    return GateResult(passed=passed, reason_codes=reason_codes, details=details)
+
+
+def summarize_gate_counts(n_passed: int, n_total: int, all_bits: int) -> GateResult:
+    """Summary GateResult from pass counts and the OR of all reason bits"""
+    return GateResult(
+        passed=n_passed == n_total,
+        reason_codes=reason_codes_from_bits(all_bits),
+        details=f"{n_passed}/{n_total} time points passed"
+    )
+
+
+def _summarize_gate(codes: np.ndarray) -> GateResult:
+    """Collapse per-hour reason bitmasks into one summary GateResult"""
+    n_passed = int(np.count_nonzero(codes == 0))
+    all_bits = int(np.bitwise_or.reduce(codes)) if codes.size else 0
+    return summarize_gate_counts(n_passed, codes.size, all_bits)
+
+
+def build_go_nogo_result(
+    masks: GateMasks,
+    limits: GoNoGoLimits,
+    gate_c_result: GateResult
+) -> GoNoGoResult:
+    """Assemble the final decision from gate masks and a Gate-C result"""
+    gate_a_summary = _summarize_gate(masks.gate_a_codes)
+
+    gate_b_summary = None
+    if masks.gate_b_codes is not None:
+        if masks.gate_b_codes.size:
+            gate_b_summary = _summarize_gate(masks.gate_b_codes)
+        else:
+            gate_b_summary = GateResult(passed=None, reason_codes=[], details="Not evaluated")
+
+    # Marginal conditions (CONDITIONAL): any hour within 15% of the limits,
+    # provided at least one hour passed Gate-A
+    near_limit = (masks.hs_m > limits.Hs_limit_m * 0.85) | (masks.wind_kt > limits.Wind_limit_kt * 0.85)
+    marginal_conditions = bool(masks.gate_a_passed.any() and near_limit.any())
+
+    return assemble_go_nogo_result(
+        gate_a_summary, gate_b_summary, gate_c_result, marginal_conditions
+    )
+
+
+def assemble_go_nogo_result(
+    gate_a_summary: GateResult,
+    gate_b_summary: Optional[GateResult],
+    gate_c_result: GateResult,
+    marginal_conditions: bool
+) -> GoNoGoResult:
+    """Final decision, rationale and recommendations from gate summaries"""
     # Aggregate all reason codes
-    all_reason_codes = set()
-    for result in gate_a_results:
-        all_reason_codes.update(result.reason_codes)
-    if gate_b_results:
-        for result in gate_b_results:
-            all_reason_codes.update(result.reason_codes)
-    all_reason_codes.update(gate_c_result.reason_codes)
-    
+    all_reason_codes = list(gate_a_summary.reason_codes)
+    if gate_b_summary is not None:
+        all_reason_codes.extend(gate_b_summary.reason_codes)
+    all_reason_codes.extend(
+        code for code in gate_c_result.reason_codes if code not in all_reason_codes
+    )
+
     # Determine final decision
     if gate_c_result.passed:
         decision = "GO"
@@ -249,41 +555,385 @@ def evaluate_go_nogo(
             "Monitor 2-day hourly forecasts for next opportunity",
             "Consider alternative timing or route if available"
         ]
-    
-    # Check for marginal conditions (CONDITIONAL)
-    marginal_conditions = False
-    for gate_a in gate_a_results:
-        if gate_a.passed:
-            # Check if close to limits
-            for weather in weather_series:
-                Hs_m = ft_to_m(weather.wave_ft)
-                if Hs_m > limits.Hs_limit_m * 0.85 or weather.wind_kt > limits.Wind_limit_kt * 0.85:
-                    marginal_conditions = True
-                    break
-    
+
     if decision == "GO" and marginal_conditions:
         decision = "CONDITIONAL"
         recommendations.insert(0, "Weather is near operational limits - proceed with caution")
-    
+
     return GoNoGoResult(
         decision=decision,
-        reason_codes=list(all_reason_codes),
-        gate_a=GateResult(
-            passed=all(r.passed for r in gate_a_results),
-            reason_codes=list(set(sum([r.reason_codes for r in gate_a_results], []))),
-            details=f"{sum(r.passed for r in gate_a_results)}/{len(gate_a_results)} time points passed"
-        ),
-        gate_b=GateResult(
-            passed=all(r.passed for r in gate_b_results) if gate_b_results else None,
-            reason_codes=list(set(sum([r.reason_codes for r in gate_b_results], []))) if gate_b_results else [],
-            details=f"{sum(r.passed for r in gate_b_results)}/{len(gate_b_results)} time points passed" if gate_b_results else "Not evaluated"
-        ) if use_gate_b else None,
+        reason_codes=all_reason_codes,
+        gate_a=gate_a_summary,
+        gate_b=gate_b_summary,
         gate_c=gate_c_result,
         rationale=rationale,
         recommendations=recommendations
     )
 
 
+def evaluate_go_nogo_arrays(
+    wave_ft: Sequence[float],
+    wind_kt: Sequence[float],
+    limits: GoNoGoLimits,
+    use_gate_b: bool = True,
+    timestamps: Optional[Sequence] = None
+) -> GoNoGoResult:
+    """
+    Columnar 3-Gate Go/No-Go evaluation
+
+    Equivalent to evaluate_go_nogo, but works on wave/wind arrays directly
+    and only formats the summary strings used in the final result.
+
+    Args:
+        wave_ft: Wave heights in feet (hourly)
+        wind_kt: Wind speeds in knots (hourly)
+        limits: Operational limits
+        use_gate_b: Whether to apply Gate-B squall buffer logic
+        timestamps: Forecast times; Gate-C measures real hours when given
+    """
+    masks = compute_gate_masks(wave_ft, wind_kt, limits, use_gate_b)
+    gate_c_result = evaluate_gate_c_masks(masks, limits, timestamps)
+    return build_go_nogo_result(masks, limits, gate_c_result)
+
+
+def evaluate_go_nogo(
+    weather_series: List[WeatherInput],
+    limits: GoNoGoLimits,
+    use_gate_b: bool = True
+) -> GoNoGoResult:
+    """
+    Complete 3-Gate Go/No-Go evaluation
+    
+    Args:
+        weather_series: Time series of weather data (hourly or irregular)
+        limits: Operational limits
+        use_gate_b: Whether to apply Gate-B squall buffer logic
+    
+    Returns:
+        GoNoGoResult with final decision
+    """
+    return evaluate_go_nogo_arrays(
+        [w.wave_ft for w in weather_series],
+        [w.wind_kt for w in weather_series],
+        limits,
+        use_gate_b,
+        timestamps=[w.timestamp for w in weather_series] if weather_series else None
+    )
+
+
+# Limits that change the per-hour Gate-A/Gate-B masks (the rest only move Gate-C)
+MASK_LIMIT_FIELDS = ("Hs_limit_m", "Wind_limit_kt", "ΔHs_squall_m", "ΔGust_kt", "Hmax_allow_m")
+
+
+@dataclass
+class LimitSweepResult:
+    """Decision cube over a Cartesian grid of GoNoGoLimits"""
+    axes: Dict[str, List[float]]  # GoNoGoLimits field -> swept values (cube axis order)
+    decision: np.ndarray  # "GO" | "NO-GO" | "CONDITIONAL", shape = axis lengths
+    max_window_hr: np.ndarray  # Longest continuous GO window per grid point
+    go_hours: np.ndarray  # Number of forecast entries passing all gates
+
+    def to_records(self) -> List[dict]:
+        """Flat list of grid points (one row per scenario)"""
+        names = list(self.axes)
+        records = []
+        for pos in itertools.product(*(range(len(v)) for v in self.axes.values())):
+            row = {name: self.axes[name][i] for name, i in zip(names, pos)}
+            row["decision"] = str(self.decision[pos])
+            row["max_window_hr"] = round(float(self.max_window_hr[pos]), 2)
+            row["go_hours"] = int(self.go_hours[pos])
+            records.append(row)
+        return records
+
+    def to_json_dict(self) -> dict:
+        return {
+            "axes": self.axes,
+            "decision": self.decision.tolist(),
+            "max_window_hr": np.round(self.max_window_hr, 2).tolist(),
+            "go_hours": self.go_hours.tolist(),
+            "scenarios": self.to_records()
+        }
+
+    def write_csv(self, path: str) -> None:
+        records = self.to_records()
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]) if records else list(self.axes))
+            writer.writeheader()
+            writer.writerows(records)
+
+
+def _max_window_hr_2d(go: np.ndarray, start_hr: np.ndarray, end_hr: np.ndarray) -> np.ndarray:
+    """Longest continuous GO window (hours) for each row of a (scenarios x hours) mask"""
+    contiguous = np.zeros(go.shape, dtype=bool)
+    contiguous[:, :-1] = go[:, :-1] & go[:, 1:] & (end_hr[:-1] >= start_hr[1:])
+    prev_contiguous = np.zeros(go.shape, dtype=bool)
+    prev_contiguous[:, 1:] = contiguous[:, :-1]
+
+    # Carry each run's start hour forward to its last entry
+    run_start = np.where(go & ~prev_contiguous, start_hr, -np.inf)
+    run_start = np.maximum.accumulate(run_start, axis=1)
+    durations = np.where(go & ~contiguous, end_hr - run_start, 0.0)
+    return durations.max(axis=1) if go.shape[1] else np.zeros(go.shape[0])
+
+
+def sweep_limits(
+    wave_ft: Sequence[float],
+    wind_kt: Sequence[float],
+    grid: Dict[str, Sequence[float]],
+    base_limits: Optional[GoNoGoLimits] = None,
+    use_gate_b: bool = True,
+    timestamps: Optional[Sequence] = None
+) -> LimitSweepResult:
+    """
+    Evaluate a whole Cartesian grid of GoNoGoLimits against one forecast
+
+    Per-hour masks are computed once per distinct threshold combination and
+    broadcast across the grid, so window-only axes (SailingTime_hr,
+    Reserve_hr) are free. Each grid point matches evaluate_go_nogo_arrays.
+
+    Args:
+        wave_ft: Wave heights in feet
+        wind_kt: Wind speeds in knots
+        grid: GoNoGoLimits field name -> values, e.g.
+            {"Hs_limit_m": [2.5, 3.0, 3.5], "SailingTime_hr": [8, 10, 12]}
+        base_limits: Values for fields not in the grid (defaults if None)
+        use_gate_b: Whether to apply Gate-B squall buffer logic
+        timestamps: Forecast times; Gate-C measures real hours when given
+    """
+    if base_limits is None:
+        base_limits = GoNoGoLimits()
+    for name in grid:
+        if not hasattr(base_limits, name):
+            raise ValueError(f"Unknown GoNoGoLimits field: {name}")
+
+    axes = {name: [float(v) for v in values] for name, values in grid.items()}
+    shape = tuple(len(v) for v in axes.values())
+    points = [
+        replace(base_limits, **dict(zip(axes, combo)))
+        for combo in itertools.product(*axes.values())
+    ]
+
+    wave_ft = np.asarray(wave_ft, dtype=float)
+    wind = np.asarray(wind_kt, dtype=float)
+    hs_m = ft_to_m(wave_ft)
+    _, start_hr, end_hr = _time_buckets(hs_m.size, timestamps)
+
+    # Distinct mask thresholds -> (U, hours) masks shared by all grid points
+    mask_params = np.array(
+        [[getattr(p, f) for f in MASK_LIMIT_FIELDS] for p in points], dtype=float
+    ).reshape(len(points), len(MASK_LIMIT_FIELDS))
+    unique_params, inverse = np.unique(mask_params, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    hs_lim, wind_lim, d_hs, d_gust, hmax_lim = (unique_params[:, [k]] for k in range(5))
+
+    gate_a_pass = (hs_m <= hs_lim) & (wind <= wind_lim)
+    go = gate_a_pass
+    if use_gate_b:
+        hs_eff = hs_m + d_hs
+        go = go & (hs_eff <= hs_lim) & (wind + d_gust <= wind_lim) & (1.86 * hs_eff <= hmax_lim)
+    near_limit = (hs_m > hs_lim * 0.85) | (wind > wind_lim * 0.85)
+    marginal = gate_a_pass.any(axis=1) & near_limit.any(axis=1)
+    max_window = _max_window_hr_2d(go, start_hr, end_hr)
+    go_hours = go.sum(axis=1)
+
+    required = np.array([p.SailingTime_hr + p.Reserve_hr for p in points], dtype=float)
+    passed = max_window[inverse] >= required
+    decision = np.where(passed, np.where(marginal[inverse], "CONDITIONAL", "GO"), "NO-GO")
+
+    return LimitSweepResult(
+        axes=axes,
+        decision=decision.reshape(shape),
+        max_window_hr=max_window[inverse].reshape(shape),
+        go_hours=go_hours[inverse].reshape(shape)
+    )
+
+
+@dataclass
+class EnsembleGoNoGo:
+    """Probabilistic Go/No-Go over forecast ensemble members"""
+    departure_ts: np.ndarray  # datetime64[s] (UTC) candidate departure times
+    p_go: np.ndarray  # P(SailingTime+Reserve window from this departure is all GO)
+    p_hour_go: np.ndarray  # P(the single entry passes all gates)
+    p_window: float  # P(at least one feasible departure in the horizon)
+    n_members: int
+    required_window_hr: float
+
+    def to_records(self) -> List[dict]:
+        return [
+            {
+                "departure": f"{ts}Z",
+                "p_go": round(float(p), 4),
+                "p_hour_go": round(float(h), 4)
+            }
+            for ts, p, h in zip(self.departure_ts, self.p_go, self.p_hour_go)
+        ]
+
+
+def _run_end_hr_2d(go: np.ndarray, start_hr: np.ndarray, end_hr: np.ndarray) -> np.ndarray:
+    """End hour of the continuous GO run holding each entry (NaN where not GO)"""
+    contiguous = np.zeros(go.shape, dtype=bool)
+    contiguous[:, :-1] = go[:, :-1] & go[:, 1:] & (end_hr[:-1] >= start_hr[1:])
+
+    # Carry each run's end hour backward from its last entry
+    run_end = np.where(go & ~contiguous, end_hr, np.inf)
+    run_end = np.minimum.accumulate(run_end[:, ::-1], axis=1)[:, ::-1]
+    return np.where(go, run_end, np.nan)
+
+
+def evaluate_ensemble(
+    wave_ft: np.ndarray,
+    wind_kt: np.ndarray,
+    limits: GoNoGoLimits,
+    use_gate_b: bool = True,
+    timestamps: Optional[Sequence] = None,
+    max_gap_hr: Optional[float] = None
+) -> EnsembleGoNoGo:
+    """
+    Ensemble Go/No-Go: P(GO) for each departure time
+
+    Runs the three gates on a (members x hours) matrix at once. A member's
+    departure at entry i is GO when its continuous GO run from i covers
+    SailingTime_hr + Reserve_hr; P(GO) is the fraction of members for which
+    that holds.
+
+    Args:
+        wave_ft: (members x hours) wave heights in feet
+        wind_kt: (members x hours) wind speeds in knots
+        limits: Operational limits
+        use_gate_b: Whether to apply Gate-B squall buffer logic
+        timestamps: Forecast times shared by all members (hourly if None)
+        max_gap_hr: Break continuity across gaps longer than this
+    """
+    masks = compute_gate_masks(np.atleast_2d(wave_ft), np.atleast_2d(wind_kt), limits, use_gate_b)
+    go = masks.go
+    n_members, n_hours = go.shape
+    ts_utc, start_hr, end_hr = _time_buckets(n_hours, timestamps, max_gap_hr)
+    required_window_hr = limits.SailingTime_hr + limits.Reserve_hr
+
+    run_end = _run_end_hr_2d(go, start_hr, end_hr)
+    with np.errstate(invalid='ignore'):
+        feasible = run_end - start_hr >= required_window_hr
+
+    return EnsembleGoNoGo(
+        departure_ts=ts_utc,
+        p_go=feasible.mean(axis=0) if n_members else np.zeros(n_hours),
+        p_hour_go=go.mean(axis=0) if n_members else np.zeros(n_hours),
+        p_window=float(feasible.any(axis=1).mean()) if n_members else 0.0,
+        n_members=n_members,
+        required_window_hr=required_window_hr
+    )
+
+
+def load_ensemble_arrays(
+    ensemble_json_path: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load an ensemble forecast JSON file as (members x hours) matrices
+
+    Expected JSON format:
+    {
+        "timestamps": ["2026-02-02T06:00:00Z", ...],
+        "members": [
+            {"model": "gfs", "wave_ft": [6.5, ...], "wind_kt": [18.0, ...]},
+            ...
+        ]
+    }
+
+    Returns:
+        (timestamps as datetime64[s] UTC, wave_ft, wind_kt)
+    """
+    with open(ensemble_json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    members = data.get('members', [])
+    timestamps = to_datetime64(data.get('timestamps', []))
+    wave_ft = np.array([m['wave_ft'] for m in members], dtype=float).reshape(len(members), timestamps.size)
+    wind_kt = np.array([m['wind_kt'] for m in members], dtype=float).reshape(len(members), timestamps.size)
+    return timestamps, wave_ft, wind_kt
+
+
+def evaluate_sea_transit_windows(
+    timestamps: Sequence,
+    wave_ft: Sequence[float],
+    wind_kt: Sequence[float],
+    windows: Sequence[SeaTransitWindow],
+    limits: GoNoGoLimits,
+    use_gate_b: bool = True
+) -> List[Tuple[SeaTransitWindow, Optional[GoNoGoResult]]]:
+    """
+    Go/No-Go for many sea-transit windows against one shared forecast
+
+    Gate masks are computed once for the whole forecast; each window only
+    binary-searches its bounds and evaluates Gate-C on its slice. Windows
+    the forecast does not fully cover get None: a leg cut off by the end of
+    the forecast is unknown, not a short weather window.
+    """
+    ts_utc = to_datetime64(timestamps)
+    masks = compute_gate_masks(wave_ft, wind_kt, limits, use_gate_b)
+    if ts_utc.shape != masks.go.shape:
+        raise ValueError("timestamps must have same length as the forecast series")
+    if ts_utc.size == 0:
+        return [(window, None) for window in windows]
+    # Forecast covers [first entry, last entry + last spacing)
+    _, _, end_hr = _time_buckets(ts_utc.size, ts_utc)
+    horizon_end = ts_utc[0] + np.timedelta64(int(round(end_hr[-1] * 3600)), 's')
+
+    starts = np.array([w.start for w in windows], dtype='datetime64[s]')
+    ends = np.array([w.end for w in windows], dtype='datetime64[s]')
+    lo = np.searchsorted(ts_utc, starts, side='left')
+    hi = np.searchsorted(ts_utc, ends, side='right')
+
+    results = []
+    covered = (starts >= ts_utc[0]) & (ends < horizon_end)
+    for window, a, b, full in zip(windows, lo, hi, covered):
+        if b <= a or not full:
+            results.append((window, None))
+            continue
+        sliced = masks.window(a, b)
+        gate_c_result = evaluate_gate_c_masks(sliced, limits, ts_utc[a:b])
+        results.append((window, build_go_nogo_result(sliced, limits, gate_c_result)))
+    return results
+
+
+def summarize_voyages(
+    evaluated: Sequence[Tuple[SeaTransitWindow, Optional[GoNoGoResult]]]
+) -> List[dict]:
+    """
+    Per-voyage roll-up (worst leg decision) of evaluate_sea_transit_windows output
+
+    A voyage with a leg outside the forecast horizon is not GO/CONDITIONAL
+    (decision None) unless an evaluated leg is already NO-GO; legs_evaluated
+    counts the legs with a decision.
+    """
+    voyages: Dict[str, dict] = {}
+    for window, result in evaluated:
+        entry = voyages.setdefault(
+            window.voyage,
+            {"voyage": window.voyage, "decision": None, "legs_evaluated": 0, "legs": []}
+        )
+        entry["legs"].append({
+            "activity_id": window.activity_id,
+            "title": window.title,
+            "start": f"{window.start}Z",
+            "end": f"{window.end}Z",
+            "decision": result.decision if result else None,
+            "rationale": result.rationale if result else "Outside forecast horizon",
+            "reason_codes": result.reason_codes if result else []
+        })
+        if result is None:
+            continue
+        entry["legs_evaluated"] += 1
+        if (
+            entry["decision"] is None
+            or DECISION_SEVERITY[result.decision] > DECISION_SEVERITY[entry["decision"]]
+        ):
+            entry["decision"] = result.decision
+    for entry in voyages.values():
+        if entry["legs_evaluated"] < len(entry["legs"]) and entry["decision"] != "NO-GO":
+            entry["decision"] = None
+    return list(voyages.values())
+
+
 def format_html_output(result: GoNoGoResult, limits: GoNoGoLimits) -> str:
     """
     Format Go/No-Go result as HTML block for AGI TR SCHEDULE
@@ -434,6 +1084,21 @@ def format_html_output(result: GoNoGoResult, limits: GoNoGoLimits) -> str:
     return html
 
 
+def load_forecast_arrays(
+    weather_json_path: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load a forecast file as columnar arrays
+
+    Supports JSON ("forecast" or "series" records), NDJSON/JSONL, CSV and
+    .npz caches; see weather_forecast_io.
+
+    Returns:
+        (timestamps as datetime64[s] UTC, wave_ft, wind_kt)
+    """
+    return load_forecast(weather_json_path)
+
+
 def run_gonogo_from_json(
     weather_json_path: str,
     limits: Optional[GoNoGoLimits] = None,
@@ -454,23 +1119,15 @@ def run_gonogo_from_json(
             ...
         ]
     }
+
+    The {"series": [{"ts", "hs_m", "wind_kt"}]} shape, NDJSON, CSV and .npz
+    columnar caches are accepted as well (see load_forecast_arrays).
     """
     if limits is None:
         limits = GoNoGoLimits()
     
-    with open(weather_json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    weather_series = []
-    for item in data.get('forecast', []):
-        weather_series.append(WeatherInput(
-            wave_ft=item['wave_ft'],
-            wind_kt=item['wind_kt'],
-            timestamp=datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00')),
-            wave_period_s=item.get('wave_period_s')
-        ))
-    
-    return evaluate_go_nogo(weather_series, limits, use_gate_b)
+    timestamps, wave_ft, wind_kt = load_forecast_arrays(weather_json_path)
+    return evaluate_go_nogo_arrays(wave_ft, wind_kt, limits, use_gate_b, timestamps=timestamps)
 
 
 def run_gonogo_manual(
@@ -494,16 +1151,7 @@ def run_gonogo_manual(
     if len(wave_ft_series) != len(wind_kt_series):
         raise ValueError("wave_ft_series and wind_kt_series must have same length")
     
-    weather_series = []
-    base_time = datetime.now()
-    for i, (wave_ft, wind_kt) in enumerate(zip(wave_ft_series, wind_kt_series)):
-        weather_series.append(WeatherInput(
-            wave_ft=wave_ft,
-            wind_kt=wind_kt,
-            timestamp=base_time + timedelta(hours=i)
-        ))
-    
-    return evaluate_go_nogo(weather_series, limits, use_gate_b)
+    return evaluate_go_nogo_arrays(wave_ft_series, wind_kt_series, limits, use_gate_b)
 
 
 def main():
@@ -513,6 +1161,7 @@ def main():
     Usage:
         python weather_go_nogo.py --json weather_forecast.json
         python weather_go_nogo.py --manual "6.5,7.0,6.8,6.2" "18,20,19,17"
+        python weather_go_nogo.py --json weather_forecast.json --sweep-hs-limit 2.5,3.0,3.5 --sweep-sailing-time 8,10,12
     """
     import argparse
     
@@ -564,6 +1213,42 @@ def main():
         '--output-html',
         help='Output HTML file path (for integration into AGI TR SCHEDULE)'
     )
+    parser.add_argument(
+        '--windows-json',
+        help='Output JSON file path listing every feasible departure window (requires --json)'
+    )
+    parser.add_argument(
+        '--ensemble-json',
+        help='Ensemble forecast JSON (members x hours); prints P(GO) per departure time'
+    )
+    parser.add_argument(
+        '--ensemble-out',
+        help='Output JSON file path for ensemble P(GO) per departure time'
+    )
+    parser.add_argument(
+        '--sweep-hs-limit',
+        help='Sensitivity sweep: comma-separated Hs limits (m), e.g. "2.5,3.0,3.5"'
+    )
+    parser.add_argument(
+        '--sweep-wind-limit',
+        help='Sensitivity sweep: comma-separated wind limits (kt)'
+    )
+    parser.add_argument(
+        '--sweep-sailing-time',
+        help='Sensitivity sweep: comma-separated sailing times (hr), e.g. "8,10,12"'
+    )
+    parser.add_argument(
+        '--sweep-reserve',
+        help='Sensitivity sweep: comma-separated reserve times (hr)'
+    )
+    parser.add_argument(
+        '--sweep-json',
+        help='Output JSON file path for the sweep decision cube'
+    )
+    parser.add_argument(
+        '--sweep-csv',
+        help='Output CSV file path for the sweep scenarios'
+    )
     
     args = parser.parse_args()
     
@@ -575,6 +1260,78 @@ def main():
         Reserve_hr=args.reserve
     )
     
+    # Ensemble (probabilistic) mode
+    if args.ensemble_json:
+        if not os.path.exists(args.ensemble_json):
+            print(f"Error: JSON file not found: {args.ensemble_json}")
+            return
+        timestamps, wave_ens, wind_ens = load_ensemble_arrays(args.ensemble_json)
+        ensemble = evaluate_ensemble(wave_ens, wind_ens, limits, not args.no_gate_b, timestamps)
+        print("\n" + "="*60)
+        print(f"SEA TRANSIT WEATHER GO/NO-GO ENSEMBLE ({ensemble.n_members} members)")
+        print("="*60)
+        print(f"\nP(any feasible window): {ensemble.p_window:.0%}")
+        print(f"Required window: {ensemble.required_window_hr}hr\n")
+        for row in ensemble.to_records():
+            print(f"  {row['departure']}: P(GO)={row['p_go']:.0%}")
+        if args.ensemble_out:
+            with open(args.ensemble_out, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "n_members": ensemble.n_members,
+                    "required_window_hr": ensemble.required_window_hr,
+                    "p_window": ensemble.p_window,
+                    "departures": ensemble.to_records()
+                }, f, indent=2)
+            print(f"\nEnsemble JSON saved to: {args.ensemble_out}")
+        print("\n" + "="*60 + "\n")
+        return
+    
+    # Sensitivity sweep mode
+    sweep_args = {
+        "Hs_limit_m": args.sweep_hs_limit,
+        "Wind_limit_kt": args.sweep_wind_limit,
+        "SailingTime_hr": args.sweep_sailing_time,
+        "Reserve_hr": args.sweep_reserve,
+    }
+    grid = {
+        name: [float(x.strip()) for x in values.split(',')]
+        for name, values in sweep_args.items() if values
+    }
+    if grid:
+        timestamps = None
+        if args.json:
+            if not os.path.exists(args.json):
+                print(f"Error: JSON file not found: {args.json}")
+                return
+            timestamps, wave_series, wind_series = load_forecast_arrays(args.json)
+        elif args.manual_wave and args.manual_wind:
+            wave_series = [float(x.strip()) for x in args.manual_wave.split(',')]
+            wind_series = [float(x.strip()) for x in args.manual_wind.split(',')]
+        else:
+            print("Error: Must provide either --json or both --manual-wave and --manual-wind")
+            parser.print_help()
+            return
+        
+        sweep = sweep_limits(
+            wave_series, wind_series, grid, limits, not args.no_gate_b, timestamps
+        )
+        records = sweep.to_records()
+        print("\n" + "="*60)
+        print(f"SEA TRANSIT WEATHER GO/NO-GO SWEEP ({len(records)} scenarios)")
+        print("="*60)
+        for row in records:
+            point = ", ".join(f"{name}={row[name]}" for name in grid)
+            print(f"  {point}: {row['decision']} (max window {row['max_window_hr']}hr)")
+        if args.sweep_json:
+            with open(args.sweep_json, 'w', encoding='utf-8') as f:
+                json.dump(sweep.to_json_dict(), f, indent=2, ensure_ascii=False)
+            print(f"\nSweep JSON saved to: {args.sweep_json}")
+        if args.sweep_csv:
+            sweep.write_csv(args.sweep_csv)
+            print(f"\nSweep CSV saved to: {args.sweep_csv}")
+        print("\n" + "="*60 + "\n")
+        return
+    
     # Run evaluation
     if args.json:
         if not os.path.exists(args.json):
@@ -621,6 +1378,21 @@ def main():
             f.write(html_output)
         print(f"\nHTML output saved to: {args.output_html}")
     
+    # Save departure windows if requested
+    if args.windows_json:
+        if not args.json:
+            print("\nWarning: --windows-json requires --json (timestamps needed)")
+        else:
+            timestamps, wave_ft, wind_kt = load_forecast_arrays(args.json)
+            masks = compute_gate_masks(wave_ft, wind_kt, limits, not args.no_gate_b)
+            index = build_departure_index(masks, limits, timestamps)
+            with open(args.windows_json, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "required_window_hr": index.required_window_hr,
+                    "windows": index.to_records()
+                }, f, indent=2)
+            print(f"\nDeparture windows ({len(index.slack_hr)}) saved to: {args.windows_json}")
+    
     print("\n" + "="*60 + "\n")
 
 
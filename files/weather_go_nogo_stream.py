@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Incremental Weather Go/No-Go evaluator for rolling forecast updates
+
+Keeps gate masks, continuous-GO runs and marginal counters for a forecast
+that providers update several times a day. Appended or revised hours only
+touch the changed entries and the runs next to them; the horizon can be
+rolled forward with drop_before(). State is persisted as .npz between runs.
+
+Usage:
+    python weather_go_nogo_stream.py --state out/gonogo_state.npz --json weather_forecast.json
+"""
+
+from dataclasses import asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+import heapq
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from weather_go_nogo import (
+    REASON_CODE_BITS,
+    DepartureIndex,
+    GateResult,
+    GoNoGoLimits,
+    GoNoGoResult,
+    assemble_go_nogo_result,
+    build_departure_index,
+    compute_gate_masks,
+    gate_c_from_window,
+    load_forecast_arrays,
+    summarize_gate_counts,
+    to_datetime64,
+)
+
+_BITS = np.array(list(REASON_CODE_BITS.values()), dtype=np.uint8)
+_DEFAULT_STEP_S = 3600  # Duration of a lone forecast entry (one hour)
+
+
+def _bits_from_counts(counts: np.ndarray) -> int:
+    """OR of the reason bits that still have a non-zero count"""
+    return int(np.bitwise_or.reduce(_BITS[counts > 0])) if (counts > 0).any() else 0
+
+
+class StreamingGoNoGo:
+    """
+    Stateful Go/No-Go evaluator over a time-indexed forecast
+
+    Entries are kept sorted by timestamp in growable arrays. Each entry holds
+    until the next timestamp (as in weather_go_nogo Gate-C), so the decision
+    always equals evaluate_go_nogo_arrays over the current series.
+    """
+
+    def __init__(self, limits: Optional[GoNoGoLimits] = None, use_gate_b: bool = True):
+        self.limits = limits or GoNoGoLimits()
+        self.use_gate_b = use_gate_b
+        self._rebuild(
+            np.zeros(0, dtype='datetime64[s]'), np.zeros(0), np.zeros(0)
+        )
+
+    def __len__(self) -> int:
+        return self._n - self._lo
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._ts[self._lo:self._n]
+
+    @property
+    def wave_ft(self) -> np.ndarray:
+        return self._wave[self._lo:self._n]
+
+    @property
+    def wind_kt(self) -> np.ndarray:
+        return self._wind[self._lo:self._n]
+
+    def upsert(
+        self,
+        timestamps: Sequence,
+        wave_ft: Sequence[float],
+        wind_kt: Sequence[float]
+    ) -> int:
+        """
+        Add new forecast hours and replace revised ones
+
+        Hours after the current horizon are appended and existing timestamps
+        are updated in place, both in O(changed entries + adjacent runs).
+        Hours inserted before or inside the horizon fall back to a full
+        (vectorized) rebuild.
+
+        Returns:
+            Number of entries whose values changed or were added
+        """
+        ts = to_datetime64(timestamps)
+        wave = np.asarray(wave_ft, dtype=float)
+        wind = np.asarray(wind_kt, dtype=float)
+        if not (ts.shape == wave.shape == wind.shape):
+            raise ValueError("timestamps, wave_ft and wind_kt must have same length")
+        if ts.size == 0:
+            return 0
+
+        # Sort the update and keep the last value for duplicated timestamps
+        order = np.argsort(ts, kind='stable')
+        ts, wave, wind = ts[order], wave[order], wind[order]
+        keep = np.append(ts[1:] != ts[:-1], True)
+        ts, wave, wind = ts[keep], wave[keep], wind[keep]
+
+        current = self.timestamps
+        pos = np.searchsorted(current, ts)
+        exists = pos < current.size
+        exists[exists] = current[pos[exists]] == ts[exists]
+        new = ~exists
+
+        if new.any() and current.size and ts[new][0] <= current[-1]:
+            merged_ts = np.concatenate([current, ts[new]])
+            merged_wave = np.concatenate([self.wave_ft, wave[new]])
+            merged_wind = np.concatenate([self.wind_kt, wind[new]])
+            merged_wave[pos[exists]] = wave[exists]
+            merged_wind[pos[exists]] = wind[exists]
+            order = np.argsort(merged_ts, kind='stable')
+            self._rebuild(merged_ts[order], merged_wave[order], merged_wind[order])
+            return int(new.sum() + exists.sum())
+
+        # In-place replacements (skip identical revisions)
+        replaced = self._lo + pos[exists]
+        differs = (self._wave[replaced] != wave[exists]) | (self._wind[replaced] != wind[exists])
+        replaced = replaced[differs]
+        appended = np.arange(self._n, self._n + int(new.sum()))
+        changed = np.concatenate([replaced, appended])
+        if changed.size == 0:
+            return 0
+
+        self._ensure_capacity(self._n + appended.size)
+        regions = self._affected_regions(changed, self._n + appended.size)
+
+        self._account(replaced, -1)
+        self._wave[replaced] = wave[exists][differs]
+        self._wind[replaced] = wind[exists][differs]
+        self._ts[appended] = ts[new]
+        self._sec[appended] = ts[new].astype(np.int64)
+        self._wave[appended] = wave[new]
+        self._wind[appended] = wind[new]
+        self._run_first[appended] = -1
+        self._n += appended.size
+
+        self._score(changed)
+        self._account(changed, +1)
+        for lo, hi in regions:
+            self._rebuild_runs(lo, hi)
+        return int(changed.size)
+
+    def drop_before(self, timestamp) -> int:
+        """Roll the horizon forward: forget entries before timestamp"""
+        cutoff = to_datetime64([timestamp])[0]
+        k = int(np.searchsorted(self.timestamps, cutoff))
+        if k == 0:
+            return 0
+        new_lo = self._lo + k
+        remaining = self._n - new_lo
+        if remaining <= 2 or new_lo > max(1024, self._n // 2):
+            # Tiny remainder (last-entry step changes) or compaction due
+            self._rebuild(self._ts[new_lo:self._n].copy(),
+                          self._wave[new_lo:self._n].copy(),
+                          self._wind[new_lo:self._n].copy())
+            return k
+
+        # The run straddling the cutoff now starts at the new first entry
+        hi = new_lo
+        if self._run_first[new_lo] >= 0:
+            hi = self._run_first_last(new_lo)
+
+        dropped = np.arange(self._lo, new_lo)
+        self._account(dropped, -1)
+        for first in np.unique(self._run_first[dropped]):
+            if first >= 0:
+                self._runs.pop(int(first), None)
+        self._run_first[dropped] = -1
+        self._lo = new_lo
+        self._rebuild_runs(new_lo, hi)
+        return k
+
+    def max_continuous_hr(self) -> float:
+        """Longest continuous GO window (hours) over the current series"""
+        heap = self._heap
+        while heap:
+            neg_duration, first, last = heap[0]
+            if first >= self._lo and self._runs.get(first) == (last, -neg_duration):
+                return -neg_duration / 3600.0
+            heapq.heappop(heap)
+        return 0.0
+
+    def result(self) -> GoNoGoResult:
+        """Current Go/No-Go decision (same as a full evaluation)"""
+        n = len(self)
+        gate_a_summary = summarize_gate_counts(
+            self._n_a_pass, n, _bits_from_counts(self._bits_a)
+        )
+        gate_b_summary = None
+        failing_bits = None
+        if self.use_gate_b:
+            if n:
+                gate_b_summary = summarize_gate_counts(
+                    self._n_b_pass, n, _bits_from_counts(self._bits_b)
+                )
+            else:
+                gate_b_summary = GateResult(passed=None, reason_codes=[], details="Not evaluated")
+            failing_bits = _bits_from_counts(self._bits_c)
+        gate_c_result = gate_c_from_window(self.max_continuous_hr(), self.limits, failing_bits)
+        marginal_conditions = self._n_a_pass > 0 and self._n_near > 0
+        return assemble_go_nogo_result(
+            gate_a_summary, gate_b_summary, gate_c_result, marginal_conditions
+        )
+
+    def departure_index(self) -> DepartureIndex:
+        """Feasible departures over the current series (linear pass)"""
+        masks = compute_gate_masks(self.wave_ft, self.wind_kt, self.limits, self.use_gate_b)
+        return build_departure_index(masks, self.limits, self.timestamps)
+
+    def save(self, path: str) -> None:
+        """Persist the forecast columns and limits (.npz)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                timestamps=self.timestamps,
+                wave_ft=self.wave_ft,
+                wind_kt=self.wind_kt,
+                config=np.array(json.dumps({
+                    "limits": asdict(self.limits),
+                    "use_gate_b": self.use_gate_b
+                }, ensure_ascii=False))
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        limits: Optional[GoNoGoLimits] = None,
+        use_gate_b: Optional[bool] = None
+    ) -> "StreamingGoNoGo":
+        """
+        Restore a saved evaluator
+
+        Masks and runs are rebuilt in one vectorized pass; pass limits or
+        use_gate_b to re-evaluate the stored forecast under new settings.
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data['config']))
+            evaluator = cls(
+                limits or GoNoGoLimits(**config['limits']),
+                config['use_gate_b'] if use_gate_b is None else use_gate_b
+            )
+            evaluator._rebuild(data['timestamps'], data['wave_ft'], data['wind_kt'])
+        return evaluator
+
+    # ------------------------------------------------------------------
+    # Internal state maintenance
+    # ------------------------------------------------------------------
+    def _rebuild(self, ts: np.ndarray, wave: np.ndarray, wind: np.ndarray) -> None:
+        """Recompute all state from scratch (vectorized)"""
+        ts = np.asarray(ts, dtype='datetime64[s]')
+        if ts.size and np.any(ts[1:] <= ts[:-1]):
+            raise ValueError("timestamps must be strictly increasing")
+        n = ts.size
+        capacity = max(64, 2 * n)
+        self._ts = np.zeros(capacity, dtype='datetime64[s]')
+        self._sec = np.zeros(capacity, dtype=np.int64)
+        self._wave = np.zeros(capacity)
+        self._wind = np.zeros(capacity)
+        self._codes_a = np.zeros(capacity, dtype=np.uint8)
+        self._codes_b = np.zeros(capacity, dtype=np.uint8)
+        self._near = np.zeros(capacity, dtype=bool)
+        self._run_first = np.full(capacity, -1, dtype=np.int64)
+        self._ts[:n] = ts
+        self._sec[:n] = ts.astype(np.int64)
+        self._wave[:n] = wave
+        self._wind[:n] = wind
+        self._lo = 0
+        self._n = n
+
+        self._n_a_pass = self._n_b_pass = self._n_near = 0
+        self._bits_a = np.zeros(_BITS.size, dtype=np.int64)
+        self._bits_b = np.zeros(_BITS.size, dtype=np.int64)
+        self._bits_c = np.zeros(_BITS.size, dtype=np.int64)
+        self._runs: Dict[int, Tuple[int, int]] = {}  # first -> (last, duration_s)
+        self._heap: List[Tuple[int, int, int]] = []  # (-duration_s, first, last)
+
+        everything = np.arange(n)
+        self._score(everything)
+        self._account(everything, +1)
+        if n:
+            self._rebuild_runs(0, n - 1)
+
+    def _ensure_capacity(self, size: int) -> None:
+        capacity = self._ts.size
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity)
+        for name in ('_ts', '_sec', '_wave', '_wind', '_codes_a', '_codes_b', '_near'):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:old.size] = old
+            setattr(self, name, grown)
+        run_first = np.full(new_capacity, -1, dtype=np.int64)
+        run_first[:capacity] = self._run_first
+        self._run_first = run_first
+
+    def _score(self, idx: np.ndarray) -> None:
+        """Recompute gate codes and marginal flags for entries idx"""
+        if idx.size == 0:
+            return
+        masks = compute_gate_masks(self._wave[idx], self._wind[idx], self.limits, self.use_gate_b)
+        self._codes_a[idx] = masks.gate_a_codes
+        if masks.gate_b_codes is not None:
+            self._codes_b[idx] = masks.gate_b_codes
+        self._near[idx] = (
+            (masks.hs_m > self.limits.Hs_limit_m * 0.85)
+            | (masks.wind_kt > self.limits.Wind_limit_kt * 0.85)
+        )
+
+    def _account(self, idx: np.ndarray, sign: int) -> None:
+        """Add (+1) or remove (-1) entries idx from the summary counters"""
+        if idx.size == 0:
+            return
+        codes_a = self._codes_a[idx]
+        codes_b = self._codes_b[idx]
+        not_go = (codes_a | codes_b) != 0
+        self._n_a_pass += sign * int(np.count_nonzero(codes_a == 0))
+        self._n_b_pass += sign * int(np.count_nonzero(codes_b == 0))
+        self._n_near += sign * int(np.count_nonzero(self._near[idx]))
+        hits_a = (codes_a[:, None] & _BITS) != 0
+        hits_b = (codes_b[:, None] & _BITS) != 0
+        self._bits_a += sign * hits_a.sum(axis=0)
+        self._bits_b += sign * hits_b.sum(axis=0)
+        self._bits_c += sign * hits_b[not_go].sum(axis=0)
+
+    def _go(self, lo: int, hi: int) -> np.ndarray:
+        return (self._codes_a[lo:hi] | self._codes_b[lo:hi]) == 0
+
+    def _end_sec(self, i: int, n: int) -> int:
+        """End of entry i's bucket (next timestamp, or previous step for the last)"""
+        if i + 1 < n:
+            return int(self._sec[i + 1])
+        if i - 1 >= self._lo:
+            return int(2 * self._sec[i] - self._sec[i - 1])
+        return int(self._sec[i]) + _DEFAULT_STEP_S
+
+    def _run_first_last(self, i: int) -> int:
+        return self._runs[int(self._run_first[i])][0]
+
+    def _affected_regions(self, changed: np.ndarray, n_after: int) -> List[Tuple[int, int]]:
+        """Merged [lo, hi] index ranges whose runs must be recomputed"""
+        regions: List[Tuple[int, int]] = []
+        for i in np.sort(changed):
+            lo = max(self._lo, int(i) - 1)
+            hi = min(n_after - 1, int(i) + 1)
+            if lo < self._n and self._run_first[lo] >= 0:
+                lo = int(self._run_first[lo])
+            if hi < self._n and self._run_first[hi] >= 0:
+                hi = self._run_first_last(hi)
+            if regions and lo <= regions[-1][1] + 1:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], hi))
+            else:
+                regions.append((lo, hi))
+        return regions
+
+    def _rebuild_runs(self, lo: int, hi: int) -> None:
+        """Recompute the continuous-GO runs inside [lo, hi] (region bounded by run edges)"""
+        stale = np.unique(self._run_first[lo:hi + 1])
+        for first in stale[stale >= 0]:
+            self._runs.pop(int(first), None)
+        self._run_first[lo:hi + 1] = -1
+
+        go = self._go(lo, hi + 1)
+        if not go.any():
+            return
+        edges = np.diff(np.concatenate(([0], go.view(np.int8), [0])))
+        firsts = np.flatnonzero(edges == 1) + lo
+        lasts = np.flatnonzero(edges == -1) - 1 + lo
+        for first, last in zip(firsts.tolist(), lasts.tolist()):
+            duration = self._end_sec(last, self._n) - int(self._sec[first])
+            self._runs[first] = (last, duration)
+            self._run_first[first:last + 1] = first
+            heapq.heappush(self._heap, (-duration, first, last))
+        if len(self._heap) > 4 * max(len(self._runs), 16):
+            self._heap = [(-d, f, l) for f, (l, d) in self._runs.items() if f >= self._lo]
+            heapq.heapify(self._heap)
+
+
+def main():
+    """CLI: merge a forecast JSON into a persisted evaluator and print the decision"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Incremental SEA TRANSIT Weather Go/No-Go (rolling forecast updates)"
+    )
+    parser.add_argument('--state', required=True, help='Evaluator state file (.npz)')
+    parser.add_argument('--json', help='Forecast JSON with new/revised hours to merge')
+    parser.add_argument('--drop-before', help='Forget entries before this ISO timestamp')
+    parser.add_argument('--no-gate-b', action='store_true', help='Disable Gate-B squall buffer')
+    args = parser.parse_args()
+
+    use_gate_b = not args.no_gate_b
+    if os.path.exists(args.state):
+        evaluator = StreamingGoNoGo.load(args.state, use_gate_b=use_gate_b)
+        print(f"Loaded state: {len(evaluator)} entries")
+    else:
+        evaluator = StreamingGoNoGo(use_gate_b=use_gate_b)
+
+    if args.json:
+        changed = evaluator.upsert(*load_forecast_arrays(args.json))
+        print(f"Merged {args.json}: {changed} entries changed")
+    if args.drop_before:
+        dropped = evaluator.drop_before(args.drop_before)
+        print(f"Dropped {dropped} entries before {args.drop_before}")
+
+    result = evaluator.result()
+    print(f"\nDecision: {result.decision}")
+    print(f"Rationale: {result.rationale}")
+    evaluator.save(args.state)
+    print(f"State saved to: {args.state}")
+
+
+if __name__ == "__main__":
+    main()
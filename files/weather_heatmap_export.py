@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Data-only heatmap outputs for the dashboard (JSON + lightweight SVG).
+
+The JSON carries the risk matrix, statuses, Shamal flags and coverage so the
+Next.js dashboard can render the heatmap natively; the SVG is a small static
+fallback. Neither needs matplotlib, and both are a few KB instead of the
+~200 KB base64 PNG embedded by embed_heatmap_base64.py.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+HEATMAP_JSON_VERSION = 1
+
+# Heatmap rows: (key, label, fixed normalization range, decimals)
+HEATMAP_ROWS = [
+    ("risk", "Risk (0-100)", (0.0, 100.0), 0),
+    ("windDirDeg", "Dir (deg)", (0.0, 360.0), 0),
+    ("visKm", "Vis (km)", (0.0, 10.0), 1),
+    ("waveM", "Wave (m)", (0.0, 2.5), 1),
+    ("gustKt", "Gust (kt)", (0.0, 30.0), 0),
+    ("windKt", "Wind (kt)", (0.0, 25.0), 0),
+]
+
+
+def heatmap_matrix(risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn):
+    """
+    Stack the heatmap rows and normalize each to its fixed range.
+
+    Returns:
+        (data_matrix, data_norm), both [rows x days]
+    """
+    data_matrix = np.vstack([risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn]).astype(float)
+    lo = np.array([r[2][0] for r in HEATMAP_ROWS])[:, None]
+    hi = np.array([r[2][1] for r in HEATMAP_ROWS])[:, None]
+    data_norm = np.clip((data_matrix - lo) / (hi - lo + 1e-9), 0.0, 1.0)
+    return data_matrix, data_norm
+
+
+def _rounded(values, decimals: int = 1) -> list:
+    arr = np.round(np.asarray(values, dtype=float), decimals)
+    return [None if np.isnan(v) else (int(v) if decimals == 0 else float(v)) for v in arr.ravel()]
+
+
+def heatmap_payload(
+    days: list[date],
+    risk,
+    status: list[str],
+    shamal,
+    coverage,
+    wind_kn,
+    gust_kn,
+    wave_m,
+    vis_km,
+    wdir_deg,
+    voyages: list[dict],
+    hourly_risk=None,
+) -> dict:
+    """Compact JSON-serializable heatmap data (camelCase keys for the dashboard)"""
+    data_matrix, _ = heatmap_matrix(risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn)
+    n = len(days)
+    start, end = (days[0], days[-1]) if n else (None, None)
+    coverage = [str(c) for c in coverage]
+    payload = {
+        "version": HEATMAP_JSON_VERSION,
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "dates": [d.isoformat() for d in days],
+        "rows": [
+            {
+                "key": key,
+                "label": label,
+                "range": list(rng),
+                "values": _rounded(data_matrix[r]),
+            }
+            for r, (key, label, rng, _) in enumerate(HEATMAP_ROWS)
+        ],
+        "status": list(status),
+        "shamal": [bool(s) for s in shamal],
+        "coverage": coverage,
+        "voyages": [
+            {
+                "name": v["name"],
+                "label": v["label"],
+                "type": v["type"],
+                "start": v["start"].isoformat(),
+                "end": v["end"].isoformat(),
+            }
+            for v in voyages
+            if n and not (v["end"] < start or v["start"] > end)
+        ],
+        "summary": {
+            "go": status.count("GO"),
+            "hold": status.count("HOLD"),
+            "nogo": status.count("NO-GO"),
+            "shamal": int(np.sum(shamal)),
+            "coverage": {k: coverage.count(k) for k in sorted(set(coverage)) if k},
+        },
+    }
+    if hourly_risk is not None:
+        payload["hourlyRisk"] = [_rounded(row, 0) for row in np.asarray(hourly_risk)]
+    return payload
+
+
+def sites_payload(
+    sites: dict[str, tuple[float, float]],
+    days: list[date],
+    risk,
+    status: list[list[str]],
+    shamal,
+    coverage,
+    voyage_worst: list[dict],
+) -> dict:
+    """Multi-site JSON: per-site daily risk rows, the worst site per day and per-voyage worst cases"""
+    risk = np.asarray(risk, dtype=float)
+    names = list(sites)
+    worst_site = np.argmax(risk, axis=0) if len(names) else np.zeros(0, dtype=int)
+    return {
+        "version": HEATMAP_JSON_VERSION,
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "dates": [d.isoformat() for d in days],
+        "sites": [
+            {
+                "name": name,
+                "lat": lat,
+                "lon": lon,
+                "risk": _rounded(risk[i], 0),
+                "status": list(status[i]),
+                "shamal": [bool(x) for x in np.asarray(shamal)[i]],
+                "coverage": [str(c) for c in np.asarray(coverage)[i]],
+            }
+            for i, (name, (lat, lon)) in enumerate(sites.items())
+        ],
+        "worstCase": {
+            "risk": _rounded(risk.max(axis=0), 0) if len(names) else [],
+            "site": [names[i] for i in worst_site],
+        },
+        "voyages": [
+            {
+                "name": v["name"],
+                "label": v["label"],
+                "type": v["type"],
+                "worstRisk": round(v["worst_risk"]),
+                "status": v["status"],
+                "site": v["site"],
+                "date": v["date"].isoformat(),
+                "siteMaxRisk": {
+                    k: None if r is None else round(r) for k, r in v["site_max_risk"].items()
+                },
+                "shamalDays": v["shamal_days"],
+            }
+            for v in voyage_worst
+        ],
+    }
+
+
+def write_heatmap_json(path: str, payload: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _hex_to_rgb(color: str) -> np.ndarray:
+    color = color.lstrip("#")[:6]
+    return np.array([int(color[i : i + 2], 16) for i in (0, 2, 4)], dtype=float)
+
+
+def _cmap_hex(values, colors: list[str]) -> list[str]:
+    """Linear colormap over evenly spaced colors (same as from_list)."""
+    stops = np.linspace(0.0, 1.0, len(colors))
+    rgb = np.array([_hex_to_rgb(c) for c in colors])
+    values = np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+    channels = [np.interp(values, stops, rgb[:, k]) for k in range(3)]
+    return [
+        "#%02x%02x%02x" % tuple(int(round(c[i])) for c in channels)
+        for i in range(values.size)
+    ]
+
+
+def render_heatmap_svg(payload: dict, theme: dict, cell_w: int = 64, cell_h: int = 28) -> str:
+    """Static SVG heatmap (parameter rows, status bar, date labels) from a payload"""
+    dates = payload["dates"]
+    n = len(dates)
+    label_w, status_h, axis_h = 110, 22, 22
+    rows = list(reversed(payload["rows"]))  # Wind on top, Risk at the bottom (as the PNG)
+    width = label_w + n * cell_w
+    height = len(rows) * cell_h + status_h + axis_h + 8
+    font = 'font-family="DejaVu Sans,Arial,sans-serif" font-size="11"'
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="100%" height="100%" fill="{theme["bg_primary"]}"/>',
+    ]
+    for r, row in enumerate(rows):
+        y = r * cell_h
+        lo, hi = row["range"]
+        values = np.array([np.nan if v is None else v for v in row["values"]], dtype=float)
+        norm = np.clip((values - lo) / (hi - lo + 1e-9), 0.0, 1.0)
+        fills = _cmap_hex(norm, theme["cmap"])
+        decimals = next(d for k, _, _, d in HEATMAP_ROWS if k == row["key"])
+        parts.append(
+            f'<text x="{label_w - 6}" y="{y + cell_h / 2 + 4}" text-anchor="end" '
+            f'fill="{theme["text_primary"]}" font-weight="bold" {font}>{escape(row["label"])}</text>'
+        )
+        for c in range(n):
+            x = label_w + c * cell_w
+            parts.append(
+                f'<rect x="{x}" y="{y}" width="{cell_w}" height="{cell_h}" fill="{fills[c]}"/>'
+            )
+            if np.isnan(values[c]):
+                continue
+            txt_color = theme["text_primary"] if norm[c] > 0.5 else theme["bg_primary"]
+            parts.append(
+                f'<text x="{x + cell_w / 2}" y="{y + cell_h / 2 + 4}" text-anchor="middle" '
+                f'fill="{txt_color}" font-weight="bold" {font}>{values[c]:.{decimals}f}</text>'
+            )
+
+    y = len(rows) * cell_h + 4
+    for c in range(n):
+        x = label_w + c * cell_w
+        color = theme["status"].get(payload["status"][c], theme["text_muted"])
+        parts.append(
+            f'<rect x="{x + 2}" y="{y}" width="{cell_w - 4}" height="{status_h}" fill="{color}">'
+            f'<title>{escape(payload["status"][c])}</title></rect>'
+        )
+        if payload["shamal"][c]:
+            parts.append(
+                f'<rect x="{x}" y="0" width="{cell_w}" height="{y + status_h}" fill="none" '
+                f'stroke="{theme["shamal"]}" stroke-width="2"/>'
+            )
+        label = datetime.strptime(dates[c], "%Y-%m-%d").strftime("%d %b")
+        parts.append(
+            f'<text x="{x + cell_w / 2}" y="{y + status_h + 16}" text-anchor="middle" '
+            f'fill="{theme["text_primary"]}" {font}>{label}</text>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def write_heatmap_svg(path: str, payload: dict, theme: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_heatmap_svg(payload, theme))
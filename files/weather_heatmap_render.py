@@ -0,0 +1,579 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard heatmap renderer for WEATHER_DASHBOARD.py (dark theme PNG).
+
+matplotlib is imported only when a figure is built, so the data and risk
+steps can import the dashboard without the plotting stack.
+
+HeatmapFigure builds the static layout (axes, colorbar, bands, legends, cell
+text artists) once; update() swaps in a window's data in place, so batch
+renders of many date windows reuse one Agg canvas per window length.
+render_heatmap_batch() optionally fans the windows out over processes.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+
+from weather_heatmap_export import HEATMAP_ROWS, heatmap_matrix
+
+_RC_THEMED = False
+
+
+def _apply_theme_rc(theme: dict) -> None:
+    import matplotlib as mpl
+
+    # Set dark theme for matplotlib
+    mpl.rcParams.update(
+        {
+            "font.family": "sans-serif",
+            "font.sans-serif": ["Arial", "DejaVu Sans", "Helvetica"],
+            "axes.unicode_minus": False,
+            "figure.dpi": 150,
+            "axes.titlesize": 12,
+            "axes.labelsize": 10,
+            "xtick.labelsize": 9,
+            "ytick.labelsize": 9,
+            "axes.facecolor": theme["bg_secondary"],
+            "axes.edgecolor": theme["grid_color"],
+            "axes.labelcolor": theme["text_primary"],
+            "axes.titlecolor": theme["text_primary"],
+            "xtick.color": theme["text_secondary"],
+            "ytick.color": theme["text_secondary"],
+            "text.color": theme["text_primary"],
+            "figure.facecolor": theme["bg_primary"],
+            "axes.grid": True,
+            "grid.color": theme["grid_color"],
+            "grid.alpha": 0.3,
+            "grid.linewidth": 0.5,
+            "axes.spines.top": False,
+            "axes.spines.right": False,
+        }
+    )
+
+
+class HeatmapFigure:
+    """Reusable 3-panel heatmap figure for windows of n_days days."""
+
+    def __init__(self, n_days: int, theme: dict):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.colors import LinearSegmentedColormap
+        from matplotlib.figure import Figure
+        import matplotlib.patches as mpatches
+
+        _apply_theme_rc(theme)
+        self.theme = theme
+        self.n = n = n_days
+        self._dynamic = []
+        self._voyage_text = []
+        self._static_bbox = None  # tight bbox (inches) of the window-independent artists
+
+        # Heatmap parameters (fixed normalization ranges shared with the JSON/SVG export)
+        params = [label for _, label, _, _ in HEATMAP_ROWS]
+        cmap = LinearSegmentedColormap.from_list("dashboard_risk", theme["cmap"], N=256)
+
+        # Compact figure size for mobile/web; 50% transparency (alpha=0.5) for figure/axes
+        fig = self.fig = Figure(figsize=(12, 8))
+        FigureCanvasAgg(fig)
+        fig.patch.set_facecolor(theme["bg_primary"])
+        fig.patch.set_alpha(0.5)
+
+        gs = fig.add_gridspec(
+            3,
+            2,
+            height_ratios=[2.0, 1.0, 0.6],
+            width_ratios=[1, 0.04],
+            hspace=0.25,
+            wspace=0.03,
+        )
+
+        ax1 = self.ax1 = fig.add_subplot(gs[0, 0])
+        ax2 = self.ax2 = fig.add_subplot(gs[1, 0], sharex=ax1)
+        ax3 = self.ax3 = fig.add_subplot(gs[2, 0], sharex=ax1)
+        ax_cbar = fig.add_subplot(gs[0, 1])
+
+        for ax in (ax1, ax2, ax3, ax_cbar):
+            ax.set_facecolor(theme["bg_secondary"])
+            ax.patch.set_alpha(0.5)
+
+        x_limits = (-0.5, n - 0.5)
+        tick_step = max(1, n // 8)
+        x_ticks = list(range(0, n, tick_step))
+
+        # Heatmap
+        self.im = ax1.imshow(
+            np.zeros((len(params), n)),
+            aspect="auto",
+            cmap=cmap,
+            interpolation="nearest",
+            extent=[-0.5, n - 0.5, -0.5, len(params) - 0.5],
+        )
+
+        ax1.set_yticks(range(len(params)))
+        ax1.set_yticklabels(
+            params, fontsize=10, fontweight="bold", color=theme["text_primary"]
+        )
+        ax1.set_xlim(x_limits)
+        ax1.set_xticks(x_ticks)
+        ax1.tick_params(labelbottom=False)
+        ax1.grid(False)
+
+        # Cell annotations: one text artist per (parameter, day), updated in place
+        self.cell_text = [
+            [
+                ax1.text(
+                    c,
+                    r,
+                    "",
+                    ha="center",
+                    va="center",
+                    fontsize=9,
+                    fontweight="bold",
+                )
+                for c in range(n)
+            ]
+            for r in range(len(params))
+        ]
+
+        # Colorbar
+        cbar = self.cbar = fig.colorbar(self.im, cax=ax_cbar, orientation="vertical", aspect=30)
+        cbar.set_label(
+            "Normalized (fixed ranges)", fontsize=9, color=theme["text_secondary"]
+        )
+        cbar.ax.yaxis.set_tick_params(color=theme["text_secondary"])
+        cbar.outline.set_edgecolor(theme["grid_color"])
+        for label in cbar.ax.get_yticklabels():
+            label.set_color(theme["text_secondary"])
+
+        # Risk timeline (data set per window)
+        (self.risk_line,) = ax2.plot(
+            range(n),
+            np.zeros(n),
+            "o-",
+            linewidth=2,
+            markersize=5,
+            color=theme["accent_primary"],
+        )
+        (self.hourly_line,) = ax2.plot(
+            [],
+            [],
+            linewidth=0.8,
+            alpha=0.7,
+            color=theme["accent_secondary"],
+            label="_nolegend_",
+        )
+
+        # Risk bands
+        ax2.axhspan(0, 30, color=theme["risk_band"]["GO"], zorder=0)
+        ax2.axhspan(30, 60, color=theme["risk_band"]["HOLD"], zorder=0)
+        ax2.axhspan(60, 100, color=theme["risk_band"]["NO-GO"], zorder=0)
+
+        ax2.axhline(
+            y=30,
+            linestyle="--",
+            linewidth=1.5,
+            color=theme["status"]["GO"],
+            label="GO Threshold (30)",
+        )
+        ax2.axhline(
+            y=60,
+            linestyle="--",
+            linewidth=1.5,
+            color=theme["status"]["NO-GO"],
+            label="NO-GO Threshold (60)",
+        )
+
+        ax2.set_xlim(x_limits)
+        ax2.set_ylim(0, 100)
+        ax2.set_xticks(x_ticks)
+        ax2.tick_params(labelbottom=False)
+        ax2.set_ylabel(
+            "Risk Score (0-100)",
+            fontsize=10,
+            fontweight="bold",
+            color=theme["text_primary"],
+        )
+        ax2.set_title(
+            "Composite Weather Risk Score (Ensemble + Marine + Archive/Climate)",
+            fontsize=11,
+            fontweight="bold",
+            color=theme["accent_secondary"],
+            pad=10,
+        )
+
+        # Operation status bar
+        self.bars = ax3.bar(
+            range(n),
+            [1] * n,
+            width=0.9,
+            edgecolor=theme["bg_primary"],
+            linewidth=1,
+        )
+
+        ax3.set_xlim(x_limits)
+        ax3.set_ylim(0, 1.3)
+        # Daily Operation Status: all dates shown (one per bar) for date sync with heatmap
+        ax3.set_xticks(list(range(n)))
+        ax3.tick_params(axis="x", pad=8)
+        ax3.set_yticks([])
+        ax3.set_title(
+            "Daily Operation Status (GO / HOLD / NO-GO)",
+            fontsize=11,
+            fontweight="bold",
+            color=theme["accent_gold"],
+            pad=10,
+        )
+        ax3.grid(False)
+
+        # Legend
+        status_colors = theme["status"]
+        go_patch = mpatches.Patch(color=status_colors["GO"], label="GO (Risk < 30)")
+        hold_patch = mpatches.Patch(color=status_colors["HOLD"], label="HOLD (30-60)")
+        nogo_patch = mpatches.Patch(color=status_colors["NO-GO"], label="NO-GO (>=60)")
+        ax3.legend(
+            handles=[go_patch, hold_patch, nogo_patch],
+            loc="upper left",
+            ncol=3,
+            fontsize=9,
+            framealpha=0.9,
+            facecolor=theme["bg_card"],
+            edgecolor=theme["grid_color"],
+            labelcolor=theme["text_primary"],
+        )
+
+        fig.subplots_adjust(left=0.08, right=0.94, top=0.94, bottom=0.10)
+
+    def _keep(self, artist):
+        self._dynamic.append(artist)
+        return artist
+
+    def update(
+        self,
+        days: list[date],
+        risk,
+        status: list[str],
+        shamal,
+        coverage,
+        wind_kn,
+        gust_kn,
+        wave_m,
+        vis_km,
+        wdir_deg,
+        voyages: list[dict],
+        hourly_risk=None,
+    ) -> dict:
+        """
+        Swap in one window's data; per-window artists are replaced, the rest reused.
+
+        Returns:
+            Summary counts: go, hold, nogo, shamal and coverage
+        """
+        from matplotlib.offsetbox import AnchoredText
+
+        theme = self.theme
+        n = self.n
+        if len(days) != n:
+            raise ValueError(f"HeatmapFigure built for {n} days, got {len(days)}")
+        ax1, ax2, ax3 = self.ax1, self.ax2, self.ax3
+        for artist in self._dynamic:
+            artist.remove()
+        self._dynamic = []
+        self._voyage_text = []
+
+        idx = {d: i for i, d in enumerate(days)}
+        start_date, end_date = days[0], days[-1]
+        risk = np.asarray(risk, dtype=float)
+        shamal = np.asarray(shamal, dtype=bool)
+        coverage = np.asarray(coverage, dtype=object)
+
+        # Heatmap + annotations (high contrast text)
+        data_matrix, data_norm = heatmap_matrix(risk, wdir_deg, vis_km, wave_m, gust_kn, wind_kn)
+        self.im.set_data(data_norm)
+        # Color limits follow each window's data, as a fresh imshow would
+        finite = data_norm[np.isfinite(data_norm)]
+        if finite.size:
+            self.im.set_clim(finite.min(), finite.max())
+        for r, row in enumerate(self.cell_text):
+            decimals = HEATMAP_ROWS[r][3]
+            for c, text in enumerate(row):
+                val = data_matrix[r, c]
+                text.set_visible(not np.isnan(val))
+                if np.isnan(val):
+                    continue
+                text.set_text(f"{val:.{decimals}f}")
+                text.set_color(
+                    theme["text_primary"] if data_norm[r, c] > 0.5 else theme["bg_primary"]
+                )
+
+        # Risk timeline
+        fill = ax2.fill_between(range(n), risk, alpha=0.3, color=theme["accent_primary"])
+        self._keep(fill)
+        self.risk_line.set_ydata(risk)
+        if hourly_risk is not None:
+            hourly_risk = np.asarray(hourly_risk, dtype=float)
+            hours = hourly_risk.shape[1]
+            x_hourly = (np.arange(hourly_risk.size) + 0.5) / hours - 0.5
+            self.hourly_line.set_data(x_hourly, hourly_risk.ravel())
+            self.hourly_line.set_label("Hourly Risk")
+            self.hourly_line.set_visible(True)
+        else:
+            self.hourly_line.set_data([], [])
+            self.hourly_line.set_label("_nolegend_")
+            self.hourly_line.set_visible(False)
+
+        # Voyage overlays
+        voyage_colors = theme["voyage"]
+        for v in voyages:
+            if v["end"] < start_date or v["start"] > end_date:
+                continue
+            s = max(v["start"], start_date)
+            e = min(v["end"], end_date)
+            xs = idx[s]
+            xe = idx[e]
+            color = voyage_colors.get(v["type"], voyage_colors["default"])
+            self._keep(ax2.axvspan(xs, xe, alpha=0.15, color=color, zorder=0))
+            mid = (xs + xe) / 2
+            self._voyage_text.append(
+                ax2.text(
+                    mid,
+                    85,
+                    f'{v["name"]}\n{v["label"]}',
+                    ha="center",
+                    va="top",
+                    fontsize=9,
+                    fontweight="bold",
+                    color=color,
+                    bbox=dict(
+                        boxstyle="round,pad=0.3",
+                        facecolor=theme["bg_card"],
+                        alpha=0.9,
+                        edgecolor=color,
+                        linewidth=1.5,
+                    ),
+                )
+            )
+            self._keep(self._voyage_text[-1])
+
+        ax2.legend(
+            loc="upper right",
+            fontsize=8,
+            framealpha=0.9,
+            facecolor=theme["bg_card"],
+            edgecolor=theme["grid_color"],
+            labelcolor=theme["text_secondary"],
+        )
+
+        # Status summary box
+        go_n = status.count("GO")
+        hold_n = status.count("HOLD")
+        nogo_n = status.count("NO-GO")
+        shamal_n = int(shamal.sum())
+
+        stats_text = (
+            f"Weather Analysis Summary\n"
+            f"{'─'*24}\n"
+            f"Period: {start_date.isoformat()} to {end_date.isoformat()} ({n} days)\n"
+            f"GO Days: {go_n} ({go_n/n*100:.2f}%)\n"
+            f"HOLD Days: {hold_n} ({hold_n/n*100:.2f}%)\n"
+            f"NO-GO Days: {nogo_n} ({nogo_n/n*100:.2f}%)\n"
+            f"Shamal Detected Days (NW+Strong): {shamal_n}\n"
+            f"Max Gust (kt): {np.nanmax(gust_kn):.2f}\n"
+            f"Max Wave (m): {np.nanmax(wave_m):.2f}\n"
+        )
+        stats_box = AnchoredText(
+            stats_text,
+            loc="lower left",
+            prop={
+                "size": 8,
+                "family": "monospace",
+                "weight": "bold",
+                "color": theme["text_primary"],
+            },
+            pad=0.8,
+            borderpad=0.8,
+            frameon=True,
+        )
+        stats_box.patch.set_facecolor(theme["bg_card"])
+        stats_box.patch.set_alpha(0.1)  # 90% transparency
+        stats_box.patch.set_edgecolor(theme["accent_primary"])
+        stats_box.patch.set_linewidth(1.5)
+        self._keep(ax2.add_artist(stats_box))
+
+        # Data coverage box
+        cov_counts = {k: int(np.sum(coverage == k)) for k in np.unique(coverage) if k}
+        cov_lines = "\n".join([f"{k}: {v}" for k, v in cov_counts.items()])
+        cov_text = f"Data Coverage\n{'─'*14}\n{cov_lines}\n\nNote: CLIMATE FILL is modelled baseline, not actual measurement."
+        cov_box = AnchoredText(
+            cov_text,
+            loc="lower right",
+            prop={"size": 7, "family": "monospace", "color": theme["text_secondary"]},
+            pad=0.8,
+            borderpad=0.8,
+            frameon=True,
+        )
+        cov_box.patch.set_facecolor(theme["bg_card"])
+        cov_box.patch.set_alpha(0.1)  # 90% transparency
+        cov_box.patch.set_edgecolor(theme["accent_secondary"])
+        cov_box.patch.set_linewidth(1)
+        self._keep(ax1.add_artist(cov_box))
+
+        # Operation status bar
+        status_colors = theme["status"]
+        for bar, s in zip(self.bars, status):
+            bar.set_facecolor(status_colors[s])
+        ax3.set_xticklabels(
+            [d.strftime("%d %b") for d in days],
+            rotation=0,
+            ha="center",
+            fontsize=10,
+            color=theme["text_primary"],
+            fontweight="bold",
+        )
+
+        # Shamal highlight
+        for i in np.flatnonzero(shamal):
+            for ax in (ax1, ax2, ax3):
+                self._keep(
+                    ax.axvspan(
+                        i - 0.5, i + 0.5, alpha=0.15, color=theme["shamal"], zorder=0
+                    )
+                )
+
+        return {
+            "go": go_n,
+            "hold": hold_n,
+            "nogo": nogo_n,
+            "shamal": shamal_n,
+            "coverage": cov_counts,
+        }
+
+    def _tight_bbox(self):
+        """
+        The "tight" save area, or "tight" to let savefig measure it.
+
+        Only voyage labels, date tick labels and the colorbar ticks (color
+        limits follow the data) change the extent from window to window, so
+        the tight bbox is the cached bbox of everything else joined with
+        their extents, and savefig skips its extra layout pass.
+        """
+        if self._static_bbox is None:
+            return "tight"
+        import matplotlib as mpl
+        from matplotlib.transforms import Bbox
+
+        renderer = self.fig.canvas.get_renderer()
+        extents = [text.get_window_extent(renderer) for text in self._voyage_text]
+        extents.append(self.ax3.xaxis.get_tightbbox(renderer))
+        extents.append(self.cbar.ax.get_tightbbox(renderer))
+        to_inches = self.fig.dpi_scale_trans.inverted()
+        area = Bbox.union([self._static_bbox] + [e.transformed(to_inches) for e in extents])
+        return area.padded(mpl.rcParams["savefig.pad_inches"])
+
+    def save(self, output_path: str) -> None:
+        # Save with 50% transparent background (alpha=0.5) for HTML overlay
+        self.fig.savefig(
+            output_path,
+            dpi=150,
+            bbox_inches=self._tight_bbox(),
+            facecolor="none",
+            edgecolor="none",
+            transparent=True,
+        )
+        if self._static_bbox is None:
+            dynamic = self._voyage_text + [self.ax3.xaxis, self.cbar.ax]
+            for artist in dynamic:
+                artist.set_visible(False)
+            self._static_bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer())
+            for artist in dynamic:
+                artist.set_visible(True)
+
+
+def render_heatmap(
+    output_path: str,
+    days: list[date],
+    risk,
+    status: list[str],
+    shamal,
+    coverage,
+    wind_kn,
+    gust_kn,
+    wave_m,
+    vis_km,
+    wdir_deg,
+    voyages: list[dict],
+    theme: dict,
+    hourly_risk=None,
+) -> dict:
+    """
+    Render the 3-panel weather risk heatmap and save it as a PNG.
+
+    With hourly_risk (days x 24), the intraday risk is drawn under the
+    daily risk line.
+
+    Returns:
+        Summary counts: go, hold, nogo, shamal and coverage
+    """
+    figure = HeatmapFigure(len(days), theme)
+    summary = figure.update(
+        days,
+        risk,
+        status,
+        shamal,
+        coverage,
+        wind_kn,
+        gust_kn,
+        wave_m,
+        vis_km,
+        wdir_deg,
+        voyages,
+        hourly_risk=hourly_risk,
+    )
+    figure.save(output_path)
+    return summary
+
+
+def _render_windows(windows: list[dict], voyages: list[dict], theme: dict) -> list[dict]:
+    """Render windows sequentially, reusing one figure per window length."""
+    figures: dict[int, HeatmapFigure] = {}
+    summaries = []
+    for w in windows:
+        n = len(w["days"])
+        if n not in figures:
+            figures[n] = HeatmapFigure(n, theme)
+        fields = {k: v for k, v in w.items() if k != "output_path"}
+        summary = figures[n].update(voyages=voyages, **fields)
+        figures[n].save(w["output_path"])
+        summaries.append(summary)
+    return summaries
+
+
+def render_heatmap_batch(
+    windows: list[dict],
+    voyages: list[dict],
+    theme: dict,
+    workers: int = 0,
+) -> list[dict]:
+    """
+    Render many date windows, reusing figures instead of rebuilding them.
+
+    Args:
+        windows: Dicts with output_path plus the render_heatmap data fields
+            (days, risk, status, shamal, coverage, wind_kn, gust_kn, wave_m,
+            vis_km, wdir_deg and optionally hourly_risk)
+        workers: > 1 splits the windows into contiguous chunks rendered in
+            that many processes (one figure per process)
+
+    Returns:
+        Summary counts per window, in input order
+    """
+    if workers <= 1 or len(windows) < 2:
+        return _render_windows(windows, voyages, theme)
+
+    workers = min(workers, len(windows))
+    bounds = np.linspace(0, len(windows), workers + 1).astype(int)
+    chunks = [windows[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        results = pool.map(_render_windows, chunks, [voyages] * len(chunks), [theme] * len(chunks))
+        return [summary for chunk in results for summary in chunk]
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Pooled, concurrent HTTP fetching for the Open-Meteo weather calls.
+
+All requests share one keep-alive requests.Session. The connection pool is
+capped per host (pool_block), so parallel fetches never open more than
+max_per_host connections to one API host. Connection errors, 429 and 5xx
+responses are retried with exponential backoff, honouring Retry-After.
+
+Responses are cached on disk (files/out/cache/http/) keyed by URL plus
+normalized params. Archive data never expires, forecasts expire at the next
+model run and climate data after CLIMATE_TTL_S. In replay mode only cached
+responses are served, so runs are reproducible without network access.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pipeline_cache import ResultCache, content_hash
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+FORECAST_CYCLE_HR = 6  # Global models are re-run every 6 h (00/06/12/18 UTC)
+CLIMATE_TTL_S = 30 * 86400
+HTTP_CACHE_MAX_ENTRIES = 512
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a request has no cached response."""
+
+
+def next_model_run(fetched_at: float, cycle_hr: int = FORECAST_CYCLE_HR) -> float:
+    """Epoch seconds of the first model cycle after fetched_at."""
+    cycle_s = cycle_hr * 3600
+    return (fetched_at // cycle_s + 1) * cycle_s
+
+
+def response_expiry(url: str, fetched_at: float) -> float | None:
+    """Expiry (epoch seconds) for a response by source; None = immutable."""
+    host = urlparse(url).netloc
+    if host.startswith("archive-api."):
+        return None
+    if host.startswith("climate-api."):
+        return fetched_at + CLIMATE_TTL_S
+    return next_model_run(fetched_at)
+
+
+class ResponseCache:
+    """Disk cache of JSON responses with per-source expiry."""
+
+    def __init__(self, replay: bool = False, **cache_kwargs):
+        cache_kwargs.setdefault("max_entries", HTTP_CACHE_MAX_ENTRIES)
+        self.store = ResultCache("http", **cache_kwargs)
+        self.replay = replay
+
+    @staticmethod
+    def key(url: str, params: dict | None) -> str:
+        normalized = {k: str(v) for k, v in (params or {}).items() if v is not None}
+        return content_hash(url, normalized)
+
+    def get(self, url: str, params: dict | None, now: float | None = None) -> dict | None:
+        entry = self.store.get(self.key(url, params))
+        if entry is None:
+            if self.replay:
+                raise CacheMiss(url)
+            return None
+        expires_at = entry.get("expires_at")
+        if not self.replay and expires_at is not None and (now or time.time()) >= expires_at:
+            return None
+        return entry["body"]
+
+    def put(self, url: str, params: dict | None, body: dict, now: float | None = None) -> None:
+        fetched_at = now or time.time()
+        self.store.put(
+            self.key(url, params),
+            {
+                "url": url,
+                "fetched_at": fetched_at,
+                "expires_at": response_expiry(url, fetched_at),
+                "body": body,
+            },
+        )
+
+
+class HttpClient:
+    """Thread-safe JSON GET client over one pooled keep-alive session."""
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: ResponseCache | None = None,
+    ):
+        self.timeout = timeout
+        self.cache = cache
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=DEFAULT_MAX_WORKERS,
+            pool_maxsize=max_per_host,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_json(self, url: str, params: dict | None = None, timeout: float | None = None) -> dict:
+        """
+        GET url and decode the JSON body, serving from the cache when fresh.
+
+        Raises on HTTP or decode errors, and CacheMiss in replay mode.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        r = self.session.get(url, params=params, timeout=timeout or self.timeout)
+        r.raise_for_status()
+        body = r.json()
+        if self.cache is not None:
+            self.cache.put(url, params, body)
+        return body
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_client: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Process-wide shared client, created on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient(cache=ResponseCache())
+        return _default_client
+
+
+def configure_default_client(use_cache: bool = True, replay: bool = False) -> HttpClient:
+    """Replace the shared client, e.g. for --no-cache or --replay runs."""
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        cache = ResponseCache(replay=replay) if (use_cache or replay) else None
+        _default_client = HttpClient(cache=cache)
+        return _default_client
+
+
+def run_concurrent(
+    jobs: dict[str, Callable[[], object]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> tuple[dict[str, object], dict[str, Exception]]:
+    """
+    Run independent fetch jobs on a thread pool.
+
+    Wall time is bounded by the slowest job rather than the sum of all jobs.
+
+    Returns:
+        (results by job name, errors by job name)
+    """
+    results: dict[str, object] = {}
+    errors: dict[str, Exception] = {}
+    if not jobs:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {name: pool.submit(fn) for name, fn in jobs.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+    return results, errors
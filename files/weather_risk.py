@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Weather risk scoring core (shared by the heatmap, Go/No-Go and sync steps).
+
+NumPy-only and free of import-time I/O: no plotting, no HTTP, no path
+probing. WEATHER_DASHBOARD.py re-exports these names for backwards
+compatibility and renders the results via weather_heatmap_render.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+
+GO_THRESHOLD = 30.0
+NOGO_THRESHOLD = 60.0
+RISK_LEVEL_SCORES = {"LOW": 20.0, "MEDIUM": 45.0, "HIGH": 75.0}
+
+# Shamal: NW sector with strong wind or gusts
+SHAMAL_DIR_RANGE = (285.0, 345.0)
+SHAMAL_WIND_KN = 18.0
+SHAMAL_GUST_KN = 22.0
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "y", "t")
+    return bool(value)
+
+
+def calc_risk_score(wind_kn, gust_kn, wave_m, vis_km):
+    """Risk 0-100 per element; inputs broadcast, e.g. daily vectors or (days x hours) grids."""
+    wind_risk = np.clip((wind_kn - 12.0) * 4.0, 0.0, 40.0)
+    gust_risk = np.clip((gust_kn - 18.0) * 2.5, 0.0, 30.0)
+    wave_risk = np.clip((wave_m - 0.80) * 35.0, 0.0, 25.0)
+    vis_risk = np.clip((6.0 - vis_km) * 6.0, 0.0, 25.0)
+    score = wind_risk + gust_risk + wave_risk + vis_risk
+    return np.clip(score, 0.0, 100.0)
+
+
+def op_status_from_score(score):
+    if score < GO_THRESHOLD:
+        return "GO"
+    elif score < NOGO_THRESHOLD:
+        return "HOLD"
+    return "NO-GO"
+
+
+def op_status_array(score) -> np.ndarray:
+    """Vectorized op_status_from_score (NaN scores are NO-GO)."""
+    score = np.asarray(score, dtype=float)
+    return np.where(
+        score < GO_THRESHOLD, "GO", np.where(score < NOGO_THRESHOLD, "HOLD", "NO-GO")
+    )
+
+
+def is_shamal_day(wind_dir_deg, wind_kn, gust_kn):
+    if np.isnan(wind_dir_deg) or np.isnan(wind_kn) or np.isnan(gust_kn):
+        return False
+    nw = SHAMAL_DIR_RANGE[0] <= wind_dir_deg <= SHAMAL_DIR_RANGE[1]
+    strong = (wind_kn >= SHAMAL_WIND_KN) or (gust_kn >= SHAMAL_GUST_KN)
+    return bool(nw and strong)
+
+
+def shamal_mask(wind_dir_deg, wind_kn, gust_kn) -> np.ndarray:
+    """Vectorized is_shamal_day; any NaN input gives False."""
+    wind_dir_deg = np.asarray(wind_dir_deg, dtype=float)
+    wind_kn = np.asarray(wind_kn, dtype=float)
+    gust_kn = np.asarray(gust_kn, dtype=float)
+    valid = ~(np.isnan(wind_dir_deg) | np.isnan(wind_kn) | np.isnan(gust_kn))
+    nw = (wind_dir_deg >= SHAMAL_DIR_RANGE[0]) & (wind_dir_deg <= SHAMAL_DIR_RANGE[1])
+    strong = (wind_kn >= SHAMAL_WIND_KN) | (gust_kn >= SHAMAL_GUST_KN)
+    return valid & nw & strong
+
+
+def _nanreduce(grid, reducer, axis: int = -1) -> np.ndarray:
+    """nanmax/nanmin along axis without all-NaN warnings (all-NaN -> NaN)."""
+    grid = np.asarray(grid, dtype=float)
+    valid = ~np.isnan(grid)
+    fill = -np.inf if reducer is np.max else np.inf
+    out = reducer(np.where(valid, grid, fill), axis=axis)
+    return np.where(valid.any(axis=axis), out, np.nan)
+
+
+def daily_extremes(wind_kn_h, gust_kn_h, wave_m_h, vis_km_h):
+    """
+    Daily maxima (wind, gust, wave) and minimum visibility of (days x hours) grids.
+
+    These are the inputs the daily heatmap scores, so
+    calc_risk_score(*daily_extremes(...)) is the daily roll-up.
+    """
+    return (
+        _nanreduce(wind_kn_h, np.max),
+        _nanreduce(gust_kn_h, np.max),
+        _nanreduce(wave_m_h, np.max),
+        _nanreduce(vis_km_h, np.min),
+    )
+
+
+def hourly_risk_matrix(wind_kn_h, gust_kn_h, wave_m_h, vis_km_h, daily=None) -> np.ndarray:
+    """
+    (days x hours) risk grid from hourly parameter grids.
+
+    Args:
+        daily: Optional (wind, gust, wave, vis) daily vectors; hours missing
+            a parameter take that day's value, so gap-filled days still score
+    """
+    grids = [np.asarray(g, dtype=float) for g in (wind_kn_h, gust_kn_h, wave_m_h, vis_km_h)]
+    if daily is not None:
+        grids = [
+            np.where(np.isnan(g), np.asarray(d, dtype=float)[:, None], g)
+            for g, d in zip(grids, daily)
+        ]
+    return calc_risk_score(*grids)
+
+
+def compute_daily_risk(
+    days: list[date],
+    wind_kn,
+    gust_kn,
+    wave_m,
+    vis_km,
+    wdir_deg,
+    risk_level_override: list | None = None,
+    shamal_override: list | None = None,
+    manual_shamal_periods: list[tuple[date, date]] | None = None,
+) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """
+    Daily risk score, operation status and Shamal flags.
+
+    The weather inputs may also be (sites x days) stacks, scored in one
+    pass; the per-day overrides then index rows, so they apply to
+    single-site vectors only. Manual risk levels (LOW/MEDIUM/HIGH) replace
+    the computed score, manual Shamal flags replace the detected ones, and
+    manual Shamal periods force Shamal on the days they cover.
+
+    Returns:
+        (risk 0-100, status per day, shamal mask)
+    """
+    risk = calc_risk_score(
+        np.asarray(wind_kn, dtype=float),
+        np.asarray(gust_kn, dtype=float),
+        np.asarray(wave_m, dtype=float),
+        np.asarray(vis_km, dtype=float),
+    )
+    shamal = shamal_mask(wdir_deg, wind_kn, gust_kn)
+
+    for i, level in enumerate(risk_level_override or []):
+        if level is None:
+            continue
+        level_key = str(level).strip().upper()
+        if level_key in RISK_LEVEL_SCORES:
+            risk[i] = RISK_LEVEL_SCORES[level_key]
+
+    for i, val in enumerate(shamal_override or []):
+        if val is not None:
+            shamal[i] = parse_bool(val)
+
+    if manual_shamal_periods and len(days):
+        day_arr = np.array(days, dtype="datetime64[D]")
+        for s, e in manual_shamal_periods:
+            shamal |= (day_arr >= np.datetime64(s, "D")) & (day_arr <= np.datetime64(e, "D"))
+
+    return risk, op_status_array(risk).tolist(), shamal
+
+
+def voyage_worst_case(
+    days: list[date],
+    risk,
+    shamal,
+    voyages: list[dict],
+    sites: list[str],
+) -> list[dict]:
+    """
+    Worst (site, day) per voyage from a (sites x days) risk stack.
+
+    Voyages outside days are skipped; only the days inside the window count.
+
+    Returns:
+        One dict per voyage: name, label, type, worst risk/status, the
+        site and date it occurs, per-site maximum risk and Shamal days
+    """
+    risk = np.atleast_2d(np.asarray(risk, dtype=float))
+    shamal = np.atleast_2d(np.asarray(shamal, dtype=bool))
+    day_arr = np.array(days, dtype="datetime64[D]")
+    out = []
+    for v in voyages:
+        in_voyage = (day_arr >= np.datetime64(v["start"], "D")) & (
+            day_arr <= np.datetime64(v["end"], "D")
+        )
+        scored = np.where(in_voyage & ~np.isnan(risk), risk, -np.inf)
+        if not np.isfinite(scored).any():
+            continue
+        s, d = np.unravel_index(np.argmax(scored), scored.shape)
+        worst = float(risk[s, d])
+        out.append(
+            {
+                "name": v["name"],
+                "label": v["label"],
+                "type": v["type"],
+                "worst_risk": worst,
+                "status": op_status_from_score(worst),
+                "site": sites[s],
+                "date": days[d],
+                "site_max_risk": {
+                    site: (float(m) if np.isfinite(m) else None)
+                    for site, m in zip(sites, scored.max(axis=1))
+                },
+                "shamal_days": int((shamal & in_voyage).any(axis=0).sum()),
+            }
+        )
+    return out
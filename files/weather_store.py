@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Local weather history store (SQLite, files/out/weather_store/history.sqlite).
+
+Daily and hourly rows are keyed by (site, date/time, source, model_run).
+Archive data is immutable, so fetch code asks missing_ranges() which days
+are absent and requests only those; history queries, climatology and
+backfills then read locally instead of refetching whole ranges. Forecast
+payloads are recorded under their model run for later verification.
+
+CLI:
+    python weather_store.py                                   # stored series
+    python weather_store.py --backfill 2021-01-01:2025-12-31 [--sites]
+"""
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from pipeline_cache import FILES_DIR
+
+DEFAULT_STORE_PATH = FILES_DIR / "out" / "weather_store" / "history.sqlite"
+ARCHIVE_SOURCE = "archive"
+ARCHIVE_RUN = ""  # Archive rows are final; no model run
+
+DAILY_FIELDS = ["wind_max_kn", "gust_max_kn", "wind_dir_deg", "vis_min_km", "wave_max_m"]
+HOURLY_FIELDS = ["wind_kn", "gust_kn", "vis_km", "wave_m"]
+# Fetch payload key -> hourly column
+HOURLY_PAYLOAD_KEYS = {
+    "hourly_wind_kn": "wind_kn",
+    "hourly_gust_kn": "gust_kn",
+    "hourly_vis_km": "vis_km",
+    "hourly_wave_m": "wave_m",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS daily (
+    site TEXT NOT NULL,
+    date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model_run TEXT NOT NULL,
+    {", ".join(f"{f} REAL" for f in DAILY_FIELDS)},
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (site, date, source, model_run)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hourly (
+    site TEXT NOT NULL,
+    time TEXT NOT NULL,
+    source TEXT NOT NULL,
+    model_run TEXT NOT NULL,
+    {", ".join(f"{f} REAL" for f in HOURLY_FIELDS)},
+    PRIMARY KEY (site, time, source, model_run)
+) WITHOUT ROWID;
+"""
+
+
+def site_key(lat: float, lon: float) -> str:
+    """Store key for a coordinate (4 decimals, ~10 m)."""
+    return f"{lat:.4f},{lon:.4f}"
+
+
+def model_run_key(fetched_at: float, cycle_hr: int = 6) -> str:
+    """Model cycle (UTC) a forecast fetched at fetched_at belongs to, e.g. 2026-02-05T06Z."""
+    cycle_s = cycle_hr * 3600
+    run = datetime.fromtimestamp(fetched_at // cycle_s * cycle_s, tz=timezone.utc)
+    return run.strftime("%Y-%m-%dT%HZ")
+
+
+def missing_runs(have, d0: date, d1: date) -> list[tuple[date, date]]:
+    """Contiguous [start, end] runs of days in d0..d1 absent from have."""
+    days = np.arange(np.datetime64(d0, "D"), np.datetime64(d1, "D") + 1)
+    if days.size == 0:
+        return []
+    missing = ~np.isin(days, np.asarray(have, dtype="datetime64[D]"))
+    # Run-length edges of the missing mask
+    edges = np.diff(np.concatenate(([False], missing, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return [(days[s].item(), days[e].item()) for s, e in zip(starts, ends)]
+
+
+def _nullable(values, n: int) -> list:
+    """Float column as a list with None for NaN (SQLite NULL); short columns are padded."""
+    arr = np.full(n, np.nan)
+    values = np.asarray(values if values is not None else [], dtype=float)[:n]
+    arr[: values.size] = values
+    return [None if np.isnan(v) else float(v) for v in arr]
+
+
+def _column(rows: list, i: int) -> np.ndarray:
+    return np.array([np.nan if r[i] is None else r[i] for r in rows], dtype=float)
+
+
+class WeatherStore:
+    """SQLite-backed daily/hourly weather history; safe to share across threads."""
+
+    def __init__(self, path: Path | str = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def stored_dates(
+        self, site: str, source: str, d0: date, d1: date, model_run: str = ARCHIVE_RUN
+    ) -> list[str]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT date FROM daily WHERE site=? AND source=? AND model_run=? "
+                "AND date BETWEEN ? AND ? ORDER BY date",
+                (site, source, model_run, d0.isoformat(), d1.isoformat()),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def missing_ranges(
+        self, site: str, source: str, d0: date, d1: date, model_run: str = ARCHIVE_RUN
+    ) -> list[tuple[date, date]]:
+        """Date ranges in d0..d1 that still need fetching."""
+        return missing_runs(self.stored_dates(site, source, d0, d1, model_run), d0, d1)
+
+    def put_payload(
+        self,
+        site: str,
+        source: str,
+        payload: dict,
+        model_run: str = ARCHIVE_RUN,
+        fetched_at: float | None = None,
+    ) -> int:
+        """
+        Upsert a fetch payload ({"dates", daily fields, "hourly_time", hourly_*}).
+
+        Days whose values are all missing are skipped, so they are refetched
+        later. Returns the number of daily rows written.
+        """
+        fetched_at = fetched_at or time.time()
+        dates = list(payload.get("dates") or [])
+        n = len(dates)
+        cols = [_nullable(payload.get(f), n) for f in DAILY_FIELDS]
+        daily_rows = [
+            (site, dates[i], source, model_run, *(c[i] for c in cols), fetched_at)
+            for i in range(n)
+            if any(c[i] is not None for c in cols)
+        ]
+
+        times = list(payload.get("hourly_time") or [])
+        m = len(times)
+        hcols = {
+            col: _nullable(payload.get(key), m) for key, col in HOURLY_PAYLOAD_KEYS.items()
+        }
+        hourly_rows = [
+            (site, times[i], source, model_run, *(hcols[f][i] for f in HOURLY_FIELDS))
+            for i in range(m)
+        ]
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO daily VALUES ({','.join('?' * (5 + len(DAILY_FIELDS)))})",
+                daily_rows,
+            )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO hourly VALUES ({','.join('?' * (4 + len(HOURLY_FIELDS)))})",
+                hourly_rows,
+            )
+        return len(daily_rows)
+
+    def load_payload(
+        self, site: str, source: str, d0: date, d1: date, model_run: str = ARCHIVE_RUN
+    ) -> dict:
+        """Stored rows for d0..d1 in the fetch payload shape (daily arrays + hourly_*)."""
+        with self._lock:
+            daily = self.conn.execute(
+                f"SELECT date, {', '.join(DAILY_FIELDS)} FROM daily "
+                "WHERE site=? AND source=? AND model_run=? AND date BETWEEN ? AND ? ORDER BY date",
+                (site, source, model_run, d0.isoformat(), d1.isoformat()),
+            ).fetchall()
+            hourly = self.conn.execute(
+                f"SELECT time, {', '.join(HOURLY_FIELDS)} FROM hourly "
+                "WHERE site=? AND source=? AND model_run=? AND time >= ? AND time < ? ORDER BY time",
+                (site, source, model_run, d0.isoformat(), (d1 + timedelta(days=1)).isoformat()),
+            ).fetchall()
+        payload = {"model": source, "dates": [r[0] for r in daily]}
+        for i, f in enumerate(DAILY_FIELDS, start=1):
+            payload[f] = _column(daily, i)
+        payload["hourly_time"] = [r[0] for r in hourly]
+        for key, col in HOURLY_PAYLOAD_KEYS.items():
+            payload[key] = _column(hourly, 1 + HOURLY_FIELDS.index(col))
+        return payload
+
+    def history(self, site: str, source: str = ARCHIVE_SOURCE, model_run: str = ARCHIVE_RUN):
+        """
+        Full daily history of a site as arrays.
+
+        Returns:
+            (datetime64[D] dates, {field: float array})
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT date, {', '.join(DAILY_FIELDS)} FROM daily "
+                "WHERE site=? AND source=? AND model_run=? ORDER BY date",
+                (site, source, model_run),
+            ).fetchall()
+        dates = np.array([r[0] for r in rows], dtype="datetime64[D]")
+        return dates, {f: _column(rows, i) for i, f in enumerate(DAILY_FIELDS, start=1)}
+
+    def summary(self) -> list[tuple]:
+        """(site, source, model_run, days, first, last) per stored series."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT site, source, model_run, COUNT(*), MIN(date), MAX(date) FROM daily "
+                "GROUP BY site, source, model_run ORDER BY site, source, model_run"
+            ).fetchall()
+
+
+_default_store: WeatherStore | None = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> WeatherStore:
+    """Process-wide store, opened on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = WeatherStore()
+        return _default_store
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--backfill" in argv:
+        import WEATHER_DASHBOARD as wd
+
+        first, _, last = argv[argv.index("--backfill") + 1].partition(":")
+        wd.configure_http(**wd.http_options(argv))
+        sites = list(wd.SITES.values()) if "--sites" in argv else [(wd.LAT, wd.LON)]
+        d0, d1 = date.fromisoformat(first), date.fromisoformat(last)
+        payloads = wd.fetch_archive_stored(d0, d1, sites)
+        waves = wd.fetch_marine_history(d0, d1, sites)
+        for (lat, lon), p, w in zip(sites, payloads, waves):
+            print(
+                f"[OK] {site_key(lat, lon)}: {len(p['dates'])} archive days, "
+                f"{len(w['dates'])} marine days"
+            )
+        return 0
+    for site, source, run, n, first, last in default_store().summary():
+        print(f"{site} {source} {run or '-'}: {n} days ({first} ~ {last})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())